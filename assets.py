@@ -0,0 +1,118 @@
+"""
+Process wide cache of the game's tk images.
+
+Every image file is decoded once, the first time it is asked for, and every
+scaled copy is made once per cell size. Views, the status bar and new games
+all share the same PhotoImage objects.
+"""
+
+from math import gcd
+import tkinter as tk
+
+
+TILES = {
+    "unrevealed": "images/unrevealed.gif",
+    "pokeball": "images/pokeball.gif",
+    "0": "images/zero_adjacent.gif",
+    "1": "images/one_adjacent.gif",
+    "2": "images/two_adjacent.gif",
+    "3": "images/three_adjacent.gif",
+    "4": "images/four_adjacent.gif",
+    "5": "images/five_adjacent.gif",
+    "6": "images/six_adjacent.gif",
+    "7": "images/seven_adjacent.gif",
+    "8": "images/eight_adjacent.gif",
+}
+SPRITES = (
+    "images/pokemon_sprites/pikachu.gif",
+    "images/pokemon_sprites/charizard.gif",
+    "images/pokemon_sprites/cyndaquil.gif",
+    "images/pokemon_sprites/psyduck.gif",
+    "images/pokemon_sprites/togepi.gif",
+    "images/pokemon_sprites/umbreon.gif",
+)
+DIGITS = "012345678"
+
+_images = {}
+_atlases = {}
+
+
+def get_image(path, size=None):
+    """Returns the image at path, loading it on first use.
+
+    Parameters:
+        path (str): The image file.
+        size (int): The height in pixels to scale the image to, None to keep
+        the size it was drawn at.
+
+    Returns:
+        (tk.PhotoImage): The shared image.
+    """
+    key = (path, size)
+    image = _images.get(key)
+    if image is None:
+        if size is None:
+            image = tk.PhotoImage(file=path)
+        else:
+            image = scale(get_image(path), size)
+        _images[key] = image
+    return image
+
+
+def scale(image, size):
+    """Scale image so it is size pixels high.
+
+    Tk only zooms and subsamples by whole numbers, so the image is zoomed by
+    the numerator and subsampled by the denominator of the reduced ratio.
+
+    Parameters:
+        image (tk.PhotoImage): The image to scale.
+        size (int): The height in pixels wanted.
+
+    Returns:
+        (tk.PhotoImage): A scaled copy, or image itself when it already fits.
+    """
+    height = image.height()
+    if size == height:
+        return image
+    divisor = gcd(size, height)
+    zoom = size // divisor
+    subsample = height // divisor
+    if zoom > 1:
+        image = image.zoom(zoom)
+    if subsample > 1:
+        image = image.subsample(subsample)
+    return image
+
+
+def get_atlas(characters=DIGITS, size=None):
+    """Returns one image holding the tiles of characters side by side.
+
+    Parameters:
+        characters (str): Keys of TILES, in the order they are laid out.
+        size (int): The tile height, as for get_image.
+
+    Returns:
+        (tuple<tk.PhotoImage, dict<str, tuple<int, int, int, int>>>): The
+        atlas and the box (x1, y1, x2, y2) of each character in it.
+    """
+    key = (characters, size)
+    if key not in _atlases:
+        tiles = [get_image(TILES[character], size) for character in characters]
+        width = sum(tile.width() for tile in tiles)
+        height = max(tile.height() for tile in tiles)
+        atlas = tk.PhotoImage(width=width, height=height)
+        boxes = {}
+        x = 0
+        for character, tile in zip(characters, tiles):
+            atlas.tk.call(atlas.name, "copy", tile.name, "-to", x, 0)
+            boxes[character] = (x, 0, x + tile.width(), tile.height())
+            x += tile.width()
+        _atlases[key] = (atlas, boxes)
+    return _atlases[key]
+
+
+def clear():
+    """Forget every cached image, for when the tk root they belong to is gone."""
+    _images.clear()
+    _atlases.clear()
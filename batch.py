@@ -0,0 +1,323 @@
+"""
+Batch model that plays K boards of the same size at once.
+
+The boards are stacked in one flat buffer, board after board and row after
+row, so cell i of board k is at k * grid_size**2 + i. numpy is not a
+dependency of the game, so whole-batch work is done with the tools the
+standard library has for it: every cell is one byte lane of a big integer
+and a step to a neighbour is a shift of that integer, masked so that no lane
+picks up a cell from another row or another board. The adjacency counts of
+all K boards take eight shifts, and a reveal floods every board together,
+one ring of cells per round.
+
+Board k always matches BoardModel(grid_size, num_pokemon, seeds[k]) playing
+the same moves.
+
+    python batch.py --boards 1000 --grid-size 30 --pokemons 150
+"""
+
+import argparse
+import random
+import time
+
+import history
+from model import (
+    FLAG_BYTE,
+    POKEMON_BYTE,
+    UNEXPOSED_BYTE,
+    BoardModel,
+    sample_pokemons,
+)
+
+
+# cell byte -> 1 for the cells each lane mask picks out, 0 for the rest
+_IS_UNEXPOSED = bytes(code == UNEXPOSED_BYTE for code in range(256))
+_IS_OPEN = bytes(code not in (FLAG_BYTE, UNEXPOSED_BYTE) for code in range(256))
+_NOT_FLAG = bytes(code != FLAG_BYTE for code in range(256))
+_IS_ZERO = bytes(code == 0 for code in range(256))
+_DIGITS = bytes((ord("0") + code) % 256 for code in range(256))
+
+
+class BoardBatch:
+    """
+    this is BoardBatch class
+    which holds K boards of one size in a single buffer and places,
+    counts, reveals and scores all of them in whole-batch steps.
+    """
+
+    def __init__(self, grid_size, num_pokemon, seeds):
+        """
+        Parameters:
+            grid_size (int): The grid size of every board.
+            num_pokemon (int): The number of pokemons on every board.
+            seeds (iterable<int>): One seed per board.
+        """
+        self.grid_size = grid_size
+        self.num_pokemon = num_pokemon
+        self.seeds = list(seeds)
+        self.count = len(self.seeds)
+        self._randoms = [random.Random(seed) for seed in self.seeds]
+        self._cell_count = grid_size**2
+        self._size = self.count * self._cell_count
+        self._cells = bytearray((UNEXPOSED_BYTE,)) * self._size
+        self._masks = self._neighbour_masks()
+        self._locations = [
+            sample_pokemons(rng, grid_size, num_pokemon) for rng in self._randoms
+        ]
+        self._update_counts()
+
+    def _neighbour_masks(self):
+        """Work out the shift and lane mask of each of the eight directions.
+
+        Returns:
+            (list<tuple<int, int>>): The cell offset of the neighbour and a
+            mask with a 1 in every lane whose neighbour in that direction is
+            on the same board.
+        """
+        grid_size = self.grid_size
+        masks = []
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                if dr == 0 and dc == 0:
+                    continue
+                lanes = bytes(
+                    0 <= row + dr < grid_size and 0 <= col + dc < grid_size
+                    for row in range(grid_size)
+                    for col in range(grid_size)
+                )
+                mask = int.from_bytes(lanes * self.count, "little")
+                masks.append((dr * grid_size + dc, mask))
+        return masks
+
+    def _spread(self, lanes):
+        """The neighbours of every lane, one shifted copy per direction.
+
+        Parameters:
+            lanes (int): A big integer with one byte lane per cell.
+
+        Returns:
+            (iterator<int>): For each direction, the value of each cell's
+            neighbour in that direction, 0 where there is none.
+        """
+        for offset, mask in self._masks:
+            if offset > 0:
+                yield lanes >> (8 * offset) & mask
+            else:
+                yield lanes << (-8 * offset) & mask
+
+    def _to_int(self, data):
+        """(int) Returns data as a big integer, cell 0 in the lowest byte."""
+        return int.from_bytes(data, "little")
+
+    def _to_bytes(self, lanes):
+        """(bytes) Returns the byte lanes of a big integer from _to_int."""
+        return lanes.to_bytes(self._size, "little")
+
+    def _update_counts(self):
+        """Work out the adjacency counts of every board from the locations."""
+        pokemons = bytearray(self._size)
+        for board, locations in enumerate(self._locations):
+            base = board * self._cell_count
+            for location in locations:
+                pokemons[base + location] = 1
+        self._pokemons = self._to_int(pokemons)
+        # at most 8 neighbours, so no lane carries into the next one
+        self._counts = self._to_bytes(sum(self._spread(self._pokemons)))
+
+    def place_pokemons(self, safe_indexes=None):
+        """Place the pokemons of every board again, keeping the cell at
+        safe_indexes[k] and its neighbours clear on board k.
+
+        Parameters:
+            safe_indexes (list<int>): One index per board, None for no safe cell.
+        """
+        if safe_indexes is None:
+            safe_indexes = [None] * self.count
+        self._locations = [
+            sample_pokemons(rng, self.grid_size, self.num_pokemon, safe_index)
+            for rng, safe_index in zip(self._randoms, safe_indexes)
+        ]
+        self._update_counts()
+
+    def reveal(self, indexes):
+        """Reveal one cell on every board, flooding out from the cells with
+        no pokemon around them as BoardModel.reveal does.
+
+        Parameters:
+            indexes (list<int>): The cell to reveal on each board, None to
+            leave a board alone.
+
+        Returns:
+            (list<int>): The number of cells revealed on each board.
+        """
+        cell_count = self._cell_count
+        start = bytearray(self._size)
+        for board, index in enumerate(indexes):
+            if index is not None:
+                start[board * cell_count + index] = 1
+        unexposed = self._to_int(self._cells.translate(_IS_UNEXPOSED))
+        revealed = self._to_int(start) & unexposed
+        passable = self._to_int(self._cells.translate(_NOT_FLAG))
+        zero = self._to_int(self._counts.translate(_IS_ZERO))
+
+        # grow every flood one ring at a time, from the zeros found last round
+        frontier = revealed & zero
+        while frontier:
+            ring = 0
+            for neighbours in self._spread(frontier):
+                ring |= neighbours
+            ring &= passable & ~revealed
+            revealed |= ring
+            frontier = ring & zero
+
+        # only covered cells change; the rest of a flood is already showing
+        revealed &= unexposed
+        keep = self._to_int(self._cells) & ~(revealed * 0xFF)
+        digits = self._to_int(self._counts.translate(_DIGITS)) & revealed * 0xFF
+        self._cells = bytearray(self._to_bytes(keep | digits))
+        marks = self._to_bytes(revealed)
+        return [
+            marks.count(1, board * cell_count, (board + 1) * cell_count)
+            for board in range(self.count)
+        ]
+
+    def flag(self, indexes):
+        """Toggle a flag on one covered cell of every board.
+
+        Parameters:
+            indexes (list<int>): The cell to toggle on each board, None to
+            leave a board alone.
+        """
+        for board, index in enumerate(indexes):
+            if index is None:
+                continue
+            position = board * self._cell_count + index
+            if self._cells[position] == FLAG_BYTE:
+                self._cells[position] = UNEXPOSED_BYTE
+            elif self._cells[position] == UNEXPOSED_BYTE:
+                self._cells[position] = FLAG_BYTE
+
+    def reveal_pokemons(self):
+        """Show the pokemons of every board."""
+        cell_count = self._cell_count
+        for board, locations in enumerate(self._locations):
+            for location in locations:
+                self._cells[board * cell_count + location] = POKEMON_BYTE
+
+    def check_loss(self):
+        """(list<bool>) Returns whether each board has a pokemon exposed."""
+        open_cells = self._to_int(self._cells.translate(_IS_OPEN))
+        exposed = self._to_bytes(open_cells & self._pokemons)
+        cell_count = self._cell_count
+        return [
+            exposed.find(1, board * cell_count, (board + 1) * cell_count) != -1
+            for board in range(self.count)
+        ]
+
+    def check_win(self):
+        """(list<bool>) Returns whether each board is won: no cell left
+        covered and one flag per pokemon."""
+        cells = self._cells
+        cell_count = self._cell_count
+        wins = []
+        for board, locations in enumerate(self._locations):
+            start = board * cell_count
+            end = start + cell_count
+            wins.append(
+                cells.find(UNEXPOSED_BYTE, start, end) == -1
+                and cells.count(FLAG_BYTE, start, end) == len(locations)
+            )
+        return wins
+
+    def get_pokemon_locations(self, board):
+        """(tuple<int>) Returns the pokemon indexes of a board."""
+        return self._locations[board]
+
+    def get_cells(self, board):
+        """(bytes) Returns the buffer of a board, as BoardModel.get_cells."""
+        start = board * self._cell_count
+        return bytes(self._cells[start : start + self._cell_count])
+
+    def get_counts(self, board):
+        """(bytes) Returns the adjacency count of every cell of a board."""
+        start = board * self._cell_count
+        return self._counts[start : start + self._cell_count]
+
+    def get_board(self, board):
+        """Copy one board out of the batch.
+
+        Returns:
+            (BoardModel): A board with the same seed, pokemons and cells.
+        """
+        model = BoardModel(
+            self.grid_size,
+            self.num_pokemon,
+            seed=self.seeds[board],
+            pokemon_locations=self._locations[board],
+        )
+        model.set_cells(self.get_cells(board))
+        model.set_random_state(self._randoms[board].getstate())
+        return model
+
+
+def play_first_moves(grid_size, num_pokemon, seeds, indexes):
+    """Make the first, safe reveal of every seed's board with a BoardBatch.
+
+    Returns:
+        (tuple<list<bool>, list<bool>>): The win and loss of every board.
+    """
+    boards = BoardBatch(grid_size, num_pokemon, seeds)
+    boards.place_pokemons(indexes)
+    boards.reveal(indexes)
+    return boards.check_win(), boards.check_loss()
+
+
+def loop_first_moves(grid_size, num_pokemon, seeds, indexes):
+    """The same as play_first_moves, one BoardModel at a time."""
+    wins = []
+    losses = []
+    for seed, index in zip(seeds, indexes):
+        model = BoardModel(grid_size, num_pokemon, seed=seed)
+        history.GameHistory(model).reveal(index)
+        wins.append(model.check_win())
+        losses.append(model.check_loss())
+    return wins, losses
+
+
+def benchmark(boards, grid_size, num_pokemon, first_seed=0):
+    """Time the first move of many boards, batched and one at a time.
+
+    Returns:
+        (dict): The seconds each way took and whether their results agree.
+    """
+    seeds = range(first_seed, first_seed + boards)
+    rng = random.Random(first_seed)
+    indexes = [rng.randrange(grid_size**2) for _ in seeds]
+    results = {}
+    timings = {}
+    for name, play in (("loop", loop_first_moves), ("batch", play_first_moves)):
+        start = time.perf_counter()
+        results[name] = play(grid_size, num_pokemon, seeds, indexes)
+        timings[name] = round(time.perf_counter() - start, 4)
+    return {
+        "boards": boards,
+        "grid_size": grid_size,
+        "num_pokemon": num_pokemon,
+        "seconds": timings,
+        "speedup": round(timings["loop"] / timings["batch"], 2),
+        "same": results["loop"] == results["batch"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batch board model.")
+    parser.add_argument("--boards", type=int, default=1000)
+    parser.add_argument("--grid-size", type=int, default=10)
+    parser.add_argument("--pokemons", type=int, default=15)
+    parser.add_argument("--first-seed", type=int, default=0)
+    args = parser.parse_args()
+    print(benchmark(args.boards, args.grid_size, args.pokemons, args.first_seed))
+
+
+if __name__ == "__main__":
+    main()
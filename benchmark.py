@@ -0,0 +1,558 @@
+"""
+Benchmark suite for the hot paths of the game.
+
+Every case is timed over a matrix of grid sizes and pokemon densities, on
+boards built from fixed seeds, so two runs on the same machine measure the
+same work. Results are written as JSON. compare reads two result files and
+flags every case that got slower than a threshold.
+
+    python benchmark.py run --output before.json
+    ... change something ...
+    python benchmark.py run --output after.json
+    python benchmark.py compare before.json after.json --threshold 0.1
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tkinter as tk
+
+import simulate
+from model import FLAG, UNEXPOSED, BoardModel
+from pokemon import BoardView, ImageBoardView, RasterBoardView
+
+
+SIZES = (10, 50, 200, 1000, 2000)
+# the (row, column) steps to the neighbours of a cell on the square grid
+SQUARE_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+DENSITIES = (0.05, 0.15, 0.3)
+# cells looked at by the per cell cases
+SAMPLE = 1000
+# shortest sample, in seconds, a fast case is repeated to fill
+MIN_SAMPLE = 0.02
+
+
+class HeadlessCanvas(tk.Canvas):
+    """
+    this is HeadlessCanvas class
+    which stands in for a tk canvas without a display, counting the items it
+    is asked to create and change.
+
+    Mix it in after a board view, so the view's super() calls land here.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.created = 0
+        self.configured = 0
+        self.moved = 0
+        self._idle = []
+
+    def config(self, **kwargs):
+        pass
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def create_rectangle(self, *args, **kwargs):
+        self.created += 1
+        return self.created
+
+    create_text = create_image = create_rectangle
+
+    def itemconfig(self, item, **kwargs):
+        self.configured += 1
+
+    def coords(self, item, *args):
+        self.moved += 1
+
+    def tag_raise(self, item):
+        pass
+
+    def after_idle(self, callback):
+        self._idle.append(callback)
+        return callback
+
+    def after(self, milliseconds, callback):
+        return self.after_idle(callback)
+
+    def after_cancel(self, job):
+        if job in self._idle:
+            self._idle.remove(job)
+
+    def update_idletasks(self):
+        pass
+
+    def run_idle(self):
+        """Run the callbacks tk would run while idle, as the mainloop would."""
+        while self._idle:
+            self._idle.pop(0)()
+
+
+class HeadlessBoardView(BoardView, HeadlessCanvas):
+    pass
+
+
+class HeadlessImageBoardView(ImageBoardView, HeadlessCanvas):
+    def tile(self, character):
+        return character
+
+
+class HeadlessRasterBoardView(RasterBoardView, HeadlessCanvas):
+    def resize_raster(self, width, height):
+        if self._raster_item is None:
+            self._raster_item = self.create_image(0, 0)
+
+    def blit(self, character, x, y, columns=1, rows=1):
+        # a copy into the raster is the change a canvas item config would be
+        self.configured += 1
+
+
+def make_board(grid_size, density, seed):
+    """(BoardModel) Returns the board of a seed with density of its cells
+    holding a pokemon."""
+    num_pokemon = max(int(grid_size**2 * density), 1)
+    return BoardModel(grid_size, num_pokemon, seed=seed)
+
+
+def sample_cells(grid_size, seed, count=SAMPLE):
+    """(list<int>) Returns count cell indexes picked with seed."""
+    rng = random.Random(seed)
+    return [rng.randrange(grid_size**2) for _ in range(count)]
+
+
+def zero_cell(model, seed):
+    """(int) Returns a cell with no pokemon around it, picked with seed, or
+    any cell when there is none."""
+    start = random.Random(seed).randrange(model.grid_size**2)
+    cell_count = model.grid_size**2
+    for offset in range(cell_count):
+        index = (start + offset) % cell_count
+        if model.count_at(index) == 0 and index not in model.pokemon_locations:
+            return index
+    return start
+
+
+def baseline_big_fun_search(game, grid_size, pokemon_locations, index):
+    """The search of the first version of the game, kept to measure the
+    flood fill against and to check it returns the same cells.
+
+    Discovered cells are kept in a list, so an open region of N cells
+    costs O(N^2).
+
+    Returns:
+        (list<int>): List of cells to turn visible.
+    """
+
+    def neighbours(node):
+        row, col = divmod(node, grid_size)
+        return [
+            (row + dr) * grid_size + col + dc
+            for dr, dc in SQUARE_STEPS
+            if 0 <= row + dr < grid_size and 0 <= col + dc < grid_size
+        ]
+
+    def number_at_cell(node):
+        if game[node] != UNEXPOSED:
+            return int(game[node])
+        return sum(neighbour in pokemon_locations for neighbour in neighbours(node))
+
+    queue = [index]
+    discovered = [index]
+    visible = []
+    if game[index] == FLAG or number_at_cell(index) != 0:
+        return queue
+    while queue:
+        node = queue.pop()
+        for neighbour in neighbours(node):
+            if neighbour in discovered:
+                continue
+            discovered.append(neighbour)
+            if game[neighbour] != FLAG and number_at_cell(neighbour) == 0:
+                queue.append(neighbour)
+            visible.append(neighbour)
+    return visible
+
+
+# every case takes (grid_size, density, seed) and returns (setup, run, ops):
+# setup is called before every timed run of run, which does ops operations
+
+
+def case_generate_pokemons(grid_size, density, seed):
+    model = make_board(grid_size, density, seed)
+    safe = grid_size**2 // 2
+
+    def setup():
+        model.set_random_state(random.Random(seed).getstate())
+
+    def run():
+        model.generate_pokemons(grid_size, model.num_pokemon, safe)
+
+    return setup, run, 1
+
+
+def case_neighbour_directions(grid_size, density, seed):
+    model = make_board(grid_size, density, seed)
+    cells = sample_cells(grid_size, seed)
+
+    def run():
+        for index in cells:
+            model.neighbour_directions(index, grid_size)
+
+    return None, run, len(cells)
+
+
+def case_number_at_cell(grid_size, density, seed):
+    model = make_board(grid_size, density, seed)
+    game = model.get_game()
+    locations = model.pokemon_locations
+    cells = sample_cells(grid_size, seed)
+
+    def run():
+        for index in cells:
+            model.number_at_cell(game, locations, grid_size, index)
+
+    return None, run, len(cells)
+
+
+def case_big_fun_search(grid_size, density, seed):
+    model = make_board(grid_size, density, seed)
+    game = model.get_game()
+    locations = model.pokemon_locations
+    index = zero_cell(model, seed)
+
+    def run():
+        model.big_fun_search(game, grid_size, locations, index)
+
+    return None, run, 1
+
+
+def case_big_fun_search_baseline(grid_size, density, seed):
+    model = make_board(grid_size, density, seed)
+    game = model.get_game()
+    locations = model.pokemon_locations
+    index = zero_cell(model, seed)
+
+    def run():
+        baseline_big_fun_search(game, grid_size, locations, index)
+
+    return None, run, 1
+
+
+def case_zero_regions(grid_size, density, seed):
+    model = make_board(grid_size, density, seed)
+
+    def setup():
+        # placing the same pokemons again drops the labels
+        model.pokemon_locations = model.pokemon_locations
+
+    def run():
+        model.zero_regions()
+
+    return setup, run, 1
+
+
+def case_reveal(grid_size, density, seed, use_regions=True):
+    model = make_board(grid_size, density, seed)
+    model.use_regions = use_regions
+    # the regions are labelled ahead of time, as once the pokemons are placed
+    model.zero_regions()
+    cells = model.get_cells()
+    index = zero_cell(model, seed)
+
+    def setup():
+        model.set_cells(cells)
+
+    def run():
+        model.reveal(index)
+
+    return setup, run, 1
+
+
+def case_reveal_search(grid_size, density, seed):
+    return case_reveal(grid_size, density, seed, use_regions=False)
+
+
+def case_reveal_cells(grid_size, density, seed):
+    model = make_board(grid_size, density, seed)
+    model.zero_regions()
+    game = model.get_game()
+    locations = model.pokemon_locations
+    index = zero_cell(model, seed)
+
+    def run():
+        model.reveal_cells(game, grid_size, locations, index)
+
+    return None, run, 1
+
+
+def case_first_reveal(grid_size, density, seed):
+    num_pokemon = max(int(grid_size**2 * density), 1)
+    index = grid_size**2 // 2 + grid_size // 2
+    model = None
+
+    def setup():
+        nonlocal model
+        # as on the first click: the pokemons are placed clear of it, and the
+        # board is not labelled yet
+        model = BoardModel(grid_size, num_pokemon, seed=seed)
+        model.place_pokemons(index)
+
+    def run():
+        model.reveal(index)
+
+    return setup, run, 1
+
+
+def case_game(grid_size, density, seed):
+    num_pokemon = max(int(grid_size**2 * density), 1)
+
+    def run():
+        simulate.play_game(grid_size, num_pokemon, seed, simulate.SolverPolicy())
+
+    return None, run, 1
+
+
+def draw_case(view_class, clicks=50):
+    """Make a case that plays clicks moves on a headless view, recording the
+    canvas items created and changed and the time spent redrawing."""
+
+    def case(grid_size, density, seed):
+        model = make_board(grid_size, density, seed)
+        cells = model.get_cells()
+        moves = sample_cells(grid_size, seed, clicks)
+        view = None
+        # seconds spent in draw_board and the idle redraws, per move
+        redraws = []
+
+        def setup():
+            nonlocal view
+            model.set_cells(cells)
+            view = view_class(None, grid_size)
+            view.draw_board(model.get_game())
+            redraws.clear()
+
+        def run():
+            for index in moves:
+                if model.get_cell(index) == UNEXPOSED:
+                    changed = model.reveal(index)
+                else:
+                    changed = model.toggle_flag(index)
+                start = time.perf_counter()
+                view.draw_board(model.get_game(), changed)
+                view.run_idle()
+                redraws.append(time.perf_counter() - start)
+                view.scroll(view.cell_size * 3, view.cell_size)
+
+        def churn():
+            # the views never delete items, so every item created is still
+            # on the canvas
+            return {
+                "items_created": view.created,
+                "items_configured": view.configured,
+                "items_moved": view.moved,
+                "redraw_us": statistics.mean(redraws[-len(moves) :]) * 1e6,
+                "redraw_max_us": max(redraws[-len(moves) :]) * 1e6,
+            }
+
+        run.churn = churn
+        return setup, run, len(moves)
+
+    return case
+
+
+# case name -> (case, largest grid size it is run at)
+CASES = {
+    "generate_pokemons": (case_generate_pokemons, 2000),
+    "neighbour_directions": (case_neighbour_directions, 2000),
+    "number_at_cell": (case_number_at_cell, 2000),
+    "big_fun_search": (case_big_fun_search, 2000),
+    # the search before the flood fill, quadratic in the size of the opening
+    "big_fun_search_baseline": (case_big_fun_search_baseline, 50),
+    "zero_regions": (case_zero_regions, 2000),
+    "reveal": (case_reveal, 2000),
+    "reveal_search": (case_reveal_search, 2000),
+    # rebuilds the whole game string per cell, so it is quadratic
+    "reveal_cells": (case_reveal_cells, 200),
+    "first_reveal": (case_first_reveal, 2000),
+    "game": (case_game, 200),
+    "draw_board": (draw_case(HeadlessBoardView), 2000),
+    "draw_board_images": (draw_case(HeadlessImageBoardView), 2000),
+    "draw_board_raster": (draw_case(HeadlessRasterBoardView), 2000),
+    # a long game, to show the canvas does not grow with the clicks
+    "draw_board_1000": (draw_case(HeadlessBoardView, 1000), 2000),
+    "draw_board_images_1000": (draw_case(HeadlessImageBoardView, 1000), 2000),
+    "draw_board_raster_1000": (draw_case(HeadlessRasterBoardView, 1000), 2000),
+}
+
+
+def measure(setup, run, ops, repeats, budget):
+    """Time run, taking the best of repeats samples.
+
+    A warm up run is made first. Fast cases are run several times per sample
+    so that every sample lasts at least MIN_SAMPLE seconds, and sampling
+    stops early once budget seconds are spent.
+
+    Returns:
+        (dict): The best and median microseconds per operation.
+    """
+
+    def timed():
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
+
+    number = max(int(MIN_SAMPLE / max(timed(), 1e-9)), 1)
+    timings = []
+    spent = 0.0
+    while len(timings) < repeats and (spent < budget or not timings):
+        elapsed = sum(timed() for _ in range(number))
+        spent += elapsed
+        timings.append(elapsed / number / ops)
+    return {
+        "best_us": round(min(timings) * 1e6, 3),
+        "median_us": round(statistics.median(timings) * 1e6, 3),
+        "runs": len(timings) * number,
+    }
+
+
+def run_suite(cases, sizes, densities, repeats=7, budget=1.0, log=None):
+    """Run every case over the matrix of sizes and densities.
+
+    Parameters:
+        cases (list<str>): Names of cases in CASES.
+        sizes (list<int>): Grid sizes; a case is skipped above its limit.
+        densities (list<float>): Shares of the cells holding a pokemon.
+        repeats (int): Most timed runs of each case.
+        budget (float): Seconds after which a case stops repeating.
+        log (file): Where to print progress, None for silence.
+
+    Returns:
+        (dict): The machine the suite ran on and one result per case.
+    """
+    results = []
+    for name in cases:
+        case, largest = CASES[name]
+        for grid_size in sizes:
+            if grid_size > largest:
+                continue
+            for density in densities:
+                seed = grid_size * 1000 + round(density * 100)
+                setup, run, ops = case(grid_size, density, seed)
+                result = {
+                    "case": name,
+                    "grid_size": grid_size,
+                    "density": density,
+                    "seed": seed,
+                    "ops": ops,
+                }
+                result.update(measure(setup, run, ops, repeats, budget))
+                if hasattr(run, "churn"):
+                    result.update(run.churn())
+                results.append(result)
+                if log is not None:
+                    print(
+                        f"{name:22} {grid_size:5} {density:5} "
+                        f"{result['best_us']:14.3f} us",
+                        file=log,
+                    )
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(before, after, threshold=0.1):
+    """Find the cases that got slower from before to after.
+
+    Parameters:
+        before (dict): Results of run_suite.
+        after (dict): Results of run_suite for the same cases.
+        threshold (float): The share of slow down that counts as a regression.
+
+    Returns:
+        (list<dict>): Every case in both, with its change, and whether it
+        regressed.
+    """
+    baseline = {
+        (result["case"], result["grid_size"], result["density"]): result
+        for result in before["results"]
+    }
+    rows = []
+    for result in after["results"]:
+        key = (result["case"], result["grid_size"], result["density"])
+        if key not in baseline:
+            continue
+        old = baseline[key]["best_us"]
+        new = result["best_us"]
+        change = new / old - 1 if old else 0.0
+        rows.append(
+            {
+                "case": key[0],
+                "grid_size": key[1],
+                "density": key[2],
+                "before_us": old,
+                "after_us": new,
+                "change": round(change, 4),
+                "regression": change > threshold,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game's hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--output", default="benchmark.json")
+    run_parser.add_argument("--cases", nargs="+", choices=list(CASES), default=None)
+    run_parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    run_parser.add_argument(
+        "--densities", nargs="+", type=float, default=list(DENSITIES)
+    )
+    run_parser.add_argument("--repeats", type=int, default=7)
+    run_parser.add_argument("--budget", type=float, default=1.0)
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        suite = run_suite(
+            args.cases or list(CASES),
+            args.sizes,
+            args.densities,
+            args.repeats,
+            args.budget,
+            log=sys.stderr,
+        )
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(suite, file, indent=1)
+        return
+
+    with open(args.before, encoding="utf-8") as file:
+        before = json.load(file)
+    with open(args.after, encoding="utf-8") as file:
+        after = json.load(file)
+    rows = compare(before, after, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['case']:22} {row['grid_size']:5} {row['density']:5} "
+            f"{row['before_us']:14.3f} {row['after_us']:14.3f} "
+            f"{row['change']:+8.1%} {flag}"
+        )
+    if any(row["regression"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,454 @@
+"""
+Endless board: a world of pokemons with no edge, made one chunk at a time.
+
+The world is cut into square chunks of chunk_size cells. The pokemons of a
+chunk are drawn from the board's seed and the chunk's coordinates alone, the
+first time anything near the chunk is looked at, so the same seed always
+gives the same world. Cells are addressed by (row, column), both of which may
+be negative. The game starts at (0, 0), and the cells around it never hold a
+pokemon.
+
+Only chunks a move touched hold any state. Chunks are kept in least recently
+used order; once more than max_chunks are in memory, the oldest are dropped
+if nothing was played on them, since they can be made again, and spilled to
+disk (4 bits per cell, see savefile.py) if something was. A spilled chunk is
+loaded back the next time a move reaches it. Closing the board removes the
+spilled chunks.
+
+Only the board is here: the game and the server still play boards of a fixed
+size, and endless.py explores a world from the command line.
+
+    python endless.py --moves 2000 --max-chunks 64
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import OrderedDict, deque
+
+from model import (
+    FLAG,
+    FLAG_BYTE,
+    POKEMON,
+    POKEMON_BYTE,
+    UNEXPOSED_BYTE,
+    ZERO_BYTE,
+)
+from savefile import pack_cells, unpack_cells
+from topology import SQUARE_STEPS
+
+
+CHUNK_SIZE = 32
+DENSITY = 0.17
+MAX_CHUNKS = 256
+# most cells one move uncovers: below a density of about 0.1 the openings
+# can be endless
+FLOOD_LIMIT = 1 << 16
+
+
+class Chunk:
+    """
+    this is Chunk class
+    which holds the cells of one chunk of an endless board.
+    """
+
+    def __init__(self, pokemons, counts, cells=None):
+        """
+        Parameters:
+            pokemons (bytearray): 1 for every cell holding a pokemon.
+            counts (bytearray): The number of pokemons next to every cell.
+            cells (bytearray): The board buffer, all covered when None.
+        """
+        self.pokemons = pokemons
+        self.counts = counts
+        if cells is None:
+            cells = bytearray((UNEXPOSED_BYTE,)) * len(counts)
+        self.cells = cells
+        # whether a move changed a cell, so the chunk cannot just be dropped
+        self.touched = cells.count(UNEXPOSED_BYTE) != len(cells)
+
+
+class EndlessBoard:
+    """
+    this is EndlessBoard class
+    which plays one endless world, keeping only the chunks in use in memory.
+    """
+
+    def __init__(
+        self,
+        seed=None,
+        density=DENSITY,
+        chunk_size=CHUNK_SIZE,
+        max_chunks=MAX_CHUNKS,
+        spill_directory=None,
+        flood_limit=FLOOD_LIMIT,
+    ):
+        """
+        Parameters:
+            seed (int): The seed of the world, a random one when None.
+            density (float): The share of the cells holding a pokemon.
+            chunk_size (int): The number of rows and columns of a chunk.
+            max_chunks (int): Chunks kept in memory before the least recently
+            used are dropped or spilled.
+            spill_directory (str): Where spilled chunks go, a new temporary
+            directory, removed by close, when None.
+            flood_limit (int): Most cells a single move uncovers; the covered
+            edge of a cut short opening can be opened further by clicking it.
+        """
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.density = density
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.flood_limit = flood_limit
+        self._per_chunk = round(density * chunk_size**2)
+        self._spill_directory = spill_directory
+        # the directory made when none was given; it is also removed if the
+        # board is dropped without being closed
+        self._temporary = None
+        self._chunks = OrderedDict()
+        # pokemon layouts are cheap to make again, so only a few are kept
+        self._layouts = OrderedDict()
+        self._spilled = set()
+        self._num_exposed = 0
+        self._num_flags = 0
+        self._num_exposed_pokemon = 0
+
+    def _layout(self, key):
+        """(tuple<int>) Returns the cells, within the chunk at key, that hold
+        a pokemon; the same for the same seed and key every time."""
+        layout = self._layouts.get(key)
+        if layout is not None:
+            self._layouts.move_to_end(key)
+            return layout
+        size = self.chunk_size
+        rng = random.Random(f"{self.seed}:{key[0]}:{key[1]}")
+        layout = rng.sample(range(size**2), self._per_chunk)
+        # the game starts at (0, 0), so the cells around it stay clear
+        top, left = key[0] * size, key[1] * size
+        layout = tuple(
+            index
+            for index in layout
+            if not (
+                -1 <= top + index // size <= 1 and -1 <= left + index % size <= 1
+            )
+        )
+        self._layouts[key] = layout
+        if len(self._layouts) > 4 * self.max_chunks:
+            self._layouts.popitem(last=False)
+        return layout
+
+    def _make_chunk(self, key, cells=None):
+        """(Chunk) Make the chunk at key from the layouts around it."""
+        size = self.chunk_size
+        pokemons = bytearray(size**2)
+        counts = bytearray(size**2)
+        for index in self._layout(key):
+            pokemons[index] = 1
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                for index in self._layout((key[0] + dr, key[1] + dc)):
+                    # the position relative to this chunk's first cell
+                    row = dr * size + index // size
+                    col = dc * size + index % size
+                    if not (-1 <= row <= size and -1 <= col <= size):
+                        continue
+                    for step_row, step_col in SQUARE_STEPS:
+                        r, c = row + step_row, col + step_col
+                        if 0 <= r < size and 0 <= c < size:
+                            counts[r * size + c] += 1
+        return Chunk(pokemons, counts, cells)
+
+    def _chunk(self, key):
+        """(Chunk) Returns the chunk at key, making or loading it back as
+        needed."""
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            cells = None
+            if key in self._spilled:
+                path = self._spill_path(key)
+                with open(path, "rb") as file:
+                    cells = bytearray(unpack_cells(file.read(), self.chunk_size**2))
+                os.remove(path)
+                self._spilled.discard(key)
+            chunk = self._chunks[key] = self._make_chunk(key, cells)
+        else:
+            self._chunks.move_to_end(key)
+        return chunk
+
+    def _spill_path(self, key):
+        """(str) Returns the file the chunk at key is spilled to."""
+        if self._spill_directory is None:
+            self._temporary = tempfile.TemporaryDirectory(prefix="pokemon-chunks-")
+            self._spill_directory = self._temporary.name
+        return os.path.join(self._spill_directory, f"{key[0]}_{key[1]}.pkch")
+
+    def _trim(self):
+        """Drop or spill the least recently used chunks beyond max_chunks.
+
+        Only called once a move or look is over, so no chunk in use goes.
+        """
+        while len(self._chunks) > self.max_chunks:
+            key, chunk = self._chunks.popitem(last=False)
+            if chunk.touched:
+                os.makedirs(os.path.dirname(self._spill_path(key)), exist_ok=True)
+                with open(self._spill_path(key), "wb") as file:
+                    file.write(pack_cells(bytes(chunk.cells)))
+                self._spilled.add(key)
+
+    def close(self):
+        """Remove the spilled chunks, and the spill directory if the board
+        made it. The board cannot be played afterwards."""
+        if self._temporary is not None:
+            self._temporary.cleanup()
+            self._temporary = None
+        else:
+            for key in self._spilled:
+                os.remove(self._spill_path(key))
+        self._spilled.clear()
+        self._chunks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _locate(self, row, col):
+        """(tuple<Chunk, int>) Returns the chunk holding a cell and the
+        cell's index within it."""
+        chunk_row, local_row = divmod(row, self.chunk_size)
+        chunk_col, local_col = divmod(col, self.chunk_size)
+        chunk = self._chunk((chunk_row, chunk_col))
+        return chunk, local_row * self.chunk_size + local_col
+
+    def get_cell(self, row, col):
+        """(str) Returns the character of the cell at row, col."""
+        chunk, index = self._locate(row, col)
+        code = chunk.cells[index]
+        self._trim()
+        if code == FLAG_BYTE:
+            return FLAG
+        if code == POKEMON_BYTE:
+            return POKEMON
+        return chr(code)
+
+    def count_at(self, row, col):
+        """(int) Returns the number of pokemons next to the cell at row, col."""
+        chunk, index = self._locate(row, col)
+        self._trim()
+        return chunk.counts[index]
+
+    def is_pokemon(self, row, col):
+        """(bool) Returns whether the cell at row, col holds a pokemon."""
+        chunk, index = self._locate(row, col)
+        self._trim()
+        return bool(chunk.pokemons[index])
+
+    def window(self, top, left, rows, cols):
+        """(list<str>) Returns the rows of cells from top, left, rows high and
+        cols wide, as the characters of a game string."""
+        return [
+            "".join(self.get_cell(row, col) for col in range(left, left + cols))
+            for row in range(top, top + rows)
+        ]
+
+    def get_num_exposed(self):
+        """(int) Returns the number of cells uncovered without a pokemon."""
+        return self._num_exposed
+
+    def get_num_attempted_catches(self):
+        """(int) Returns the number of pokeballs (flags) placed."""
+        return self._num_flags
+
+    def check_loss(self):
+        """(bool) Returns whether a pokemon has been exposed."""
+        return self._num_exposed_pokemon > 0
+
+    def stats(self):
+        """(dict<str, int>) Returns how many chunks are in memory and on
+        disk, and how many layouts are cached."""
+        return {
+            "chunks": len(self._chunks),
+            "touched": sum(chunk.touched for chunk in self._chunks.values()),
+            "spilled": len(self._spilled),
+            "layouts": len(self._layouts),
+        }
+
+    def toggle_flag(self, row, col):
+        """Toggle Flag on or off at row, col.
+
+        Returns:
+            (list<tuple<int, int>>): The cells that changed.
+        """
+        chunk, index = self._locate(row, col)
+        code = chunk.cells[index]
+        if code == FLAG_BYTE:
+            chunk.cells[index] = UNEXPOSED_BYTE
+            self._num_flags -= 1
+        elif code == UNEXPOSED_BYTE:
+            chunk.cells[index] = FLAG_BYTE
+            chunk.touched = True
+            self._num_flags += 1
+        else:
+            return []
+        self._trim()
+        return [(row, col)]
+
+    def reveal(self, row, col):
+        """Reveal the cell at row, col, flooding out from it if no pokemon is
+        next to it. Only covered cells can be revealed.
+
+        Returns:
+            (list<tuple<int, int>>): The cells that changed.
+        """
+        chunk, index = self._locate(row, col)
+        if chunk.cells[index] != UNEXPOSED_BYTE:
+            return []
+        chunk.touched = True
+        if chunk.pokemons[index]:
+            chunk.cells[index] = POKEMON_BYTE
+            self._num_exposed_pokemon += 1
+            self._trim()
+            return [(row, col)]
+        changed = self._flood([(row, col)])
+        self._trim()
+        return changed
+
+    def chord(self, row, col):
+        """Reveal every unflagged neighbour of the exposed number at row, col,
+        once as many flags as the number are placed around it.
+
+        Returns:
+            (list<tuple<int, int>>): The cells that changed, empty when the
+            number is not satisfied.
+        """
+        chunk, index = self._locate(row, col)
+        code = chunk.cells[index]
+        if not ZERO_BYTE <= code <= ZERO_BYTE + 8:
+            return []
+        around = [(row + dr, col + dc) for dr, dc in SQUARE_STEPS]
+        flags = 0
+        for r, c in around:
+            chunk, index = self._locate(r, c)
+            flags += chunk.cells[index] == FLAG_BYTE
+        if flags != code - ZERO_BYTE:
+            return []
+        covered = []
+        changed = []
+        for r, c in around:
+            chunk, index = self._locate(r, c)
+            if chunk.cells[index] != UNEXPOSED_BYTE:
+                continue
+            chunk.touched = True
+            if chunk.pokemons[index]:
+                chunk.cells[index] = POKEMON_BYTE
+                self._num_exposed_pokemon += 1
+                changed.append((r, c))
+            else:
+                covered.append((r, c))
+        changed.extend(self._flood(covered))
+        self._trim()
+        return changed
+
+    def _flood(self, starts):
+        """Uncover starts, which hold no pokemon, and keep going from every
+        uncovered cell with no pokemon next to it, across chunks, until
+        flood_limit cells are uncovered.
+
+        A cell is uncovered as soon as it is reached, so its covered state is
+        the only visited mark needed.
+
+        Returns:
+            (list<tuple<int, int>>): The cells uncovered.
+        """
+        size = self.chunk_size
+        changed = []
+        queue = deque()
+        # the chunk of the last cell looked at, since neighbours mostly share it
+        last_key = None
+        chunk = None
+        pending = list(starts)
+        while pending or queue:
+            if pending:
+                row, col = pending.pop()
+                neighbours = ((row, col),)
+            else:
+                row, col = queue.popleft()
+                neighbours = [(row + dr, col + dc) for dr, dc in SQUARE_STEPS]
+            for r, c in neighbours:
+                chunk_row, local_row = divmod(r, size)
+                chunk_col, local_col = divmod(c, size)
+                key = (chunk_row, chunk_col)
+                if key != last_key:
+                    chunk = self._chunk(key)
+                    last_key = key
+                index = local_row * size + local_col
+                if chunk.cells[index] != UNEXPOSED_BYTE:
+                    continue
+                count = chunk.counts[index]
+                chunk.cells[index] = ZERO_BYTE + count
+                chunk.touched = True
+                changed.append((r, c))
+                if count == 0:
+                    queue.append((r, c))
+            if len(changed) >= self.flood_limit:
+                break
+        self._num_exposed += len(changed)
+        return changed
+
+
+def wander(board, moves, rng):
+    """Play moves reveals, each near a cell uncovered so far, drifting
+    outwards like a player exploring the world. The player peeks at the
+    pokemons and flags them instead, so the game never ends.
+
+    Returns:
+        (int): The number of cells uncovered.
+    """
+    position = (0, 0)
+    uncovered = 0
+    for _ in range(moves):
+        row = position[0] + rng.randrange(-20, 21)
+        col = position[1] + rng.randrange(-20, 21) + 8
+        if board.is_pokemon(row, col):
+            board.toggle_flag(row, col)
+            continue
+        changed = board.reveal(row, col)
+        uncovered += len(changed)
+        if changed:
+            position = changed[-1]
+    return uncovered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Explore an endless board.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--moves", type=int, default=2000)
+    parser.add_argument("--density", type=float, default=DENSITY)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--max-chunks", type=int, default=MAX_CHUNKS)
+    parser.add_argument("--spill-directory", default=None)
+    args = parser.parse_args()
+
+    with EndlessBoard(
+        args.seed,
+        args.density,
+        args.chunk_size,
+        args.max_chunks,
+        args.spill_directory,
+    ) as board:
+        start = time.perf_counter()
+        uncovered = wander(board, args.moves, random.Random(args.seed))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{args.moves} moves uncovered {uncovered} cells in {elapsed:.2f}s",
+            board.stats(),
+        )
+
+
+if __name__ == "__main__":
+    main()
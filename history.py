@@ -0,0 +1,291 @@
+"""
+Move history for BoardModel: an append-only event log with periodic
+snapshots, for restart, undo/redo and replay to any move.
+
+Sessions can be streamed to a binary log as they are played. A session is a
+header (see SESSION) followed by one little endian 32 bit word per event:
+the cell index shifted left twice, with the action (REVEAL, FLAG, RESTART or
+CHORD) in the low bits. Two reserved words mark a truncation (followed by the number
+of events that are kept, written when a move is made after an undo) and the
+end of the session. Any number of sessions can follow each other in one file.
+"""
+
+import struct
+
+from model import UNEXPOSED, UNEXPOSED_BYTE, BoardModel
+from savefile import pack_cells, unpack_cells
+
+
+REVEAL = 0
+FLAG = 1
+RESTART = 2
+CHORD = 3
+MAGIC = b"PKEV"
+VERSION = 1
+SESSION = struct.Struct("<4sHIIQ")
+WORD = struct.Struct("<I")
+TRUNCATE = 0xFFFFFFFE
+END = 0xFFFFFFFF
+# snapshots kept before the older ones are thinned out
+MAX_SNAPSHOTS = 32
+
+
+class GameHistory:
+    """
+    this is GameHistory class
+    which plays moves on a BoardModel and remembers them.
+
+    A snapshot of the board is taken every snapshot_every events, so going to
+    any move only replays the events since the snapshot before it. Past
+    max_snapshots, old snapshots are dropped one at a time, so a long game
+    keeps a bounded number of them, spaced further apart the older the moves
+    are.
+    """
+
+    def __init__(
+        self, model, snapshot_every=64, log=None, max_snapshots=MAX_SNAPSHOTS
+    ):
+        """
+        Parameters:
+            model (BoardModel): The board to play on.
+            snapshot_every (int): Events between two snapshots.
+            log (file): A binary file the session is streamed to, or None.
+            max_snapshots (int): Snapshots kept before the older ones are
+            thinned out, at least 3.
+        """
+        self._model = model
+        self._snapshot_every = snapshot_every
+        self._max_snapshots = max(max_snapshots, 3)
+        self._events = []
+        self._position = 0
+        # pokemons are placed on the first reveal, unless the board already
+        # has cells showing, as a loaded game does
+        covered = model.get_num_unexposed() + model.get_num_attempted_catches()
+        self._placed = covered < model.grid_size**2
+        self._snapshots = {0: self._snapshot()}
+        self._log = log
+        # events already in the log, used to spot a branch after an undo
+        self._logged = 0
+        if log is not None:
+            log.write(
+                SESSION.pack(
+                    MAGIC,
+                    VERSION,
+                    model.grid_size,
+                    model.get_num_pokemon(),
+                    model.seed,
+                )
+            )
+
+    def get_events(self):
+        """(list<tuple<int, int>>) Returns the (action, index) moves played."""
+        return self._events[: self._position]
+
+    def get_position(self):
+        """(int) Returns the number of moves the board is showing."""
+        return self._position
+
+    def reveal(self, index):
+        """Reveal the cell at index. The first reveal of a game is always safe.
+
+        Returns:
+            (list<int>): The indexes that changed.
+        """
+        return self.play(REVEAL, index)
+
+    def flag(self, index):
+        """Toggle the flag at index.
+
+        Returns:
+            (list<int>): The indexes that changed.
+        """
+        return self.play(FLAG, index)
+
+    def chord(self, index):
+        """Reveal the neighbours of the satisfied number at index.
+
+        Returns:
+            (list<int>): The indexes that changed.
+        """
+        return self.play(CHORD, index)
+
+    def undo(self):
+        """Take back the last move. Returns False when there is none."""
+        if self._position == 0:
+            return False
+        self.goto(self._position - 1)
+        return True
+
+    def redo(self):
+        """Play the last undone move again. Returns False when there is none."""
+        if self._position == len(self._events):
+            return False
+        self.goto(self._position + 1)
+        return True
+
+    def restart(self):
+        """Cover every cell again, keeping the pokemons where they are.
+
+        This is a move of its own, so it can be undone.
+
+        Returns:
+            (list<int>): The indexes that changed.
+        """
+        return self.play(RESTART, 0)
+
+    def goto(self, position):
+        """Show the board as it was after position moves.
+
+        Parameters:
+            position (int): A move number between 0 and the number of moves.
+        """
+        if not 0 <= position <= len(self._events):
+            raise ValueError(f"there is no move {position}")
+        start = max(taken for taken in self._snapshots if taken <= position)
+        if not start <= self._position <= position:
+            # going back, or further ahead than the closest snapshot
+            cells, locations, placed, random_state = self._snapshots[start]
+            if self._model.get_pokemon_locations() != locations:
+                self._model.pokemon_locations = locations
+            self._model.set_cells(unpack_cells(cells, self._model.grid_size**2))
+            self._model.set_random_state(random_state)
+            self._placed = placed
+            self._position = start
+        for action, index in self._events[self._position : position]:
+            self._apply(action, index)
+        self._position = position
+
+    def close(self):
+        """Finish the session in the log, if there is one."""
+        if self._log is None:
+            return
+        if self._logged > self._position:
+            self._log.write(WORD.pack(TRUNCATE) + WORD.pack(self._position))
+        self._log.write(WORD.pack(END))
+        self._log.flush()
+        self._log = None
+
+    def play(self, action, index):
+        """Play a new move, dropping any undone moves after it.
+
+        Parameters:
+            action (int): REVEAL, FLAG, RESTART or CHORD.
+            index (int): The cell the move is made on.
+
+        Returns:
+            (list<int>): The indexes that changed. Moves that change nothing
+            are not recorded.
+        """
+        changed = self._apply(action, index)
+        if not changed:
+            return changed
+        if self._position < len(self._events):
+            del self._events[self._position :]
+            for position in list(self._snapshots):
+                if position > self._position:
+                    del self._snapshots[position]
+        self._events.append((action, index))
+        self._position += 1
+        if self._position % self._snapshot_every == 0:
+            self._snapshots[self._position] = self._snapshot()
+            if len(self._snapshots) > self._max_snapshots:
+                self._thin_snapshots()
+        if self._log is not None:
+            if self._logged > self._position - 1:
+                self._log.write(WORD.pack(TRUNCATE) + WORD.pack(self._position - 1))
+            self._log.write(WORD.pack(index << 2 | action))
+            self._logged = self._position
+        return changed
+
+    def _apply(self, action, index):
+        """Play one move on the board, without recording it."""
+        model = self._model
+        if action == FLAG:
+            return model.toggle_flag(index)
+        if action == CHORD:
+            return model.chord(index)
+        if action == RESTART:
+            cells = model.get_cells()
+            changed = [i for i, code in enumerate(cells) if code != UNEXPOSED_BYTE]
+            model.set_cells(bytes((UNEXPOSED_BYTE,)) * len(cells))
+            return changed
+        if not self._placed and model.get_cell(index) == UNEXPOSED:
+            model.place_pokemons(index)
+            self._placed = True
+        return model.reveal(index)
+
+    def _thin_snapshots(self):
+        """Drop the snapshot whose neighbours are closest together for its
+        age, so the gaps grow with the age of the moves: recent moves stay
+        quick to undo and old ones are never far from a snapshot. The first
+        and the last snapshot are always kept."""
+        positions = sorted(self._snapshots)
+        newest = positions[-1]
+        drop = min(
+            range(1, len(positions) - 1),
+            key=lambda i: (positions[i + 1] - positions[i - 1])
+            / (newest - positions[i]),
+        )
+        del self._snapshots[positions[drop]]
+
+    def _snapshot(self):
+        """The board as it is now, packed at 4 bits per cell."""
+        return (
+            pack_cells(self._model.get_cells()),
+            self._model.get_pokemon_locations(),
+            self._placed,
+            self._model.get_random_state(),
+        )
+
+
+def read_sessions(file):
+    """Read the sessions streamed to a log, one at a time.
+
+    Parameters:
+        file (file): A binary file written by GameHistory.
+
+    Returns:
+        (iterator<dict>): The grid size, pokemon count, seed and the list of
+        (action, index) moves of each session.
+    """
+    while True:
+        header = file.read(SESSION.size)
+        if len(header) < SESSION.size:
+            return
+        magic, version, grid_size, num_pokemon, seed = SESSION.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("not a pokemon session log")
+        if version > VERSION:
+            raise ValueError("session log was written by a newer version")
+        moves = []
+        while True:
+            data = file.read(WORD.size)
+            if len(data) < WORD.size:
+                break
+            (word,) = WORD.unpack(data)
+            if word == END:
+                break
+            if word == TRUNCATE:
+                (kept,) = WORD.unpack(file.read(WORD.size))
+                del moves[kept:]
+                continue
+            moves.append((word & 3, word >> 2))
+        yield {
+            "grid_size": grid_size,
+            "num_pokemon": num_pokemon,
+            "seed": seed,
+            "moves": moves,
+        }
+
+
+def replay(session):
+    """Play a session read by read_sessions on a fresh board.
+
+    Returns:
+        (BoardModel): The board after the last move.
+    """
+    model = BoardModel(session["grid_size"], session["num_pokemon"], session["seed"])
+    history = GameHistory(model)
+    for action, index in session["moves"]:
+        history.play(action, index)
+    return model
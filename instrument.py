@@ -0,0 +1,194 @@
+"""
+Optional timers and counters around the slow phases of a move.
+
+Modules name the methods worth watching with watch(). Nothing is wrapped
+until enable() is called, so while instrumentation is off every watched
+method is the plain function and the hot loops pay nothing for it. Once
+enabled, each call records into its phase: the call count, the cells it
+touched, the canvas items it created and a latency histogram in power of
+two microsecond buckets.
+
+    instrument.enable()
+    ...
+    instrument.write_json("profile.json", instrument.report())
+"""
+
+import csv
+import functools
+import json
+import threading
+import time
+
+
+# latency buckets: bucket b counts calls under 2**b microseconds
+BUCKETS = 32
+
+_watched = []
+_phases = {}
+_originals = {}
+_lock = threading.Lock()
+
+
+class Phase:
+    """
+    this is Phase class
+    which adds up the calls of one watched method.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.cells = 0
+        self.items = 0
+        self.seconds = 0.0
+        self.histogram = [0] * BUCKETS
+
+    def record(self, nanoseconds, cells=0, items=0):
+        """Count one call that took nanoseconds."""
+        self.calls += 1
+        self.cells += cells
+        self.items += items
+        self.seconds += nanoseconds / 1e9
+        bucket = min((nanoseconds // 1000).bit_length(), BUCKETS - 1)
+        self.histogram[bucket] += 1
+
+    def merge(self, data):
+        """Add in a phase exported by as_dict, from another process."""
+        self.calls += data["calls"]
+        self.cells += data["cells"]
+        self.items += data["items"]
+        self.seconds += data["seconds"]
+        for bucket, count in enumerate(data["histogram"]):
+            self.histogram[bucket] += count
+
+    def percentile(self, fraction):
+        """(float) Returns the upper bound, in microseconds, of the bucket
+        holding the given fraction of the calls."""
+        wanted = fraction * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= wanted:
+                return float(2**bucket)
+        return 0.0
+
+    def as_dict(self):
+        """(dict) Returns the phase as plain data."""
+        return {
+            "phase": self.name,
+            "calls": self.calls,
+            "cells": self.cells,
+            "items": self.items,
+            "seconds": round(self.seconds, 6),
+            "mean_us": round(self.seconds * 1e6 / self.calls, 3) if self.calls else 0,
+            "p50_us": self.percentile(0.5),
+            "p99_us": self.percentile(0.99),
+            "histogram": list(self.histogram),
+        }
+
+
+def watch(cls, name, phase=None, cells=None, items=None):
+    """Name a method to instrument once enable() is called.
+
+    Parameters:
+        cls (type): The class the method is defined on.
+        name (str): The method name.
+        phase (str): The name to record under, "Class.name" by default.
+        cells (callable): Takes the result of a call and returns the number
+        of cells it touched, None to only count calls.
+        items (callable): The same for canvas items created.
+    """
+    if phase is None:
+        phase = f"{cls.__name__}.{name}"
+    _watched.append((cls, name, phase, cells, items))
+    if _originals:
+        _wrap(cls, name, phase, cells, items)
+
+
+def _wrap(cls, name, phase_name, cells, items):
+    """Put a recording wrapper around one watched method."""
+    original = cls.__dict__[name]
+    phase = _phases.setdefault(phase_name, Phase(phase_name))
+    clock = time.perf_counter_ns
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        result = original(*args, **kwargs)
+        elapsed = clock() - start
+        with _lock:
+            phase.record(
+                elapsed,
+                cells(result) if cells is not None else 0,
+                items(result) if items is not None else 0,
+            )
+        return result
+
+    _originals[(cls, name)] = original
+    setattr(cls, name, wrapper)
+
+
+def enabled():
+    """(bool) Returns whether the watched methods are being recorded."""
+    return bool(_originals)
+
+
+def enable():
+    """Start recording every watched method."""
+    if _originals:
+        return
+    for cls, name, phase, cells, items in _watched:
+        _wrap(cls, name, phase, cells, items)
+
+
+def disable():
+    """Stop recording and put the plain methods back."""
+    for (cls, name), original in _originals.items():
+        setattr(cls, name, original)
+    _originals.clear()
+
+
+def reset():
+    """Forget everything recorded so far."""
+    with _lock:
+        for phase in _phases.values():
+            phase.__init__(phase.name)
+
+
+def report():
+    """(list<dict>) Returns every phase that was called, as plain data."""
+    with _lock:
+        return [phase.as_dict() for phase in _phases.values() if phase.calls]
+
+
+def take():
+    """(list<dict>) Returns the report and starts counting from zero."""
+    data = report()
+    reset()
+    return data
+
+
+def merge(data):
+    """Add in a report from another process."""
+    with _lock:
+        for entry in data:
+            name = entry["phase"]
+            _phases.setdefault(name, Phase(name)).merge(entry)
+
+
+def write_json(path, data):
+    """Write a report to path as JSON."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+
+
+def write_csv(path, data):
+    """Write a report to path as CSV, one row per phase and one column per
+    histogram bucket."""
+    columns = ["phase", "calls", "cells", "items", "seconds", "mean_us"]
+    columns += ["p50_us", "p99_us"]
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns + [f"under_{2**b}us" for b in range(BUCKETS)])
+        for entry in data:
+            writer.writerow([entry[c] for c in columns] + entry["histogram"])
@@ -0,0 +1,197 @@
+"""
+Load test for server.py.
+
+Every simulated player holds a connection, starts a game and reveals random
+covered cells, starting a new game whenever one ends. Players only know what
+the server sends back, the changed cells of each move. The test is run at
+growing numbers of simultaneous games and reports, per level, the moves per
+second and the median and p99 latency of a move.
+
+    python loadtest.py --games 1 10 100 500 --seconds 5
+    python loadtest.py --port 8765       # against a running server
+
+Without --port or --unix a server is started in this process. Its games are
+evicted after --idle-timeout seconds without a move, far sooner than a real
+server would, so the numbers include saving and loading idle games.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+
+import server
+from model import UNEXPOSED
+
+
+# seconds a game of the built-in server is left idle before it is evicted
+IDLE_TIMEOUT = 0.02
+
+
+async def player(connect, grid_size, num_pokemon, seed, deadline, latencies):
+    """Play games until deadline, adding the latency of every move to
+    latencies."""
+    reader, writer = await connect()
+    rng = random.Random(seed)
+    request_id = 0
+
+    async def call(request):
+        nonlocal request_id
+        request_id += 1
+        request["id"] = request_id
+        writer.write(json.dumps(request, separators=(",", ":")).encode() + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    try:
+        while time.monotonic() < deadline:
+            answer = await call(
+                {
+                    "op": "new",
+                    "grid_size": grid_size,
+                    "num_pokemon": num_pokemon,
+                    "seed": rng.randrange(2**32),
+                }
+            )
+            game = answer["game"]
+            covered = bytearray(b"\x01") * grid_size**2
+            # cells that may still be covered, pruned as they are picked
+            cells = list(range(grid_size**2))
+            state = server.PLAYING
+            while state == server.PLAYING and cells:
+                if time.monotonic() >= deadline:
+                    break
+                pick = rng.randrange(len(cells))
+                index = cells[pick]
+                cells[pick] = cells[-1]
+                cells.pop()
+                if not covered[index]:
+                    continue
+                start = time.perf_counter()
+                answer = await call({"op": "reveal", "game": game, "index": index})
+                latencies.append(time.perf_counter() - start)
+                state = answer["state"]
+                for i, character in answer["changed"]:
+                    if character != UNEXPOSED:
+                        covered[i] = 0
+            await call({"op": "close", "game": game})
+    finally:
+        writer.close()
+
+
+async def measure(connect, games, grid_size, num_pokemon, seconds):
+    """Run games players at once for seconds.
+
+    Returns:
+        (dict): The moves per second and latency percentiles in ms.
+    """
+    latencies = []
+    deadline = time.monotonic() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            player(connect, grid_size, num_pokemon, seed, deadline, latencies)
+            for seed in range(games)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    result = {
+        "games": games,
+        "moves": len(latencies),
+        "moves_per_second": round(len(latencies) / elapsed, 1),
+    }
+    if latencies:
+        result["p50_ms"] = round(statistics.median(latencies) * 1000, 3)
+        result["p99_ms"] = round(latencies[int(len(latencies) * 0.99)] * 1000, 3)
+    return result
+
+
+async def run(
+    levels,
+    grid_size,
+    num_pokemon,
+    seconds,
+    host,
+    port,
+    unix,
+    idle_timeout=IDLE_TIMEOUT,
+):
+    """Measure every level of simultaneous games, printing one JSON line each.
+
+    Parameters:
+        idle_timeout (float): Seconds without a move before the built-in
+        server evicts a game.
+
+    Returns:
+        (list<dict>): The result of each level, with the games the built-in
+        server evicted during it.
+    """
+    local = None
+    directory = None
+    evictor = None
+    if port is None and unix is None:
+        directory = tempfile.TemporaryDirectory(prefix="pokemon-evicted-")
+        game_server = server.GameServer(directory.name, idle_timeout)
+        local = await server.start(game_server, host, 0)
+        port = local.sockets[0].getsockname()[1]
+        evictor = asyncio.create_task(
+            game_server.evict_forever(min(idle_timeout / 4, 60.0))
+        )
+
+    def connect():
+        if unix is not None:
+            return asyncio.open_unix_connection(unix, limit=server.LINE_LIMIT)
+        return asyncio.open_connection(host, port, limit=server.LINE_LIMIT)
+
+    results = []
+    try:
+        for games in levels:
+            if local is not None:
+                evictions = game_server.num_evictions()
+            result = await measure(connect, games, grid_size, num_pokemon, seconds)
+            if local is not None:
+                result["evicted"] = game_server.num_evictions() - evictions
+            print(json.dumps(result), flush=True)
+            results.append(result)
+    finally:
+        if evictor is not None:
+            evictor.cancel()
+        if local is not None:
+            local.close()
+            await local.wait_closed()
+        if directory is not None:
+            directory.cleanup()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the game server.")
+    parser.add_argument("--games", nargs="+", type=int, default=[1, 10, 100, 500])
+    parser.add_argument("--grid-size", type=int, default=10)
+    parser.add_argument("--pokemons", type=int, default=15)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--unix", default=None)
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT)
+    args = parser.parse_args()
+    asyncio.run(
+        run(
+            args.games,
+            args.grid_size,
+            args.pokemons,
+            args.seconds,
+            args.host,
+            args.port,
+            args.unix,
+            args.idle_timeout,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,801 @@
+import random
+from collections import deque
+
+import instrument
+from regions import ZeroRegions
+from topology import BORDER, get_topology
+
+
+ALPHA = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+UP = "up"
+DOWN = "down"
+LEFT = "left"
+RIGHT = "right"
+DIRECTIONS = (
+    UP,
+    DOWN,
+    LEFT,
+    RIGHT,
+    f"{UP}-{LEFT}",
+    f"{UP}-{RIGHT}",
+    f"{DOWN}-{LEFT}",
+    f"{DOWN}-{RIGHT}",
+)
+WALL_VERTICAL = "|"
+WALL_HORIZONTAL = "-"
+POKEMON = "☺"
+FLAG = "♥"
+UNEXPOSED = "~"
+EXPOSED = "0"
+INVALID = "That ain't a valid action buddy."
+# single byte stand-ins for the non ascii characters in the board buffer
+FLAG_BYTE = ord("F")
+POKEMON_BYTE = ord("P")
+UNEXPOSED_BYTE = ord(UNEXPOSED)
+ZERO_BYTE = ord("0")
+# turns a buffer of adjacency counts into the digits shown on the board
+DIGITS = bytes((ZERO_BYTE + count) & 0xFF for count in range(256))
+# runs per row of board an opening may have before a reveal labels the whole
+# board rather than following the opening alone, which costs more per run
+AROUND_RUNS = 8
+
+
+def sample_pokemons(rng, grid_size, number_of_pokemons, safe_index=None, topology=None):
+    """Draw the pokemon indexes of a board in one go from rng.
+
+    Parameters:
+        rng (random.Random): The board's random generator.
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons that the game will have.
+        safe_index (int): A cell that, together with its neighbours, is kept
+        free of pokemons when the board has room for it.
+        topology (Topology): The shape of the board, square when None.
+
+    Returns:
+        (tuple<int>): The indexes of the pokemons.
+    """
+    cell_count = grid_size**2
+    number_of_pokemons = min(number_of_pokemons, cell_count)
+    safe = set()
+    if safe_index is not None:
+        if topology is None:
+            topology = get_topology("square", grid_size)
+        safe = set(topology.area(safe_index))
+        if number_of_pokemons + len(safe) > cell_count:
+            safe = {safe_index}
+        if number_of_pokemons + len(safe) > cell_count:
+            safe = set()
+
+    # a random order of k + len(safe) cells, minus the safe ones, is still
+    # a uniform choice of k cells outside the safe zone
+    sample = rng.sample(range(cell_count), number_of_pokemons + len(safe))
+    if safe:
+        sample = [index for index in sample if index not in safe]
+    return tuple(sample[:number_of_pokemons])
+
+
+class BoardModel:
+    """
+    this is BoardModel class
+    to display the game with strings.
+    """
+
+    # whether reveals on a zero cell look its region up in zero_regions()
+    # rather than searching for it
+    use_regions = True
+
+    def __init__(
+        self,
+        grid_size,
+        num_pokemon,
+        seed=None,
+        pokemon_locations=None,
+        topology="square",
+        cells=None,
+    ):
+        """
+        Parameters:
+            grid_size (int): The grid size of the game.
+            num_pokemon (int): The number of pokemons on the board.
+            seed (int): Seed of the board's random generator, None for any.
+            pokemon_locations (tuple<int>): The pokemons, generated when None.
+            topology (str): The shape of the board, a key of TOPOLOGIES.
+            cells (bytearray): The board buffer to start from, as from
+            get_cells, all covered when None. A bytearray is used, not copied.
+        """
+        self.grid_size = grid_size
+        self.num_pokemon = num_pokemon
+        # shared neighbour tables of the board shape, see topology.py
+        self.topology = get_topology(topology, grid_size)
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._pokemon_locations = ()
+        if cells is None:
+            cells = bytearray((UNEXPOSED_BYTE,)) * grid_size**2
+        elif not isinstance(cells, bytearray):
+            cells = bytearray(cells)
+        self._cells = cells
+        self._game = None
+        # setting the pokemons counts the cells up
+        if pokemon_locations is None:
+            pokemon_locations = self.generate_pokemons(grid_size, num_pokemon)
+        self.pokemon_locations = pokemon_locations
+
+    @property
+    def pokemon_locations(self):
+        """(tuple<int>) The indexes of the pokemons on this board."""
+        return self._pokemon_locations
+
+    @pokemon_locations.setter
+    def pokemon_locations(self, pokemon_locations):
+        self._pokemon_locations = pokemon_locations
+        self._counts = bytearray(self.grid_size**2)
+        self._pokemon_cells = bytearray(self.grid_size**2)
+        for location in pokemon_locations:
+            self._adjust_count(location, 1)
+            self._pokemon_cells[location] = 1
+        self._regions = None
+        self._recount()
+
+    def _adjust_count(self, location, step):
+        """Add step to the adjacency count of every neighbour of location.
+
+        Parameters:
+            location (int): The index of a pokemon being added or removed.
+            step (int): 1 when a pokemon is added, -1 when it is removed.
+        """
+        counts = self._counts
+        for neighbour in self.topology.neighbours(location):
+            counts[neighbour] += step
+
+    def _recount(self):
+        """Work out the running counters from scratch."""
+        self._num_unexposed = self._cells.count(UNEXPOSED_BYTE)
+        self._num_flags = self._cells.count(FLAG_BYTE)
+        self._num_caught = 0
+        self._num_exposed_pokemon = 0
+        for location in self._pokemon_locations:
+            if self._cells[location] == FLAG_BYTE:
+                self._num_caught += 1
+            elif self._cells[location] != UNEXPOSED_BYTE:
+                self._num_exposed_pokemon += 1
+
+    def _tally(self, index, code, step):
+        """Add step to the counters that a cell holding code belongs to."""
+        if code == UNEXPOSED_BYTE:
+            self._num_unexposed += step
+        elif code == FLAG_BYTE:
+            self._num_flags += step
+            if self._pokemon_cells[index]:
+                self._num_caught += step
+        elif self._pokemon_cells[index]:
+            self._num_exposed_pokemon += step
+
+    def zero_regions(self):
+        """(ZeroRegions) Returns the zero regions of this board's pokemons,
+        labelling them on the first call after the pokemons move.
+
+        Until this was called, reveals follow only the opening clicked, so the
+        click that places the pokemons does not pay for the labels unless its
+        opening spans most of the board. Callers label the board away from the
+        clicks, e.g. on a worker.
+        """
+        if self._regions is None:
+            self._regions = ZeroRegions(
+                self.topology, self._counts, self._pokemon_locations
+            )
+        return self._regions
+
+    def _region_spans(self, game, index):
+        """Look up what a click on index uncovers in zero_regions().
+
+        Parameters:
+            game (str | bytearray): The board, as a game string or buffer.
+            index (int): Index of the currently selected cell.
+
+        Returns:
+            (list<tuple<int, int>>): The [start, end) ranges uncovered, or None
+            when the index cannot answer: index is not a zero cell, or a flag
+            sits on a zero cell of its region and may cut the flood short.
+        """
+        if (
+            not self.use_regions
+            or self._counts[index]
+            or self._pokemon_cells[index]
+        ):
+            return None
+        regions = self._regions
+        if regions is None:
+            # until the board is labelled only the opening clicked is followed,
+            # unless it has so many runs that labelling the board costs no more
+            regions = ZeroRegions.around(
+                self.topology,
+                self._counts,
+                self._pokemon_cells,
+                index,
+                limit=AROUND_RUNS * self.grid_size,
+            )
+            if regions is None:
+                regions = self.zero_regions()
+        label = regions.region(index)
+        flag = FLAG if isinstance(game, str) else FLAG_BYTE
+        # there are seldom more flags than pokemons, far fewer than runs
+        if game is self._cells and not self._num_flags:
+            location = -1
+        else:
+            location = game.find(flag)
+        while location != -1:
+            if regions.region(location) == label:
+                return None
+            location = game.find(flag, location + 1)
+        return regions.spans(label)
+
+    def count_at(self, index):
+        """(int) Returns the number of pokemons next to the cell at index."""
+        return self._counts[index]
+
+    @property
+    def game(self):
+        """(str) The game string, built from the board buffer."""
+        return self.get_game()
+
+    @game.setter
+    def game(self, game):
+        self._cells = bytearray(
+            game.replace(FLAG, chr(FLAG_BYTE)).replace(POKEMON, chr(POKEMON_BYTE)),
+            "ascii",
+        )
+        self._game = game
+        self._recount()
+
+    def get_game(self):
+        """(str) Returns the game string.
+
+        The string is only rebuilt from the board buffer after a cell changed.
+        """
+        if self._game is None:
+            self._game = (
+                self._cells.decode("ascii")
+                .replace(chr(FLAG_BYTE), FLAG)
+                .replace(chr(POKEMON_BYTE), POKEMON)
+            )
+        return self._game
+
+    def get_random_state(self):
+        """Returns the state of this board's random generator."""
+        return self._random.getstate()
+
+    def set_random_state(self, state):
+        """Put this board's random generator back to a state from
+        get_random_state."""
+        self._random.setstate(state)
+
+    def get_cells(self):
+        """(bytes) Returns a copy of the board buffer, one byte per cell."""
+        return bytes(self._cells)
+
+    def set_cells(self, cells):
+        """Replace the whole board buffer.
+
+        Parameters:
+            cells (bytes): One byte per cell, as returned by get_cells.
+        """
+        self._cells = bytearray(cells)
+        self._game = None
+        self._recount()
+
+    def get_cell(self, index):
+        """(str) Returns the character of the cell at index."""
+        code = self._cells[index]
+        if code == FLAG_BYTE:
+            return FLAG
+        if code == POKEMON_BYTE:
+            return POKEMON
+        return chr(code)
+
+    def set_cell(self, index, character):
+        """Replace the cell at index in place.
+
+        Parameters:
+            index (int): The index in the game string.
+            character (str): The new character of the cell.
+        """
+        if character == FLAG:
+            code = FLAG_BYTE
+        elif character == POKEMON:
+            code = POKEMON_BYTE
+        else:
+            code = ord(character)
+        self._tally(index, self._cells[index], -1)
+        self._tally(index, code, 1)
+        self._cells[index] = code
+        self._game = None
+
+    def get_pokemon_locations(self):
+        """(str) Returns the pokemon locations."""
+        return self.pokemon_locations
+
+    def get_num_attempted_catches(self):
+        """(int) Returns the number of pokeballs (flags) placed."""
+        return self._num_flags
+
+    def get_num_caught(self):
+        """(int) Returns the number of pokeballs placed on a pokemon."""
+        return self._num_caught
+
+    def get_num_unexposed(self):
+        """(int) Returns the number of cells still covered in grass."""
+        return self._num_unexposed
+
+    def get_num_pokemon(self):
+        """(str) Returns the number of pokemon."""
+        return self.num_pokemon
+
+    def check_loss(self):
+        """select (bool): if a pokemon has been exposed"""
+        return self._num_exposed_pokemon > 0
+
+    def generate_pokemons(self, grid_size, number_of_pokemons, safe_index=None):
+        """Pokemons will be generated and given a random index within the game.
+
+        The indexes are drawn in one go from this board's seeded random
+        generator, so the same seed always gives the same board.
+
+        Parameters:
+            grid_size (int): The grid size of the game.
+            number_of_pokemons (int): The number of pokemons that the game will have.
+            safe_index (int): A cell that, together with its neighbours, is kept
+            free of pokemons when the board has room for it.
+
+        Returns:
+            (tuple<int>): A tuple containing  indexes where the pokemons are
+            created for the game string.
+        """
+        topology = self.topology if grid_size == self.grid_size else None
+        return sample_pokemons(
+            self._random, grid_size, number_of_pokemons, safe_index, topology
+        )
+
+    def place_pokemons(self, safe_index=None):
+        """Place this board's pokemons again, keeping safe_index clear.
+
+        Used on the first click so that it never lands on a pokemon.
+
+        Parameters:
+            safe_index (int): Index of the first selected cell.
+        """
+        self.pokemon_locations = self.generate_pokemons(
+            self.grid_size, self.num_pokemon, safe_index
+        )
+
+    def position_to_index(self, position, grid_size):
+        """Convert the row, column coordinate in the grid to the game strings index.
+
+        Parameters:
+            position (tuple<int, int>): The row, column position of a cell.
+            grid_size (int): The grid size of the game.
+
+        Returns:
+            (int): The index of the cell in the game string.
+        """
+        x, y = position
+        return x * grid_size + y
+
+    def replace_character_at_index(self, game, index, character):
+        """A specified index in the game string at the specified index is replaced by
+        a new character.
+        Parameters:
+            game (str): The game string.
+            index (int): The index in the game string where the character is replaced.
+            character (str): The new character that will be replacing the old character.
+
+        Returns:
+            (str): The updated game string.
+        """
+        return game[:index] + character + game[index + 1 :]
+
+    def flag_cell(self, game, index):
+        """Toggle Flag on or off at selected index. If the selected index is already
+        revealed, the game would return with no changes.
+
+        Parameters:
+            game (str): The game string.
+            index (int): The index in the game string where a flag is placed.
+        Returns
+            (str): The updated game string.
+        """
+        if game[index] == FLAG:
+            game = self.replace_character_at_index(game, index, UNEXPOSED)
+
+        elif game[index] == UNEXPOSED:
+            game = self.replace_character_at_index(game, index, FLAG)
+
+        return game
+
+    def toggle_flag(self, index):
+        """Toggle Flag on or off at index of this board in place.
+
+        Parameters:
+            index (int): The index in the game string where a flag is placed.
+
+        Returns:
+            (list<int>): The indexes that changed.
+        """
+        character = self.get_cell(index)
+        if character == FLAG:
+            self.set_cell(index, UNEXPOSED)
+        elif character == UNEXPOSED:
+            self.set_cell(index, FLAG)
+        else:
+            return []
+        return [index]
+
+    def index_in_direction(self, index, grid_size, direction):
+        """The index in the game string is updated by determining the
+        adjacent cell given the direction.
+        The index of the adjacent cell in the game is then calculated and returned.
+
+        For example:
+          | 1 | 2 | 3 |
+        A | i | j | k |
+        B | l | m | n |
+        C | o | p | q |
+
+        The index of m is 4 in the game string.
+        if the direction specified is "up" then:
+        the updated position corresponds with j which has the index of 1 in the game string.
+
+        Parameters:
+            index (int): The index in the game string.
+            grid_size (int): The grid size of the game.
+            direction (str): The direction of the adjacent cell.
+
+        Returns:
+            (int): The index in the game string corresponding to the new cell position
+            in the game.
+
+            None for invalid direction.
+        """
+        col = index % grid_size
+        row = index // grid_size
+        if RIGHT in direction:
+            col += 1
+        elif LEFT in direction:
+            col -= 1
+        # Notice the use of if, not elif here
+        if UP in direction:
+            row -= 1
+        elif DOWN in direction:
+            row += 1
+        if not (0 <= col < grid_size and 0 <= row < grid_size):
+            return None
+        return self.position_to_index((row, col), grid_size)
+
+    def neighbour_directions(self, index, grid_size):
+        """Seek out all direction that has a neighbouring cell.
+
+        Parameters:
+            index (int): The index in the game string.
+            grid_size (int): The grid size of the game.
+
+        Returns:
+            (list<int>): A list of index that has a neighbouring cell.
+        """
+        return self.get_topology(grid_size).neighbours(index)
+
+    def get_topology(self, grid_size):
+        """(Topology) Returns this board's topology, or the square one for
+        another grid size."""
+        if grid_size == self.grid_size:
+            return self.topology
+        return get_topology("square", grid_size)
+
+    def number_at_cell(self, game, pokemon_locations, grid_size, index):
+        """Calculates what number should be displayed at that specific index in the game.
+
+        Parameters:
+            game (str): Game string.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            grid_size (int): Size of game.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (int): Number to be displayed at the given index in the game string.
+        """
+        if game[index] != UNEXPOSED:
+            return int(game[index])
+
+        if (
+            pokemon_locations is self._pokemon_locations
+            and grid_size == self.grid_size
+        ):
+            return self._counts[index]
+
+        number = 0
+        for neighbour in self.get_topology(grid_size).neighbours(index):
+            if neighbour in pokemon_locations:
+                number += 1
+
+        return number
+
+    def check_win(self, game=None, pokemon_locations=None):
+        """Checking if the player has won the game.
+
+        Without arguments this board's running counters are used.
+
+        Parameters:
+            game (str): Game string.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+
+        Returns:
+            (bool): True if the player has won the game, false if not.
+
+        """
+        if game is None and pokemon_locations is None:
+            return self._num_unexposed == 0 and self._num_flags == len(
+                self._pokemon_locations
+            )
+        return UNEXPOSED not in game and game.count(FLAG) == len(pokemon_locations)
+
+    def reveal_cells(self, game, grid_size, pokemon_locations, index):
+        """Reveals all neighbouring cells at index and repeats for all
+        cells that had a 0.
+
+        Does not reveal flagged cells or cells with Pokemon.
+
+        Parameters:
+            game (str): Game string.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            grid_size (int): Size of game.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (str): The updated game string
+        """
+        if (
+            pokemon_locations is self._pokemon_locations
+            and grid_size == self.grid_size
+        ):
+            spans = self._region_spans(game, index)
+            if spans is not None:
+                return self._uncover_game(game, spans)
+
+        number = self.number_at_cell(game, pokemon_locations, grid_size, index)
+        game = self.replace_character_at_index(game, index, str(number))
+        clear = self.big_fun_search(game, grid_size, pokemon_locations, index)
+        for i in clear:
+            if game[i] != FLAG:
+                number = self.number_at_cell(game, pokemon_locations, grid_size, i)
+                game = self.replace_character_at_index(game, i, str(number))
+
+        return game
+
+    def _uncover_game(self, game, spans):
+        """(str) Returns game with the covered cells in spans showing their
+        numbers, one slice per span."""
+        counts = self._counts
+        parts = []
+        last = 0
+        for start, end in spans:
+            parts.append(game[last:start])
+            digits = counts[start:end].translate(DIGITS).decode("ascii")
+            old = game[start:end]
+            if FLAG in old:
+                digits = "".join(
+                    character if character == FLAG else digit
+                    for character, digit in zip(old, digits)
+                )
+            parts.append(digits)
+            last = end
+        parts.append(game[last:])
+        return "".join(parts)
+
+    def _uncover(self, spans):
+        """Show the numbers of the covered cells in spans of this board in
+        place, one slice per span where no flag is in the way.
+
+        Returns:
+            (list<int>): The indexes that changed.
+        """
+        cells = self._cells
+        counts = self._counts
+        changed = []
+        for start, end in spans:
+            old = cells[start:end]
+            covered = old.count(UNEXPOSED_BYTE)
+            if not covered:
+                continue
+            digits = counts[start:end].translate(DIGITS)
+            if covered == end - start:
+                cells[start:end] = digits
+                changed.extend(range(start, end))
+                continue
+            # cells already showing hold their digit, flags are kept
+            for i in range(start, end):
+                if cells[i] == UNEXPOSED_BYTE:
+                    cells[i] = digits[i - start]
+                    changed.append(i)
+        # no pokemon is next to a zero region, so only covered cells changed
+        self._num_unexposed -= len(changed)
+        self._game = None
+        return changed
+
+    def reveal(self, index):
+        """Reveal the cell at index of this board in place, together with the
+        cells reveal_cells would clear around it.
+
+        Only covered cells can be revealed, anything else is left alone.
+
+        Parameters:
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (list<int>): The indexes that changed.
+        """
+        if self._cells[index] != UNEXPOSED_BYTE:
+            return []
+        spans = self._region_spans(self._cells, index)
+        if spans is not None:
+            return self._uncover(spans)
+        game = self.get_game()
+        number = self.number_at_cell(
+            game, self.pokemon_locations, self.grid_size, index
+        )
+        self.set_cell(index, str(number))
+        changed = [index]
+        clear = self.big_fun_search(
+            game, self.grid_size, self.pokemon_locations, index
+        )
+        for i in clear:
+            # the flood also passes cells that are already showing their number
+            if i != index and game[i] == UNEXPOSED:
+                number = self.number_at_cell(
+                    game, self.pokemon_locations, self.grid_size, i
+                )
+                self.set_cell(i, str(number))
+                changed.append(i)
+        return changed
+
+    def chord(self, index):
+        """Reveal every unflagged neighbour of the exposed number at index,
+        once as many flags as the number are placed around it.
+
+        All the neighbours and the cells their zeros clear are found in one
+        pass over a shared visited map, so the board changes once.
+
+        Parameters:
+            index (int): Index of an exposed number.
+
+        Returns:
+            (list<int>): The indexes that changed, empty when the number is
+            not satisfied.
+        """
+        cells = self._cells
+        code = cells[index]
+        if not ZERO_BYTE <= code <= ZERO_BYTE + 8:
+            return []
+        topology = self.topology
+        around = topology.neighbours(index)
+        flags = sum(cells[neighbour] == FLAG_BYTE for neighbour in around)
+        if flags != code - ZERO_BYTE:
+            return []
+
+        classes = topology.classes
+        offsets = topology.offsets
+        border = topology.border
+        counts = self._counts
+        discovered = bytearray(len(cells))
+        discovered[index] = 1
+        changed = []
+        queue = deque()
+        for neighbour in around:
+            discovered[neighbour] = 1
+            if cells[neighbour] == UNEXPOSED_BYTE:
+                changed.append(neighbour)
+                if counts[neighbour] == 0 and not self._pokemon_cells[neighbour]:
+                    queue.append(neighbour)
+        while queue:
+            node = queue.popleft()
+            cls = classes[node]
+            if cls == BORDER:
+                neighbours = border[node]
+            else:
+                neighbours = [node + offset for offset in offsets[cls]]
+            for neighbour in neighbours:
+                if discovered[neighbour]:
+                    continue
+                discovered[neighbour] = 1
+                # a flood never passes flags or cells already showing
+                if cells[neighbour] == UNEXPOSED_BYTE:
+                    changed.append(neighbour)
+                    if counts[neighbour] == 0:
+                        queue.append(neighbour)
+
+        for i in changed:
+            self.set_cell(i, str(counts[i]))
+        return changed
+
+    def reveal_pokemons(self):
+        """Show every pokemon on the board in place.
+
+        Returns:
+            (list<int>): The indexes that changed.
+        """
+        for location in self.pokemon_locations:
+            self.set_cell(location, POKEMON)
+        return list(self.pokemon_locations)
+
+    def big_fun_search(self, game, grid_size, pokemon_locations, index):
+        """Searching adjacent cells to see if there are any Pokemon"s present.
+
+        Using some sick algorithms.
+
+        Find all cells which should be revealed when a cell is selected.
+
+        For cells which have a zero value (i.e. no neighbouring pokemons) all the cell"s
+        neighbours are revealed. If one of the neighbouring cells is also zero then
+        all of that cell"s neighbours are also revealed. This repeats until no
+        zero value neighbours exist.
+
+        For cells which have a non-zero value (i.e. cells with neighbour pokemons), only
+        the cell itself is revealed.
+
+        Parameters:
+            game (str): Game string.
+            grid_size (int): Size of game.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (list<int>): List of cells to turn visible.
+        """
+        if game[index] == FLAG:
+            return [index]
+
+        number = self.number_at_cell(game, pokemon_locations, grid_size, index)
+        if number != 0:
+            return [index]
+
+        # cells away from the border share their class's offsets, only the
+        # border cells have their own neighbour lists
+        topology = self.get_topology(grid_size)
+        classes = topology.classes
+        offsets = topology.offsets
+        border = topology.border
+        discovered = bytearray(grid_size**2)
+        discovered[index] = 1
+        queue = deque([index])
+        visible = []
+
+        while queue:
+            node = queue.popleft()
+            cls = classes[node]
+            if cls == BORDER:
+                neighbours = border[node]
+            else:
+                neighbours = [node + offset for offset in offsets[cls]]
+            for neighbour in neighbours:
+                if discovered[neighbour]:
+                    continue
+
+                discovered[neighbour] = 1
+                if game[neighbour] != FLAG:
+                    number = self.number_at_cell(
+                        game, pokemon_locations, grid_size, neighbour
+                    )
+                    if number == 0:
+                        queue.append(neighbour)
+                visible.append(neighbour)
+        return visible
+
+
+instrument.watch(BoardModel, "reveal", cells=len)
+instrument.watch(BoardModel, "reveal_cells")
+instrument.watch(BoardModel, "zero_regions")
+instrument.watch(BoardModel, "chord", cells=len)
+instrument.watch(BoardModel, "big_fun_search", cells=len)
+instrument.watch(BoardModel, "number_at_cell", cells=lambda number: 1)
+instrument.watch(BoardModel, "check_win")
+instrument.watch(BoardModel, "check_loss")
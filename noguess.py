@@ -0,0 +1,273 @@
+"""
+No-guess boards: games that can be cleared from their first click by
+deduction alone, without ever picking between cells at random.
+
+A game is fully described by its seed and its first click, since the first
+reveal places the pokemons from the board's seeded generator (see
+GameHistory.reveal). Candidate seeds are checked in order across a process
+pool by playing them with the solver's certain rules only (Solver.deduce);
+the first seed that clears the board is the board.
+
+Verified seeds of the popular board shapes are kept in a pool on disk, one
+JSON file per shape, so a new game takes the next seed instead of waiting.
+
+    python noguess.py fill --count 50
+    python noguess.py generate --grid-size 16 --pokemons 40 --seed 7
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import time
+
+from model import BoardModel
+from solver import Solver
+from topology import TOPOLOGIES
+
+
+# where the pool of verified seeds is kept
+POOL_DIRECTORY = "noguess"
+# (grid size, pokemons) of the boards worth keeping in the pool
+POPULAR = ((8, 10), (10, 15), (16, 40))
+# candidates tried before generate gives up on a board shape
+ATTEMPTS = 10000
+
+
+def first_click(grid_size):
+    """(int) Returns the index a no-guess game starts from: the middle cell."""
+    return (grid_size // 2) * grid_size + grid_size // 2
+
+
+def solvable(model, first_index):
+    """Play model from a reveal at first_index using certain moves only.
+
+    Parameters:
+        model (BoardModel): A board with its pokemons placed; it is played on.
+        first_index (int): The first cell revealed.
+
+    Returns:
+        (bool): Whether every cell without a pokemon got revealed.
+    """
+    solver = Solver(model.grid_size, model.get_num_pokemon(), model.topology.name)
+    target = model.grid_size**2 - len(model.get_pokemon_locations())
+    changed = model.reveal(first_index)
+    exposed = len(changed)
+    while exposed < target:
+        if model.check_loss():
+            return False
+        solver.update(model.get_game(), changed)
+        safe = solver.safe_cells()
+        if not safe:
+            if not solver.deduce():
+                return False
+            changed = []
+            continue
+        changed = []
+        for index in safe:
+            changed.extend(model.reveal(index))
+        exposed += len(changed)
+    return True
+
+
+def _check(task):
+    """Pool worker: returns the seed of task if its board needs no guess,
+    None otherwise."""
+    grid_size, num_pokemon, seed, topology = task
+    model = BoardModel(grid_size, num_pokemon, seed=seed, topology=topology)
+    index = first_click(grid_size)
+    # what the first reveal of a game does
+    model.place_pokemons(index)
+    return seed if solvable(model, index) else None
+
+
+def find(
+    grid_size,
+    num_pokemon,
+    first_seed=0,
+    topology="square",
+    processes=None,
+    attempts=None,
+    chunksize=8,
+):
+    """Yield the seeds from first_seed on whose boards need no guess.
+
+    Candidates are checked on a process pool, but the seeds come out in
+    order, so the same first_seed always yields the same boards.
+
+    Parameters:
+        grid_size (int): The grid size of the boards.
+        num_pokemon (int): The number of pokemons on each board.
+        first_seed (int): The first candidate seed.
+        topology (str): The shape of the boards, a key of topology.TOPOLOGIES.
+        processes (int): Pool size, None for one per core, 1 to check in this
+        process.
+        attempts (int): Candidates to try, None for no limit.
+        chunksize (int): Candidates handed to a worker at a time.
+    """
+    if attempts is None:
+        seeds = itertools.count(first_seed)
+    else:
+        seeds = range(first_seed, first_seed + attempts)
+    tasks = ((grid_size, num_pokemon, seed, topology) for seed in seeds)
+    if processes == 1:
+        results = map(_check, tasks)
+        yield from (seed for seed in results if seed is not None)
+        return
+    # leaving the with block stops the workers once enough seeds are found
+    with multiprocessing.Pool(processes) as pool:
+        for seed in pool.imap(_check, tasks, chunksize):
+            if seed is not None:
+                yield seed
+
+
+def generate(
+    grid_size,
+    num_pokemon,
+    first_seed=0,
+    topology="square",
+    processes=None,
+    attempts=ATTEMPTS,
+):
+    """(int) Returns the first seed from first_seed on whose board needs no
+    guess when started at first_click(grid_size).
+
+    Raises:
+        ValueError: No such seed among attempts candidates.
+    """
+    for seed in find(grid_size, num_pokemon, first_seed, topology, processes, attempts):
+        return seed
+    raise ValueError(
+        f"no {grid_size}x{grid_size} board with {num_pokemon} pokemons that "
+        f"needs no guess in {attempts} attempts"
+    )
+
+
+def pool_path(directory, grid_size, num_pokemon, topology="square"):
+    """(str) Returns the file holding the pool of one board shape."""
+    return os.path.join(directory, f"{topology}-{grid_size}-{num_pokemon}.json")
+
+
+def read_pool(directory, grid_size, num_pokemon, topology="square"):
+    """Read the pool of one board shape.
+
+    Returns:
+        (dict): The shape, the seeds waiting to be played and the next seed
+        to try when filling, empty for a shape with no pool yet.
+    """
+    path = pool_path(directory, grid_size, num_pokemon, topology)
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {
+            "grid_size": grid_size,
+            "num_pokemon": num_pokemon,
+            "topology": topology,
+            "first_index": first_click(grid_size),
+            "next_seed": 0,
+            "seeds": [],
+        }
+
+
+def write_pool(directory, pool):
+    """Write a pool from read_pool, replacing the old file in one step."""
+    os.makedirs(directory, exist_ok=True)
+    path = pool_path(
+        directory, pool["grid_size"], pool["num_pokemon"], pool["topology"]
+    )
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(pool, file)
+    os.replace(path + ".tmp", path)
+
+
+def fill(
+    directory,
+    grid_size,
+    num_pokemon,
+    count,
+    topology="square",
+    processes=None,
+):
+    """Top the pool of one board shape up to count seeds.
+
+    The search goes on from the pool's next_seed, so a seed is never handed
+    out twice.
+
+    Returns:
+        (int): The number of seeds added.
+    """
+    pool = read_pool(directory, grid_size, num_pokemon, topology)
+    wanted = count - len(pool["seeds"])
+    if wanted <= 0:
+        return 0
+    found = find(grid_size, num_pokemon, pool["next_seed"], topology, processes)
+    for seed in itertools.islice(found, wanted):
+        pool["seeds"].append(seed)
+        pool["next_seed"] = seed + 1
+    found.close()
+    write_pool(directory, pool)
+    return wanted
+
+
+def take(directory, grid_size, num_pokemon, topology="square"):
+    """Take the next seed out of the pool of one board shape.
+
+    Returns:
+        (tuple<int, int>): The seed and the first click of a no-guess game,
+        or None when the pool is empty.
+    """
+    pool = read_pool(directory, grid_size, num_pokemon, topology)
+    if not pool["seeds"]:
+        return None
+    seed = pool["seeds"].pop(0)
+    write_pool(directory, pool)
+    return seed, pool["first_index"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find boards that need no guess.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fill_parser = commands.add_parser("fill")
+    fill_parser.add_argument("--count", type=int, default=100)
+    fill_parser.add_argument("--directory", default=POOL_DIRECTORY)
+    generate_parser = commands.add_parser("generate")
+    generate_parser.add_argument("--seed", type=int, default=0)
+    for command in (fill_parser, generate_parser):
+        command.add_argument("--grid-size", type=int, default=None)
+        command.add_argument("--pokemons", type=int, default=None)
+        command.add_argument(
+            "--topology", choices=sorted(TOPOLOGIES), default="square"
+        )
+        command.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.grid_size is None:
+        shapes = POPULAR if args.command == "fill" else POPULAR[1:2]
+    else:
+        shapes = ((args.grid_size, args.pokemons or args.grid_size**2 // 7),)
+    for grid_size, num_pokemon in shapes:
+        start = time.perf_counter()
+        if args.command == "fill":
+            added = fill(
+                args.directory,
+                grid_size,
+                num_pokemon,
+                args.count,
+                args.topology,
+                args.processes,
+            )
+            result = {"added": added}
+        else:
+            seed = generate(
+                grid_size, num_pokemon, args.seed, args.topology, args.processes
+            )
+            result = {"seed": seed, "first_index": first_click(grid_size)}
+        result.update(grid_size=grid_size, num_pokemon=num_pokemon)
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
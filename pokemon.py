@@ -1,310 +1,39 @@
 import tkinter as tk
 import random
+import re
+import sqlite3
 import time
 from tkinter import messagebox
 from tkinter import filedialog
 from datetime import time, date, datetime
+from itertools import groupby
+from math import ceil
+from time import monotonic, perf_counter
+
+import assets
+import instrument
+import noguess
+import stats
+from history import CHORD, FLAG as FLAG_MOVE, REVEAL, GameHistory
+from model import FLAG, POKEMON, UNEXPOSED, BoardModel
+from savefile import load_board, save_board
+from solver import Solver
+from worker import GameWorker
 
-
-ALPHA = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-UP = "up"
-DOWN = "down"
-LEFT = "left"
-RIGHT = "right"
-DIRECTIONS = (
-    UP,
-    DOWN,
-    LEFT,
-    RIGHT,
-    f"{UP}-{LEFT}",
-    f"{UP}-{RIGHT}",
-    f"{DOWN}-{LEFT}",
-    f"{DOWN}-{RIGHT}",
-)
-WALL_VERTICAL = "|"
-WALL_HORIZONTAL = "-"
-POKEMON = "☺"
-FLAG = "♥"
-UNEXPOSED = "~"
-EXPOSED = "0"
-INVALID = "That ain't a valid action buddy."
 TASK_ONE = 1
 TASK_TWO = 2
-
-
-class BoardModel:
-    """
-    this is BoardModel class
-    to display the game with strings.
-    """
-
-    def __init__(self, grid_size, num_pokemon):
-        self.grid_size = grid_size
-        self.num_pokemon = num_pokemon
-        self.game = UNEXPOSED * grid_size**2
-        self.pokemon_locations = self.generate_pokemons(grid_size, num_pokemon)
-
-    def get_game(self):
-        """(str) Returns the game string."""
-        return self.game
-
-    def get_pokemon_locations(self):
-        """(str) Returns the pokemon locations."""
-        return self.pokemon_locations
-
-    def get_num_attempted_catches(self):
-        """(str) Returns the num catched."""
-        return self.num_attempted_catches
-
-    def get_num_pokemon(self):
-        """(str) Returns the number of pokemon."""
-        return self.num_pokemon
-
-    def check_loss(self):
-        """select (bool): if the game is over"""
-        for location in self.pokemon_locations:
-            if self.game[location] != UNEXPOSED:
-                return True
-        return False
-
-    def generate_pokemons(self, grid_size, number_of_pokemons):
-        """Pokemons will be generated and given a random index within the game.
-
-        Parameters:
-            grid_size (int): The grid size of the game.
-            number_of_pokemons (int): The number of pokemons that the game will have.
-
-        Returns:
-            (tuple<int>): A tuple containing  indexes where the pokemons are
-            created for the game string.
-        """
-        cell_count = grid_size**2
-        pokemon_locations = ()
-
-        for _ in range(number_of_pokemons):
-            if len(pokemon_locations) >= cell_count:
-                break
-            index = random.randint(0, cell_count)
-
-            while index in pokemon_locations:
-                index = random.randint(0, cell_count)
-
-            pokemon_locations += (index,)
-        print(pokemon_locations)
-        return pokemon_locations
-
-    def position_to_index(self, position, grid_size):
-        """Convert the row, column coordinate in the grid to the game strings index.
-
-        Parameters:
-            position (tuple<int, int>): The row, column position of a cell.
-            grid_size (int): The grid size of the game.
-
-        Returns:
-            (int): The index of the cell in the game string.
-        """
-        x, y = position
-        return x * grid_size + y
-
-    def replace_character_at_index(self, game, index, character):
-        """A specified index in the game string at the specified index is replaced by
-        a new character.
-        Parameters:
-            game (str): The game string.
-            index (int): The index in the game string where the character is replaced.
-            character (str): The new character that will be replacing the old character.
-
-        Returns:
-            (str): The updated game string.
-        """
-        return game[:index] + character + game[index + 1 :]
-
-    def flag_cell(self, game, index):
-        """Toggle Flag on or off at selected index. If the selected index is already
-        revealed, the game would return with no changes.
-
-        Parameters:
-            game (str): The game string.
-            index (int): The index in the game string where a flag is placed.
-        Returns
-            (str): The updated game string.
-        """
-        if game[index] == FLAG:
-            game = self.replace_character_at_index(game, index, UNEXPOSED)
-
-        elif game[index] == UNEXPOSED:
-            game = self.replace_character_at_index(game, index, FLAG)
-
-        return game
-
-    def index_in_direction(self, index, grid_size, direction):
-        """The index in the game string is updated by determining the
-        adjacent cell given the direction.
-        The index of the adjacent cell in the game is then calculated and returned.
-
-        For example:
-          | 1 | 2 | 3 |
-        A | i | j | k |
-        B | l | m | n |
-        C | o | p | q |
-
-        The index of m is 4 in the game string.
-        if the direction specified is "up" then:
-        the updated position corresponds with j which has the index of 1 in the game string.
-
-        Parameters:
-            index (int): The index in the game string.
-            grid_size (int): The grid size of the game.
-            direction (str): The direction of the adjacent cell.
-
-        Returns:
-            (int): The index in the game string corresponding to the new cell position
-            in the game.
-
-            None for invalid direction.
-        """
-        col = index % grid_size
-        row = index // grid_size
-        if RIGHT in direction:
-            col += 1
-        elif LEFT in direction:
-            col -= 1
-        # Notice the use of if, not elif here
-        if UP in direction:
-            row -= 1
-        elif DOWN in direction:
-            row += 1
-        if not (0 <= col < grid_size and 0 <= row < grid_size):
-            return None
-        return self.position_to_index((row, col), grid_size)
-
-    def neighbour_directions(self, index, grid_size):
-        """Seek out all direction that has a neighbouring cell.
-
-        Parameters:
-            index (int): The index in the game string.
-            grid_size (int): The grid size of the game.
-
-        Returns:
-            (list<int>): A list of index that has a neighbouring cell.
-        """
-        neighbours = []
-        for direction in DIRECTIONS:
-            neighbour = self.index_in_direction(index, grid_size, direction)
-            if neighbour is not None:
-                neighbours.append(neighbour)
-        return neighbours
-
-    def number_at_cell(self, game, pokemon_locations, grid_size, index):
-        """Calculates what number should be displayed at that specific index in the game.
-
-        Parameters:
-            game (str): Game string.
-            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
-            grid_size (int): Size of game.
-            index (int): Index of the currently selected cell
-
-        Returns:
-            (int): Number to be displayed at the given index in the game string.
-        """
-        if game[index] != UNEXPOSED:
-            return int(game[index])
-
-        number = 0
-        for neighbour in self.neighbour_directions(index, grid_size):
-            if neighbour in pokemon_locations:
-                number += 1
-
-        return number
-
-    def check_win(self, game, pokemon_locations):
-        """Checking if the player has won the game.
-
-        Parameters:
-            game (str): Game string.
-            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
-
-        Returns:
-            (bool): True if the player has won the game, false if not.
-
-        """
-        return UNEXPOSED not in game and game.count(FLAG) == len(pokemon_locations)
-
-    def reveal_cells(self, game, grid_size, pokemon_locations, index):
-        """Reveals all neighbouring cells at index and repeats for all
-        cells that had a 0.
-
-        Does not reveal flagged cells or cells with Pokemon.
-
-        Parameters:
-            game (str): Game string.
-            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
-            grid_size (int): Size of game.
-            index (int): Index of the currently selected cell
-
-        Returns:
-            (str): The updated game string
-        """
-        number = self.number_at_cell(game, pokemon_locations, grid_size, index)
-        game = self.replace_character_at_index(game, index, str(number))
-        clear = self.big_fun_search(game, grid_size, pokemon_locations, index)
-        for i in clear:
-            if game[i] != FLAG:
-                number = self.number_at_cell(game, pokemon_locations, grid_size, i)
-                game = self.replace_character_at_index(game, i, str(number))
-
-        return game
-
-    def big_fun_search(self, game, grid_size, pokemon_locations, index):
-        """Searching adjacent cells to see if there are any Pokemon"s present.
-
-        Using some sick algorithms.
-
-        Find all cells which should be revealed when a cell is selected.
-
-        For cells which have a zero value (i.e. no neighbouring pokemons) all the cell"s
-        neighbours are revealed. If one of the neighbouring cells is also zero then
-        all of that cell"s neighbours are also revealed. This repeats until no
-        zero value neighbours exist.
-
-        For cells which have a non-zero value (i.e. cells with neighbour pokemons), only
-        the cell itself is revealed.
-
-        Parameters:
-            game (str): Game string.
-            grid_size (int): Size of game.
-            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
-            index (int): Index of the currently selected cell
-
-        Returns:
-            (list<int>): List of cells to turn visible.
-        """
-        queue = [index]
-        discovered = [index]
-        visible = []
-
-        if game[index] == FLAG:
-            return queue
-
-        number = self.number_at_cell(game, pokemon_locations, grid_size, index)
-        if number != 0:
-            return queue
-
-        while queue:
-            node = queue.pop()
-            for neighbour in self.neighbour_directions(node, grid_size):
-                if neighbour in discovered:
-                    continue
-
-                discovered.append(neighbour)
-                if game[neighbour] != FLAG:
-                    number = self.number_at_cell(
-                        game, pokemon_locations, grid_size, neighbour
-                    )
-                    if number == 0:
-                        queue.append(neighbour)
-                visible.append(neighbour)
-        return visible
+# the cell sizes, in pixels, a board view can be zoomed to
+CELL_SIZES = (6, 10, 12, 15, 20, 30, 45, 60, 90, 120)
+# seconds between two checks for finished background work
+POLL_INTERVAL = 0.015
+# seconds between two looks at the clock shown in the status bar
+TIMER_INTERVAL = 0.25
+# seconds between two updates of the debug overlay
+OVERLAY_INTERVAL = 0.5
+# seconds of drawing a board view does before letting tk handle input
+FRAME_BUDGET = 0.008
+# a stretch of cells that are not covered, in a row of a game string
+UNCOVERED_RUN = re.compile(f"[^{re.escape(UNEXPOSED)}]+")
 
 
 class PokemonGame:
@@ -313,11 +42,28 @@ class PokemonGame:
     it is a controller for the whole game which can display strings with a intuitive way for users.
     """
 
-    def __init__(self, master, grid_size=10, num_pokemon=15, task=TASK_ONE):
-        """define what are these attributes and display the board for the game. This controller class will communicate with other classes"""
+    def __init__(
+        self,
+        master,
+        grid_size=10,
+        num_pokemon=15,
+        task=TASK_ONE,
+        no_guess=False,
+        raster=False,
+        stats_path=stats.STATS_PATH,
+    ):
+        """define what are these attributes and display the board for the game. This controller class will communicate with other classes
+
+        With no_guess, new games are boards that can be cleared without
+        guessing (see noguess.py). With raster, the task 2 board is drawn
+        into a single image instead of an image item per cell. Finished
+        games are kept in the statistics database at stats_path (see
+        stats.py), None to keep nothing."""
         self._master = master
         self._master.title("Pokemon: Got 2 Find Them All!")
         self._pokemonGame = BoardModel(grid_size, num_pokemon)
+        self._history = GameHistory(self._pokemonGame)
+        self._solver = Solver(grid_size, num_pokemon)
         self._label = tk.Label(
             self._master,
             text="Pokemon: Got 2 Find Them All!",
@@ -327,15 +73,21 @@ class PokemonGame:
         )
         self._label.pack(fill=tk.X)
         self._grid_size = grid_size
+        self._no_guess = no_guess
+        self._start_time = monotonic()
+        self._ticker = Ticker(master)
+        self._status_bar = None
         if task == TASK_ONE:
             self._board_view = BoardView(master, grid_size)
             self._board_view.draw_board(self._pokemonGame.get_game())
             self._board_view.pack()
         else:
-            self._board_view = ImageBoardView(master, self._grid_size)
+            view_class = RasterBoardView if raster else ImageBoardView
+            self._board_view = view_class(master, self._grid_size)
             self._board_view.draw_board(self._pokemonGame.get_game())
             self._board_view.pack()
-            self._status_bar = StatusBar(master)
+            self._status_bar = StatusBar(master, game=self, ticker=self._ticker)
+            self._status_bar.count(0, num_pokemon)
             self._status_bar.pack()
         # bind left and right click
         self._board_view.bind("<Button-1>", self.handle_left_click)
@@ -350,24 +102,291 @@ class PokemonGame:
         filemenu.add_command(label="Load game", command=self.load_game)
         filemenu.add_command(label="Restart game", command=self.restart)
         filemenu.add_command(label="New game", command=self.new_game)
+        filemenu.add_command(
+            label="New no-guess game", command=lambda: self.new_game(no_guess=True)
+        )
+        if stats_path is not None:
+            filemenu.add_command(label="Best times", command=self.show_best_times)
         filemenu.add_command(label="Quit", command=self.quit)
+        editmenu = tk.Menu(menubar)
+        menubar.add_cascade(label="Edit", menu=editmenu)
+        editmenu.add_command(label="Undo", command=self.undo, accelerator="Ctrl+Z")
+        editmenu.add_command(label="Redo", command=self.redo, accelerator="Ctrl+Y")
+        self._master.bind("<Control-z>", lambda event: self.undo())
+        self._master.bind("<Control-y>", lambda event: self.redo())
+        menubar.add_command(label="Hint", command=self.hint)
+        debugmenu = tk.Menu(menubar)
+        menubar.add_cascade(label="Debug", menu=debugmenu)
+        debugmenu.add_command(
+            label="Show timings", command=self.toggle_overlay, accelerator="F3"
+        )
+        self._master.bind("<F3>", lambda event: self.toggle_overlay())
+        self._overlay_job = None
         self._filename = None
 
+        # the model, history and solver are only used on the worker thread
+        # once the window is up; clicks made while it is busy are coalesced
+        self._worker = GameWorker(error=self._job_failed)
+        self._pending_moves = {}
+        self._game_over = False
+        # finished games are written from the writer's thread, and the best
+        # times are read on the worker with a connection of its own
+        self._stats_path = stats_path
+        self._stats = None if stats_path is None else stats.StatsWriter(stats_path)
+        self._stats_reader = None
+        # seconds into the game of each move the history is showing
+        self._move_times = []
+        self._ticker.add(self.poll, POLL_INTERVAL)
+
+    def poll(self):
+        """collect the work the worker finished, then send the clicks made
+        while it was busy"""
+        if not self._game_over:
+            self._worker.poll()
+            self.send_moves()
+
+    def _job_failed(self, error):
+        """report work the worker could not do, e.g. a no-guess board that
+        was not found"""
+        messagebox.showerror(title="Pokemon", message=str(error))
+
+    def toggle_overlay(self):
+        """show or hide the timings of each phase of a move over the board
+
+        Instrumentation is only switched on while the overlay is shown.
+        """
+        if self._overlay_job is None:
+            instrument.reset()
+            instrument.enable()
+            self._overlay_job = self._ticker.add(self.update_overlay, OVERLAY_INTERVAL)
+            self.update_overlay()
+        else:
+            self._ticker.remove(self._overlay_job)
+            self._overlay_job = None
+            instrument.disable()
+            self._board_view.show_overlay(None)
+
+    def update_overlay(self):
+        """show what instrumentation has recorded so far"""
+        lines = ["phase  calls  mean us  p99 us  cells  items"]
+        for phase in instrument.report():
+            lines.append(
+                f"{phase['phase']}  {phase['calls']}  {phase['mean_us']}"
+                f"  <{phase['p99_us']:.0f}  {phase['cells']}  {phase['items']}"
+            )
+        self._board_view.show_overlay("\n".join(lines))
+
+    def elapsed(self):
+        """(float) Returns the seconds since this game started."""
+        return monotonic() - self._start_time
+
     def save_game(self):
         """save this game as a file"""
-        pass
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".pkmn", filetypes=[("Pokemon game", "*.pkmn")]
+        )
+        if not filename:
+            return
+        self._worker.submit(
+            self._save, filename, self.elapsed(), done=self._game_saved
+        )
+
+    def _save(self, filename, elapsed):
+        """worker: write the game to filename"""
+        try:
+            save_board(filename, self._pokemonGame, elapsed)
+        except OSError as error:
+            return filename, error
+        return filename, None
+
+    def _game_saved(self, result):
+        """report how saving went"""
+        filename, error = result
+        if error is not None:
+            messagebox.showerror(title="Save game", message=str(error))
+            return
+        self._filename = filename
 
     def load_game(self):
         """load the file and display it"""
-        pass
+        filename = filedialog.askopenfilename(
+            filetypes=[("Pokemon game", "*.pkmn")]
+        )
+        if not filename:
+            return
+        self._worker.submit(self._load, filename, done=self._game_loaded)
+
+    def _load(self, filename):
+        """worker: read the game in filename and play on it from now on"""
+        try:
+            model, elapsed, attempted_catches = load_board(filename)
+        except (OSError, ValueError) as error:
+            return filename, None, error
+        if model.grid_size != self._grid_size:
+            error = ValueError(
+                f"That game is {model.grid_size}x{model.grid_size}, "
+                f"this board is {self._grid_size}x{self._grid_size}."
+            )
+            return filename, None, error
+        self._pokemonGame = model
+        self._history = GameHistory(model)
+        self._move_times = []
+        return filename, elapsed, self._refresh()
+
+    def _game_loaded(self, result):
+        """show the loaded game, or why it could not be loaded"""
+        filename, elapsed, board = result
+        if isinstance(board, Exception):
+            messagebox.showerror(title="Load game", message=str(board))
+            return
+        self._start_time = monotonic() - elapsed
+        self._board_refreshed(board)
+        self._filename = filename
+
+    def refresh_board(self):
+        """redraw the board and start the solver over after it jumped to another
+        state"""
+        self._worker.submit(self._refresh, done=self._board_refreshed)
+
+    def _refresh(self):
+        """worker: start the solver over, returns the game string and the
+        pokeball counts"""
+        self._solver = Solver(
+            self._grid_size,
+            self._pokemonGame.get_num_pokemon(),
+            self._pokemonGame.topology.name,
+        )
+        self._solver.update(self._pokemonGame.get_game())
+        return self._pokemonGame.get_game(), self._catches()
+
+    def _catches(self):
+        """worker: (tuple<int, int>) Returns the attempted catches and the
+        number of pokemons"""
+        model = self._pokemonGame
+        return model.get_num_attempted_catches(), model.get_num_pokemon()
+
+    def _board_refreshed(self, result):
+        """redraw the whole board after it jumped to another state"""
+        board, catches = result
+        self._board_view.draw_board(board)
+        self.show_catches(catches)
+
+    def show_catches(self, catches):
+        """update the pokeball counts in the status bar, if there is one"""
+        if self._status_bar is not None:
+            self._status_bar.count(*catches)
+
+    def _jump(self, move):
+        """worker: make the history move named move, returns what _refresh
+        does if it did anything"""
+        if getattr(self._history, move)():
+            return self._refresh()
+        return None
+
+    def _jumped(self, result):
+        """redraw after a history move"""
+        if result is not None:
+            self._board_refreshed(result)
 
     def restart(self):
         """restart the game with same pokemon locations and game string"""
-        pass
+        self._worker.submit(self._jump, "restart", done=self._jumped)
+
+    def undo(self):
+        """take back the last move"""
+        self._worker.submit(self._jump, "undo", done=self._jumped)
+
+    def redo(self):
+        """play the last undone move again"""
+        self._worker.submit(self._jump, "redo", done=self._jumped)
+
+    def new_game(self, no_guess=None):
+        """create a new game, a no-guess one if asked or set up so"""
+        if no_guess is None:
+            no_guess = self._no_guess
+        self._pending_moves.clear()
+        self._worker.submit(self._new, no_guess, done=self._game_started)
 
-    def new_game(self):
-        """create a new game"""
-        pass
+    def _new(self, no_guess):
+        """worker: play on a new board from now on, returns what _refresh does
+
+        A no-guess game comes from the pool on disk, or is generated here
+        when the pool of this board shape is empty, and starts with its first
+        click already made, since it only needs no guess from there.
+        """
+        grid_size = self._grid_size
+        num_pokemon = self._pokemonGame.get_num_pokemon()
+        start = None
+        if no_guess:
+            start = noguess.take(noguess.POOL_DIRECTORY, grid_size, num_pokemon)
+            if start is None:
+                seed = noguess.generate(
+                    grid_size, num_pokemon, random.randrange(2**32), processes=1
+                )
+                start = seed, noguess.first_click(grid_size)
+        seed = None if start is None else start[0]
+        self._pokemonGame = BoardModel(grid_size, num_pokemon, seed=seed)
+        self._history = GameHistory(self._pokemonGame)
+        self._move_times = []
+        if start is not None:
+            self._history.reveal(start[1])
+        return self._refresh()
+
+    def _game_started(self, result):
+        """show the new board and start the clock over"""
+        self._start_time = monotonic()
+        self._filename = None
+        self._board_refreshed(result)
+
+    def show_best_times(self):
+        """show the fastest wins on boards like this one"""
+        self._worker.submit(self._best_times, done=self._best_times_found)
+
+    def _best_times(self):
+        """worker: (tuple<list<dict>, dict, Exception>) Returns the best times
+        and the summary of the games on boards like this one, or the error
+        reading them"""
+        model = self._pokemonGame
+        shape = (model.grid_size, model.get_num_pokemon(), model.topology.name)
+        try:
+            if self._stats_reader is None:
+                self._stats_reader = stats.StatsStore(self._stats_path)
+            return (
+                self._stats_reader.best_times(*shape),
+                self._stats_reader.summary(*shape),
+                None,
+            )
+        except sqlite3.Error as error:
+            return None, None, error
+
+    def _close_stats_reader(self):
+        """worker: close the database the best times were read from"""
+        if self._stats_reader is not None:
+            self._stats_reader.close()
+            self._stats_reader = None
+
+    def _best_times_found(self, result):
+        """show the best times, or why they could not be read"""
+        best_times, summary, error = result
+        if error is not None:
+            messagebox.showerror(title="Best times", message=str(error))
+            return
+        played = sum(games["games"] for games in summary.values())
+        won = summary.get(stats.WIN, {}).get("games", 0)
+        lines = [f"{won} won of {played} played"]
+        for place, game in enumerate(best_times, 1):
+            lines.append(f"{place}. {game['seconds']:.1f}s, {game['clicks']} clicks")
+        messagebox.showinfo(title="Best times", message="\n".join(lines))
+
+    def hint(self):
+        """mark the cell the solver would play next"""
+        self._worker.submit(lambda: self._solver.hint(), done=self._show_hint)
+
+    def _show_hint(self, hint):
+        """outline the hinted cell"""
+        if hint is not None:
+            index, is_pokemon, probability = hint
+            self._board_view.show_hint(index, is_pokemon)
 
     def quit(self):
         """ "quit this game"""
@@ -375,63 +394,138 @@ class PokemonGame:
             messagebox.askyesno(title="Game over", message="Do you wish to quit")
             == True
         ):
-            self._master.destroy()
+            self.close()
+
+    def close(self):
+        """stop the worker, write the games still waiting and close the window"""
+        self._game_over = True
+        self._ticker.stop()
+        # the reader belongs to the worker thread, so it is closed there
+        self._worker.submit(self._close_stats_reader)
+        self._worker.close()
+        if self._stats is not None:
+            self._stats.close()
+        self._master.destroy()
 
     def handle_left_click(self, event):
         """some works for left click"""
         pixel = (event.x, event.y)
         position = self.pixel_to_position(pixel)
         index = self.position_to_index(position)
-        self._pokemonGame.game = self._pokemonGame.reveal_cells(
-            self._pokemonGame.game,
-            self._grid_size,
-            self._pokemonGame.pokemon_locations,
-            index,
-        )
-        self._board_view.draw_board(self._pokemonGame.get_game())
-        if self._pokemonGame.check_loss():
-            for location in self._pokemonGame.pokemon_locations:
-                self._pokemonGame.game = self._pokemonGame.replace_character_at_index(
-                    self._pokemonGame.game, location, POKEMON
-                )
-                self._board_view.draw_board(self._pokemonGame.get_game())
-            messagebox.showinfo(title=None, message="You lose")
-            self._master.destroy()
+        if index is not None:
+            self.queue_move(REVEAL, index)
 
     def handle_right_click(self, event):
         """some wotks for right click"""
         pixel = (event.x, event.y)
         position = self.pixel_to_position(pixel)
         index = self.position_to_index(position)
-        print(index)
-        if (
-            self._pokemonGame.game[index] == UNEXPOSED
-            or self._pokemonGame.game[index] == FLAG
-        ):
-            self._pokemonGame.game = self._pokemonGame.flag_cell(
-                self._pokemonGame.game, index
-            )
-            self._board_view.draw_board(self._pokemonGame.get_game())
+        if index is not None:
+            self.queue_move(FLAG_MOVE, index)
 
-        if self._pokemonGame.check_win(
-            self._pokemonGame.game, self._pokemonGame.pokemon_locations
-        ):
-            messagebox.showinfo(title=None, message="You win")
-            self._master.destroy()
+    def queue_move(self, action, index):
+        """play a move as soon as the worker is free
+
+        While it is busy, moves are collected and sent together: a cell only
+        gets its first move, and a second flag toggle on a cell cancels the
+        first.
+        """
+        if self._game_over:
+            return
+        if index in self._pending_moves:
+            if action == FLAG_MOVE and self._pending_moves[index] == FLAG_MOVE:
+                del self._pending_moves[index]
+        else:
+            self._pending_moves[index] = action
+        self.send_moves()
+
+    def send_moves(self):
+        """hand the queued moves to the worker unless it is still busy"""
+        if self._worker.busy() or not self._pending_moves:
+            return
+        moves = list(self._pending_moves.items())
+        self._pending_moves.clear()
+        self._worker.submit(self._play, moves, done=self._moves_played)
+
+    def _play(self, moves):
+        """worker: play moves until the game is over
+
+        Returns:
+            (tuple<str, list<int>, tuple<int, int>, bool, bool>): The game
+            string, the indexes that changed, the pokeball counts, and whether
+            the game is lost or won.
+        """
+        model = self._pokemonGame
+        changed = []
+        for index, action in moves:
+            if model.check_loss() or model.check_win():
+                break
+            if action == REVEAL and model.get_cell(index).isdigit():
+                # a click on an exposed number chords it
+                action = CHORD
+            played = self._history.play(action, index)
+            if played:
+                del self._move_times[self._history.get_position() - 1 :]
+                self._move_times.append(self.elapsed())
+            changed.extend(played)
+        self._solver.update(model.get_game(), changed)
+        loss = model.check_loss()
+        if loss:
+            changed.extend(model.reveal_pokemons())
+        win = not loss and model.check_win()
+        if loss or win:
+            self._record_game(stats.LOSS if loss else stats.WIN)
+        return model.get_game(), changed, self._catches(), loss, win
+
+    def _record_game(self, outcome):
+        """worker: hand the finished game to the statistics writer"""
+        if self._stats is None:
+            return
+        model = self._pokemonGame
+        moves = self._history.get_events()
+        self._stats.record(
+            {
+                "grid_size": model.grid_size,
+                "num_pokemon": model.get_num_pokemon(),
+                "topology": model.topology.name,
+                "seed": model.seed,
+                "seconds": self.elapsed(),
+                "clicks": len(moves),
+                "outcome": outcome,
+                "moves": moves,
+                "timings": self._move_times[: len(moves)],
+            }
+        )
 
-        if self._pokemonGame.game[index] == FLAG:
-            pass
+    def _moves_played(self, result):
+        """draw the moves the worker played and end the game if it is over"""
+        board, changed, catches, loss, win = result
+        self._board_view.draw_board(board, changed)
+        self.show_catches(catches)
+        if loss or win:
+            self._game_over = True
+            self._pending_moves.clear()
+            self._board_view.finish_drawing()
+            messagebox.showinfo(title=None, message="You lose" if loss else "You win")
+            self.close()
+            return
+        self.send_moves()
+        if not self._worker.busy():
+            # label the openings between clicks; it does nothing once the
+            # pokemons are labelled, and later reveals look them up
+            self._worker.submit(self._pokemonGame.zero_regions)
 
     def pixel_to_position(self, pixel):
         """transfer the pixel to position"""
-        row = pixel[0] // 60
-        col = pixel[1] // 60
-        position = (row, col)
-        return position
+        return self._board_view.pixel_to_position(pixel)
 
     def position_to_index(self, position):
-        """transfer the position to index"""
-        index = position[1] * 10 + position[0]
+        """transfer the position to index, None when it is off the board"""
+        if not (
+            0 <= position[0] < self._grid_size and 0 <= position[1] < self._grid_size
+        ):
+            return None
+        index = position[1] * self._grid_size + position[0]
         return index
 
 
@@ -439,6 +533,10 @@ class BoardView(tk.Canvas):
     """
     this is BoardView class
     display basic board for task 1.
+
+    Only the cells inside the visible window get canvas items. Items of cells
+    that scroll out are hidden and reused for the cells that scroll in, so
+    the item count depends on the window, not on the board.
     """
 
     def __init__(self, master, grid_size=10, board_width=600, *args, **kwargs):
@@ -446,65 +544,367 @@ class BoardView(tk.Canvas):
         super().__init__(master)
         self.grid_size = grid_size
         self.board_width = board_width
-        self.config(width=board_width, height=board_width)
-
-    def draw_board(self, board):
-        """use rectangle to draw the whole task 1 board"""
-        print("2")
-        for index in range(len(board)):
-            position = self.index_to_position(index)
-            pixel = self.position_to_pixel(position)
-            if board[index] == UNEXPOSED:
-                self.create_rectangle(
-                    pixel[0], pixel[1], pixel[0] + 60, pixel[1] + 60, fill="dark green"
-                )
-
-            elif board[index] == FLAG:
-                self.create_rectangle(
-                    pixel[0], pixel[1], pixel[0] + 60, pixel[1] + 60, fill="red"
+        self.cell_size = 60
+        self._width = min(board_width, grid_size * self.cell_size)
+        self._origin = (0, 0)
+        self.config(width=self._width, height=self._width)
+        self._board = None
+        # index -> canvas items, for the cells in view
+        self._cell_items = {}
+        self._spare_items = []
+        self._hint_item = None
+        self._overlay_item = None
+        self._drag = (0, 0)
+        # cells in view waiting to be drawn, and the call that will draw them
+        self._dirty = set()
+        self._draw_job = None
+
+        # wheel scrolls, shift + wheel scrolls sideways, control + wheel zooms
+        self.bind("<MouseWheel>", self.handle_wheel)
+        self.bind("<Shift-MouseWheel>", self.handle_wheel)
+        self.bind("<Control-MouseWheel>", self.handle_wheel)
+        for button in (4, 5):
+            self.bind(f"<Button-{button}>", self.handle_wheel)
+            self.bind(f"<Shift-Button-{button}>", self.handle_wheel)
+            self.bind(f"<Control-Button-{button}>", self.handle_wheel)
+        # drag with the middle button to pan
+        self.bind("<ButtonPress-2>", self.handle_drag_start)
+        self.bind("<B2-Motion>", self.handle_drag)
+
+    def draw_board(self, board, changed=None):
+        """use rectangle to draw the whole task 1 board
+
+        Only the cells in view that are listed in changed are updated. They
+        are drawn a frame budget at a time, so a big change never keeps tk
+        from handling input for long.
+        """
+        first_draw = self._board is None
+        self._board = board
+        if first_draw:
+            self.refresh()
+            return
+        if changed is None or len(changed) > len(self._cell_items):
+            self._dirty.update(self._cell_items)
+        else:
+            self._dirty.update(index for index in changed if index in self._cell_items)
+        if self._dirty and self._draw_job is None:
+            self._draw_job = self.after_idle(self.draw_dirty)
+        if self._hint_item is not None:
+            # the board moved on, so the last hint no longer applies
+            self.coords(self._hint_item, 0, 0, 0, 0)
+
+    def draw_dirty(self):
+        """draw the cells waiting to be drawn until the frame budget is spent"""
+        self._draw_job = None
+        deadline = perf_counter() + FRAME_BUDGET
+        dirty = self._dirty
+        while dirty:
+            index = dirty.pop()
+            if index in self._cell_items:
+                self.draw_cell(index, self._board[index])
+            if perf_counter() > deadline:
+                break
+        if dirty:
+            self._draw_job = self.after(1, self.draw_dirty)
+
+    def finish_drawing(self):
+        """draw every cell still waiting, at once"""
+        if self._draw_job is not None:
+            self.after_cancel(self._draw_job)
+            self._draw_job = None
+        for index in self._dirty:
+            if index in self._cell_items:
+                self.draw_cell(index, self._board[index])
+        self._dirty.clear()
+        self.update_idletasks()
+
+    def refresh(self):
+        """give every cell in view its items, recycling those of cells out of view"""
+        if self._board is None:
+            return
+        first_col, first_row = self.pixel_to_position((0, 0))
+        last_col, last_row = self.pixel_to_position((self._width - 1, self._width - 1))
+        visible = set()
+        for row in range(max(first_row, 0), min(last_row + 1, self.grid_size)):
+            start = row * self.grid_size
+            visible.update(
+                range(
+                    start + max(first_col, 0),
+                    start + min(last_col + 1, self.grid_size),
                 )
+            )
 
-            elif board[index] == POKEMON:
-                self.create_rectangle(
-                    pixel[0], pixel[1], pixel[0] + 60, pixel[1] + 60, fill="yellow"
-                )
+        for index in list(self._cell_items):
+            if index not in visible:
+                self._spare_items.append(self._cell_items.pop(index))
+        for index in visible:
+            items = self._cell_items.get(index)
+            if items is None:
+                if self._spare_items:
+                    items = self._spare_items.pop()
+                else:
+                    items = self.create_cell()
+                self._cell_items[index] = items
+        for items in self._spare_items:
+            for item in items:
+                self.itemconfig(item, state="hidden")
+        for index, items in self._cell_items.items():
+            for item in items:
+                self.itemconfig(item, state="normal")
+            self.place_cell(index)
+            self.draw_cell(index, self._board[index])
+        self._dirty.clear()
+        if self._hint_item is not None:
+            self.tag_raise(self._hint_item)
+
+    def create_cell(self):
+        """create the canvas items of one cell"""
+        rectangle = self.create_rectangle(0, 0, 0, 0, fill="dark green")
+        text = self.create_text(0, 0, text="")
+        return rectangle, text
+
+    def place_cell(self, index):
+        """move the canvas items of the cell at index to where it is drawn"""
+        rectangle, text = self._cell_items[index]
+        pixel = self.position_to_pixel(self.index_to_position(index))
+        size = self.cell_size
+        self.coords(rectangle, pixel[0], pixel[1], pixel[0] + size, pixel[1] + size)
+        self.coords(text, pixel[0] + size // 2, pixel[1] + size // 2)
+
+    def draw_cell(self, index, character):
+        """update the canvas items of the cell at index"""
+        rectangle, text = self._cell_items[index]
+        if character == UNEXPOSED:
+            self.itemconfig(rectangle, fill="dark green")
+            self.itemconfig(text, text="")
+
+        elif character == FLAG:
+            self.itemconfig(rectangle, fill="red")
+            self.itemconfig(text, text="")
+
+        elif character == POKEMON:
+            self.itemconfig(rectangle, fill="yellow")
+            self.itemconfig(text, text="")
 
-            else:
-                self.create_rectangle(
-                    pixel[0], pixel[1], pixel[0] + 60, pixel[1] + 60, fill="light green"
-                )
-                self.create_text(pixel[0] + 30, pixel[1] + 30, text=board[index])
+        else:
+            self.itemconfig(rectangle, fill="light green")
+            self.itemconfig(text, text=character)
+
+    def scroll(self, dx, dy):
+        """move the view by dx, dy pixels, staying on the board"""
+        origin = self.clamp_origin(self._origin[0] + dx, self._origin[1] + dy)
+        if origin != self._origin:
+            self._origin = origin
+            self.refresh()
+
+    def clamp_origin(self, x, y):
+        """(tuple<int, int>) Returns the view origin closest to x, y that
+        keeps the view on the board."""
+        limit = max(self.grid_size * self.cell_size - self._width, 0)
+        return min(max(x, 0), limit), min(max(y, 0), limit)
+
+    def zoom(self, step, pixel=(0, 0)):
+        """change the cell size by step places in CELL_SIZES, keeping the
+        board point under pixel still"""
+        current = CELL_SIZES.index(self.cell_size)
+        size = CELL_SIZES[min(max(current + step, 0), len(CELL_SIZES) - 1)]
+        if size == self.cell_size:
+            return
+        x = (pixel[0] + self._origin[0]) * size // self.cell_size - pixel[0]
+        y = (pixel[1] + self._origin[1]) * size // self.cell_size - pixel[1]
+        self.cell_size = size
+        self._origin = self.clamp_origin(x, y)
+        self.refresh()
+
+    def handle_wheel(self, event):
+        """scroll or zoom with the mouse wheel"""
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        if event.state & 0x0004:
+            self.zoom(1 if up else -1, (event.x, event.y))
+        elif event.state & 0x0001:
+            self.scroll(-self.cell_size if up else self.cell_size, 0)
+        else:
+            self.scroll(0, -self.cell_size if up else self.cell_size)
+
+    def handle_drag_start(self, event):
+        """remember where a middle button drag started"""
+        self._drag = (event.x, event.y)
+
+    def handle_drag(self, event):
+        """pan the view along with a middle button drag"""
+        self.scroll(self._drag[0] - event.x, self._drag[1] - event.y)
+        self._drag = (event.x, event.y)
+
+    def show_hint(self, index, is_pokemon):
+        """outline the cell at index, red for a pokemon and blue for a safe cell"""
+        column, row = self.index_to_position(index)
+        size = self.cell_size
+        if index not in self._cell_items:
+            # bring the cell to the middle of the view
+            self.scroll(
+                column * size - self._width // 2 - self._origin[0],
+                row * size - self._width // 2 - self._origin[1],
+            )
+        pixel = self.position_to_pixel((column, row))
+        colour = "red" if is_pokemon else "blue"
+        if self._hint_item is None:
+            self._hint_item = self.create_rectangle(0, 0, 0, 0, width=3)
+        self.coords(
+            self._hint_item, pixel[0], pixel[1], pixel[0] + size, pixel[1] + size
+        )
+        self.itemconfig(self._hint_item, outline=colour)
+        self.tag_raise(self._hint_item)
+
+    def show_overlay(self, text):
+        """show text in the top left corner over the board, None to hide it"""
+        if text is None:
+            if self._overlay_item is not None:
+                self.itemconfig(self._overlay_item, state="hidden")
+            return
+        if self._overlay_item is None:
+            self._overlay_item = self.create_text(
+                4, 4, anchor="nw", font="courier 9", fill="black"
+            )
+        self.itemconfig(self._overlay_item, text=text, state="normal")
+        self.tag_raise(self._overlay_item)
 
     def index_to_position(self, index):
         """transfer the index to position"""
-        row = index % 10
-        col = index // 10
+        row = index % self.grid_size
+        col = index // self.grid_size
         position = (row, col)
         return position
 
     def position_to_pixel(self, position):
         """ "transfer the position to pixel"""
-        pixel = (position[0] * 60, position[1] * 60)
+        pixel = (
+            position[0] * self.cell_size - self._origin[0],
+            position[1] * self.cell_size - self._origin[1],
+        )
         return pixel
 
+    def pixel_to_position(self, pixel):
+        """transfer the pixel to position"""
+        row = (pixel[0] + self._origin[0]) // self.cell_size
+        col = (pixel[1] + self._origin[1]) // self.cell_size
+        position = (row, col)
+        return position
+
 
-class StatusBar(tk.Frame, BoardModel):
+class Ticker:
+    """
+    this is Ticker class
+    which runs every periodic job of a window from a single `after` callback.
+
+    Jobs are due at fixed steps of a monotonic clock, so they do not drift
+    however late a callback fires. Nothing runs while the window is hidden.
+    """
+
+    def __init__(self, master):
+        """define what are these attributes and watch the window being hidden"""
+        self._master = master
+        # [next due time, period, callback] of every job
+        self._jobs = []
+        self._after = None
+        self._paused = False
+        self._stopped = False
+        master.bind("<Unmap>", self.pause, add="+")
+        master.bind("<Map>", self.resume, add="+")
+
+    def add(self, callback, period):
+        """call callback every period seconds
+
+        Returns:
+            (list): The job, to pass to remove.
+        """
+        job = [monotonic() + period, period, callback]
+        self._jobs.append(job)
+        self._schedule()
+        return job
+
+    def remove(self, job):
+        """stop calling a job returned by add"""
+        if job in self._jobs:
+            self._jobs.remove(job)
+        self._schedule()
+
+    def pause(self, event=None):
+        """stop ticking while the window is hidden"""
+        if event is not None and event.widget is not self._master:
+            return
+        self._paused = True
+        self._cancel()
+
+    def resume(self, event=None):
+        """start ticking again, running every job that fell due while paused"""
+        if event is not None and event.widget is not self._master:
+            return
+        if not self._paused:
+            return
+        self._paused = False
+        now = monotonic()
+        for job in self._jobs:
+            job[0] = min(job[0], now)
+        self._schedule()
+
+    def stop(self):
+        """stop ticking for good"""
+        self._stopped = True
+        self._cancel()
+
+    def _cancel(self):
+        """drop the pending callback, if there is one"""
+        if self._after is not None:
+            self._master.after_cancel(self._after)
+            self._after = None
+
+    def _schedule(self):
+        """ask tk to call back when the next job is due"""
+        self._cancel()
+        if self._paused or self._stopped or not self._jobs:
+            return
+        delay = min(job[0] for job in self._jobs) - monotonic()
+        self._after = self._master.after(max(ceil(delay * 1000), 0), self._tick)
+
+    def _tick(self):
+        """run the jobs that are due"""
+        self._after = None
+        now = monotonic()
+        try:
+            for job in list(self._jobs):
+                if job[0] > now or job not in self._jobs:
+                    continue
+                job[0] += job[1]
+                if job[0] <= now:
+                    # fell behind by more than a period, skip the missed calls
+                    job[0] = now + job[1]
+                job[2]()
+                if self._stopped:
+                    return
+        finally:
+            # a job that raises is reported by tk, and must not stop the
+            # ticking of every job
+            self._schedule()
+
+
+class StatusBar(tk.Frame):
     """ "
     this is statusbar class
     which shows a statusbar under the board.
     """
 
-    def __init__(self, master, **kw):
+    def __init__(self, master, game=None, ticker=None, **kw):
         """define what are these attributes and display the board for the games."""
         super().__init__(master, **kw)
         self._master = master
-        self._clock_image = tk.PhotoImage(file="images/clock.gif")
-        self._pokeball = tk.PhotoImage(file="images/full_pokeball.gif")
-        self._frame1 = tk.Frame(self._master, bg="white")
+        self._game = game
+        self._clock_image = assets.get_image("images/clock.gif")
+        self._pokeball = assets.get_image("images/full_pokeball.gif")
+        self._frame1 = tk.Frame(self, bg="white")
         self._frame1.pack(side=tk.LEFT, expand=1, fill=tk.BOTH)
-        self._frame2 = tk.Frame(self._master, bg="white")
+        self._frame2 = tk.Frame(self, bg="white")
         self._frame2.pack(side=tk.LEFT, expand=1, fill=tk.BOTH)
-        self._frame3 = tk.Frame(self._master, bg="white")
+        self._frame3 = tk.Frame(self, bg="white")
         self._frame3.pack(side=tk.LEFT, expand=1, fill=tk.BOTH)
         tk.Label(self._frame1, image=self._pokeball, bg="white").pack(
             side=tk.LEFT, padx=(50, 0), pady=20
@@ -540,22 +940,42 @@ class StatusBar(tk.Frame, BoardModel):
             bg="white",
             font="helvetica 10",
         ).pack(side=tk.TOP, pady=(5, 20))
+        # what the labels show now, so unchanged values are not set again
+        self._time_text = "0m 0s"
+        self._counts = None
+        if ticker is not None:
+            ticker.add(self.timer, TIMER_INTERVAL)
 
     def newgame(self):
         """create a new board with different pokemon locations"""
-        pass
+        if self._game is not None:
+            self._game.new_game()
 
     def restart(self):
         """restart the same game"""
-        self._board_view.draw_board(self._pokemonGame.get_game())
+        if self._game is not None:
+            self._game.restart()
 
     def timer(self):
-        """a timer for statusbar"""
-        self.after(1000, self.timer)
+        """show the time played, only touching the label when it changes"""
+        if self._game is None:
+            return
+        minutes, seconds = divmod(int(self._game.elapsed()), 60)
+        text = f"{minutes}m {seconds}s"
+        if text != self._time_text:
+            self._time_text = text
+            self._label4.config(text=text)
 
     def count(self, num_attempted_catches, num_pokemon):
         """count the number of pokemonball"""
-        pass
+        counts = (num_attempted_catches, num_pokemon)
+        if counts == self._counts:
+            return
+        self._counts = counts
+        self._label1.config(text=f"{num_attempted_catches} attemped catches")
+        self._label2.config(
+            text=f"{num_pokemon - num_attempted_catches} pokeballs left"
+        )
 
 
 class ImageBoardView(BoardView):
@@ -567,84 +987,239 @@ class ImageBoardView(BoardView):
     def __init__(self, master, grid_size=10, board_width=600):
         """define what are these attributes and display the board for the games."""
         super().__init__(master, grid_size, board_width)
-        self._tall_grass = tk.PhotoImage(file="images/unrevealed.gif")
-        self._pokemon_ball = tk.PhotoImage(file="images/pokeball.gif")
-        self._zero = tk.PhotoImage(file="images/zero_adjacent.gif")
-        self._one = tk.PhotoImage(file="images/one_adjacent.gif")
-        self._two = tk.PhotoImage(file="images/two_adjacent.gif")
-        self._three = tk.PhotoImage(file="images/three_adjacent.gif")
-        self._four = tk.PhotoImage(file="images/four_adjacent.gif")
-        self._five = tk.PhotoImage(file="images/five_adjacent.gif")
-        self._six = tk.PhotoImage(file="images/six_adjacent.gif")
-        self._seven = tk.PhotoImage(file="images/seven_adjacent.gif")
-        self._eight = tk.PhotoImage(file="images/eight_adjacent.gif")
-        pokemon_profile = {
-            1: "images/pokemon_sprites/pikachu.gif",
-            2: "images/pokemon_sprites/charizard.gif",
-            3: "images/pokemon_sprites/cyndaquil.gif",
-            4: "images/pokemon_sprites/psyduck.gif",
-            5: "images/pokemon_sprites/togepi.gif",
-            6: "images/pokemon_sprites/umbreon.gif",
+        # tiles are looked up on first use, so unused sprites are never loaded
+        self._tiles = {
+            UNEXPOSED: assets.TILES["unrevealed"],
+            FLAG: assets.TILES["pokeball"],
+            POKEMON: assets.SPRITES[0],
         }
-        self._pokemon1 = tk.PhotoImage(file="images/pokemon_sprites/pikachu.gif")
-        self._pokemon2 = tk.PhotoImage(file="images/pokemon_sprites/charizard.gif")
-        self._pokemon3 = tk.PhotoImage(file="images/pokemon_sprites/cyndaquil.gif")
-        self._pokemon4 = tk.PhotoImage(file="images/pokemon_sprites/psyduck.gif")
-        self._pokemon5 = tk.PhotoImage(file="images/pokemon_sprites/togepi.gif")
-        self._pokemon6 = tk.PhotoImage(file="images/pokemon_sprites/umbreon.gif")
-
-    def draw_board(self, board):
-        """ "draw out a new image board"""
-        for index in range(len(board)):
-            position = self.index_to_position(index)
-            pixel = self.position_to_pixel(position)
-            if board[index] == UNEXPOSED:
-                self.create_image(
-                    pixel[0], pixel[1], anchor="nw", image=self._tall_grass
-                )
-
-            elif board[index] == FLAG:
-                self.create_image(
-                    pixel[0], pixel[1], anchor="nw", image=self._pokemon_ball
-                )
-
-            elif board[index] == POKEMON:
-                self.create_image(pixel[0], pixel[1], anchor="nw", image=self._pokemon1)
+        for digit in assets.DIGITS:
+            self._tiles[digit] = assets.TILES[digit]
+        self._cell_images = {}
+
+    def create_cell(self):
+        """create the canvas image of one cell"""
+        return (self.create_image(0, 0, anchor="nw", image=self.tile(UNEXPOSED)),)
+
+    def place_cell(self, index):
+        """move the canvas image of the cell at index to where it is drawn"""
+        pixel = self.position_to_pixel(self.index_to_position(index))
+        self.coords(self._cell_items[index][0], pixel[0], pixel[1])
+
+    def draw_cell(self, index, character):
+        """show the image of character in the cell at index"""
+        self.itemconfig(self._cell_items[index][0], image=self.tile(character))
+
+    def zoom(self, step, pixel=(0, 0)):
+        """change the cell size, switching to tiles of the new size"""
+        self._cell_images = {}
+        super().zoom(step, pixel)
+
+    def tile(self, character):
+        """(tk.PhotoImage) Returns the image drawn for character."""
+        image = self._cell_images.get(character)
+        if image is None:
+            image = assets.get_image(self._tiles[character], self.cell_size)
+            self._cell_images[character] = image
+        return image
+
+
+class VisibleCells:
+    """
+    this is VisibleCells class
+    which stands for the indexes of a rectangle of cells, in place of the
+    per cell items of a BoardView.
+    """
 
-            elif board[index] == "0":
-                self.create_image(pixel[0], pixel[1], anchor="nw", image=self._zero)
+    def __init__(self, grid_size, rows, cols):
+        self._grid_size = grid_size
+        self.rows = rows
+        self.cols = cols
 
-            elif board[index] == "1":
-                self.create_image(pixel[0], pixel[1], anchor="nw", image=self._one)
+    def __contains__(self, index):
+        row, col = divmod(index, self._grid_size)
+        return row in self.rows and col in self.cols
 
-            elif board[index] == "2":
-                self.create_image(pixel[0], pixel[1], anchor="nw", image=self._two)
+    def __len__(self):
+        return len(self.rows) * len(self.cols)
 
-            elif board[index] == "3":
-                self.create_image(pixel[0], pixel[1], anchor="nw", image=self._three)
+    def __iter__(self):
+        for row in self.rows:
+            start = row * self._grid_size
+            yield from range(start + self.cols.start, start + self.cols.stop)
 
-            elif board[index] == "4":
-                self.create_image(pixel[0], pixel[1], anchor="nw", image=self._four)
 
-            elif board[index] == "5":
-                self.create_image(pixel[0], pixel[1], anchor="nw", image=self._five)
+class RasterBoardView(ImageBoardView):
+    """
+    this is RasterBoardView class
+    which draws the cells in view into one image instead of giving each cell
+    a canvas item.
+
+    The raster holds whole cells from the first one in view, and its single
+    canvas item is shifted by the part of that cell scrolled off. Tiles are
+    copied in a row of equal cells at a time, since tk repeats a copied image
+    to fill the area it is copied to, so the canvas item count stays the
+    same however big the board is or however far out the view is zoomed.
+    The digit tiles are copied out of one atlas image of the cell size.
+    """
 
-            elif board[index] == "6":
-                self.create_image(pixel[0], pixel[1], anchor="nw", image=self._six)
+    def __init__(self, master, grid_size=10, board_width=600):
+        self._raster = None
+        self._raster_item = None
+        super().__init__(master, grid_size, board_width)
+        self._cell_items = VisibleCells(grid_size, range(0), range(0))
+
+    def resize_raster(self, width, height):
+        """make the raster width by height pixels and clear it"""
+        if self._raster is None:
+            self._raster = tk.PhotoImage(width=width, height=height)
+            self._raster_item = self.create_image(
+                0, 0, anchor="nw", image=self._raster
+            )
+        else:
+            self._raster.blank()
+            self._raster.config(width=width, height=height)
+
+    def blit(self, character, x, y, columns=1, rows=1):
+        """copy the tile of character into the raster at x, y, repeated over
+        columns by rows cells"""
+        size = self.cell_size
+        raster = self._raster
+        image, box = self.source(character)
+        raster.tk.call(
+            raster.name,
+            "copy",
+            image.name,
+            "-from",
+            *box,
+            "-to",
+            x,
+            y,
+            x + columns * size,
+            y + rows * size,
+        )
 
-            elif board[index] == "7":
-                self.create_image(pixel[0], pixel[1], anchor="nw", image=self._seven)
+    def source(self, character):
+        """(tuple<tk.PhotoImage, tuple<int, int, int, int>>) Returns the image
+        the tile of character is copied from and the box of the tile in it"""
+        if character in assets.DIGITS:
+            atlas, boxes = assets.get_atlas(assets.DIGITS, self.cell_size)
+            return atlas, boxes[character]
+        size = self.cell_size
+        return self.tile(character), (0, 0, size, size)
+
+    def refresh(self):
+        """composite every cell in view into the raster"""
+        if self._board is None:
+            return
+        first_col, first_row = self.pixel_to_position((0, 0))
+        last_col, last_row = self.pixel_to_position((self._width - 1, self._width - 1))
+        rows = range(max(first_row, 0), min(last_row + 1, self.grid_size))
+        cols = range(max(first_col, 0), min(last_col + 1, self.grid_size))
+        self._cell_items = VisibleCells(self.grid_size, rows, cols)
+        size = self.cell_size
+        self.resize_raster(len(cols) * size, len(rows) * size)
+        x, y = self.position_to_pixel((cols.start, rows.start))
+        self.coords(self._raster_item, x, y)
+
+        # cover everything at once, then draw what is not covered
+        self.blit(UNEXPOSED, 0, 0, len(cols), len(rows))
+        runs = []
+        for row in rows:
+            first = row * self.grid_size + cols.start
+            line = self._board[first : first - cols.start + cols.stop]
+            for match in UNCOVERED_RUN.finditer(line):
+                start = first + match.start()
+                for _, cells in groupby(match.group()):
+                    end = start + len(list(cells))
+                    runs.append((start, end))
+                    start = end
+        for start, end in runs:
+            self._draw_run(start, end)
+        self._dirty.clear()
+        if self._hint_item is not None:
+            self.tag_raise(self._hint_item)
+
+    def _dirty_runs(self, cells):
+        """(list<tuple<int, int>>) Returns the sorted cells as runs of
+        neighbouring cells in a row that show the same character."""
+        board = self._board
+        runs = []
+        start = end = None
+        for index in sorted(cells):
+            if (
+                index == end
+                and index % self.grid_size
+                and board[index] == board[start]
+            ):
+                end += 1
+                continue
+            if start is not None:
+                runs.append((start, end))
+            start, end = index, index + 1
+        if start is not None:
+            runs.append((start, end))
+        return runs
+
+    def _draw_run(self, start, end):
+        """copy the tiles of the cells from start to end, in one row, into
+        the raster"""
+        row, col = divmod(start, self.grid_size)
+        size = self.cell_size
+        self.blit(
+            self._board[start],
+            (col - self._cell_items.cols.start) * size,
+            (row - self._cell_items.rows.start) * size,
+            end - start,
+        )
 
-            elif board[index] == "8":
-                self.create_image(pixel[0], pixel[1], anchor="nw", image=self._eight)
+    def draw_cell(self, index, character):
+        """copy the tile of character into the cell at index"""
+        row, col = divmod(index, self.grid_size)
+        size = self.cell_size
+        self.blit(
+            character,
+            (col - self._cell_items.cols.start) * size,
+            (row - self._cell_items.rows.start) * size,
+        )
 
-            else:
-                # self.create_rectangle()
-                # self.create_text(text=board[index])
-                self.create_rectangle(
-                    pixel[0], pixel[1], pixel[0] + 60, pixel[1] + 60, fill="light green"
-                )
-                self.create_text(pixel[0] + 30, pixel[1] + 30, text=board[index])
+    def draw_dirty(self):
+        """copy the changed cells into the raster, a run at a time, until
+        the frame budget is spent"""
+        self._draw_job = None
+        deadline = perf_counter() + FRAME_BUDGET
+        runs = self._dirty_runs(self._dirty)
+        self._dirty.clear()
+        for number, (start, end) in enumerate(runs):
+            self._draw_run(start, end)
+            if perf_counter() > deadline:
+                for start, end in runs[number + 1 :]:
+                    self._dirty.update(range(start, end))
+                break
+        if self._dirty:
+            self._draw_job = self.after(1, self.draw_dirty)
+
+    def finish_drawing(self):
+        """copy every changed cell still waiting into the raster, at once"""
+        if self._draw_job is not None:
+            self.after_cancel(self._draw_job)
+            self._draw_job = None
+        for start, end in self._dirty_runs(self._dirty):
+            self._draw_run(start, end)
+        self._dirty.clear()
+        self.update_idletasks()
+
+
+instrument.watch(BoardView, "draw_board")
+instrument.watch(BoardView, "draw_dirty")
+instrument.watch(BoardView, "refresh")
+instrument.watch(BoardView, "draw_cell", cells=lambda result: 1)
+instrument.watch(BoardView, "create_cell", items=len)
+instrument.watch(ImageBoardView, "draw_cell", cells=lambda result: 1)
+instrument.watch(ImageBoardView, "create_cell", items=len)
+instrument.watch(RasterBoardView, "draw_dirty")
+instrument.watch(RasterBoardView, "refresh")
+instrument.watch(RasterBoardView, "blit", cells=lambda result: 1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,334 @@
+"""
+Zero regions: the openings a click on a zero cell uncovers.
+
+Once the pokemons are placed, the cells with no pokemon around them fall into
+fixed connected regions, and a click on any of them uncovers the whole region
+plus the numbered cells around it. ZeroRegions labels every region in one
+pass: the zero cells of each row are found as runs, and the runs that touch
+in neighbouring rows are joined with a union-find. A region is kept as its
+runs, so revealing it is a lookup followed by a few slices of the board
+buffer instead of a search over every cell.
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+
+
+# a run of cells with no pokemon around them, in a buffer of counts
+ZERO_RUN = re.compile(rb"\x00+")
+# a stretch of cells marked in ZeroRegions.spans
+MARKED_RUN = re.compile(rb"\x01+")
+
+
+def row_reach(steps):
+    """Work out which columns of the rows around a row its cells touch.
+
+    Parameters:
+        steps (tuple<tuple<int, int>>): The (row, column) steps from a cell of
+        the row to its neighbours, see Topology.row_steps.
+
+    Returns:
+        (tuple<tuple<int, int, int>>): (row step, lowest, highest column step)
+        for the row above, the row itself and the row below. A run of columns
+        [a, b) touches columns [a + lowest, b + highest) of that row.
+    """
+    reach = []
+    for dr in (-1, 0, 1):
+        # a run always covers itself, so the row itself includes step 0
+        columns = [dc for step_row, dc in steps if step_row == dr]
+        if dr == 0:
+            columns.append(0)
+        if columns:
+            reach.append((dr, min(columns), max(columns)))
+    return tuple(reach)
+
+
+def zero_cells(counts, pokemon_locations):
+    """(bytearray) Returns counts with the pokemons set to 1, so that the zero
+    bytes are the zero cells: a pokemon with no pokemon around it is not one."""
+    zeros = bytearray(counts)
+    for location in pokemon_locations:
+        zeros[location] = 1
+    return zeros
+
+
+class ZeroRegions:
+    """
+    this is ZeroRegions class
+    which labels the connected regions of zero cells of one pokemon layout.
+
+    Runs are stored row by row as flat arrays of their first and past the end
+    cell indexes, and the runs of each region are listed together, so a board
+    of millions of cells costs a few bytes per run.
+    """
+
+    def __init__(self, topology, counts, pokemon_locations):
+        """
+        Parameters:
+            topology (Topology): The shape of the board.
+            counts (bytearray): The number of pokemons next to every cell.
+            pokemon_locations (tuple<int>): The indexes of the pokemons.
+        """
+        self._set_shape(topology)
+        grid_size = self.grid_size
+        zeros = zero_cells(counts, pokemon_locations)
+        starts = array("i")
+        ends = array("i")
+        # row_first[row] is the first run of row, row_first[grid_size] the count
+        row_first = array("i", bytes(4 * (grid_size + 1)))
+        for row in range(grid_size):
+            row_first[row] = len(starts)
+            base = row * grid_size
+            for match in ZERO_RUN.finditer(zeros, base, base + grid_size):
+                starts.append(match.start())
+                ends.append(match.end())
+        row_first[grid_size] = len(starts)
+        self._starts = starts
+        self._ends = ends
+
+        parent = array("i", range(len(starts)))
+
+        def find(run):
+            while parent[run] != run:
+                parent[run] = parent[parent[run]]
+                run = parent[run]
+            return run
+
+        def union(first, second):
+            first = find(first)
+            second = find(second)
+            if first < second:
+                parent[second] = first
+            elif second < first:
+                parent[first] = second
+
+        # only the row below is looked at; the row above did this row
+        for row in range(grid_size):
+            below = row + 1
+            if below == grid_size:
+                if not self._wraps or grid_size < 2:
+                    continue
+                below = 0
+            low, high = next((lo, hi) for dr, lo, hi in self._reach[row] if dr == 1)
+            base = row * grid_size
+            below_base = below * grid_size
+            below_first = row_first[below]
+            below_last = row_first[below + 1]
+            for run in range(row_first[row], row_first[row + 1]):
+                for start, end in self._columns(
+                    starts[run] - base + low, ends[run] - base + high
+                ):
+                    other = bisect_right(
+                        ends, below_base + start, below_first, below_last
+                    )
+                    while other < below_last and starts[other] < below_base + end:
+                        union(run, other)
+                        other += 1
+            # the ends of a wrapped row touch
+            first, last = row_first[row], row_first[row + 1] - 1
+            if (
+                self._wraps
+                and first < last
+                and starts[first] == base
+                and ends[last] == base + grid_size
+            ):
+                union(first, last)
+
+        # number the regions in order of their first run, then list the runs
+        # of each region together
+        labels = array("i", bytes(4 * len(starts)))
+        sizes = array("i")
+        for run in range(len(starts)):
+            root = find(run)
+            if root == run:
+                labels[run] = len(sizes)
+                sizes.append(0)
+            else:
+                labels[run] = labels[root]
+            sizes[labels[run]] += 1
+        first = array("i", bytes(4 * (len(sizes) + 1)))
+        for label, size in enumerate(sizes):
+            first[label + 1] = first[label] + size
+        members = array("i", bytes(4 * len(starts)))
+        filled = array("i", first)
+        for run, label in enumerate(labels):
+            members[filled[label]] = run
+            filled[label] += 1
+        self._labels = labels
+        self._first = first
+        self._members = members
+
+    @classmethod
+    def around(cls, topology, counts, pokemon_cells, index, limit=None):
+        """Label only the region holding index, following its runs from row to
+        row, so the work is that of the one opening rather than of the board.
+
+        Parameters:
+            topology (Topology): The shape of the board.
+            counts (bytearray): The number of pokemons next to every cell.
+            pokemon_cells (bytearray): 1 for the cells holding a pokemon, 0
+            for the others.
+            index (int): A cell of the region.
+            limit (int): The most runs to follow, None for no limit.
+
+        Returns:
+            (ZeroRegions): The region as label 0, no region when index is not
+            a zero cell, or None when the region has more than limit runs.
+        """
+        regions = cls.__new__(cls)
+        regions._set_shape(topology)
+        grid_size = regions.grid_size
+        # or-ing the buffers as big numbers marks the pokemons without a loop
+        # over them, which costs more than a small opening on a dense board
+        zeros = (
+            int.from_bytes(counts, "big") | int.from_bytes(pokemon_cells, "big")
+        ).to_bytes(len(counts), "big")
+        wraps = regions._wraps
+        # the runs of each row looked at, as lists of starts and ends
+        rows = {}
+
+        def row_runs(row):
+            runs = rows.get(row)
+            if runs is None:
+                base = row * grid_size
+                matches = list(ZERO_RUN.finditer(zeros, base, base + grid_size))
+                runs = rows[row] = (
+                    [match.start() for match in matches],
+                    [match.end() for match in matches],
+                )
+            return runs
+
+        found = {}
+        if not zeros[index]:
+            starts, ends = row_runs(index // grid_size)
+            run = bisect_right(starts, index) - 1
+            found[starts[run]] = ends[run]
+        queue = list(found.items())
+        while queue:
+            start, end = queue.pop()
+            row, column = divmod(start, grid_size)
+            length = end - start
+            for dr, low, high in regions._reach[row]:
+                other = row + dr
+                if not 0 <= other < grid_size:
+                    if not wraps:
+                        continue
+                    other %= grid_size
+                elif not dr and not wraps:
+                    # the runs of a row are apart unless its ends touch
+                    continue
+                starts, ends = row_runs(other)
+                base = other * grid_size
+                for first, last in regions._columns(
+                    column + low, column + length + high
+                ):
+                    run = bisect_right(ends, base + first)
+                    while run < len(starts) and starts[run] < base + last:
+                        if starts[run] not in found:
+                            found[starts[run]] = ends[run]
+                            queue.append((starts[run], ends[run]))
+                        run += 1
+            if limit is not None and len(found) > limit:
+                return None
+
+        regions._starts = array("i", sorted(found))
+        regions._ends = array("i", (found[start] for start in regions._starts))
+        regions._labels = array("i", bytes(4 * len(found)))
+        regions._first = array("i", (0, len(found)) if found else (0,))
+        regions._members = array("i", range(len(found)))
+        return regions
+
+    def _set_shape(self, topology):
+        """Keep what the labelling needs to know of the board's shape."""
+        grid_size = topology.grid_size
+        self.grid_size = grid_size
+        self._wraps = topology.wraps
+        reaches = [
+            row_reach(topology.row_steps(row)) for row in range(min(grid_size, 2))
+        ]
+        self._reach = [reaches[topology.row_class(row)] for row in range(grid_size)]
+
+    def __len__(self):
+        """(int) Returns the number of regions."""
+        return len(self._first) - 1
+
+    def _columns(self, start, end):
+        """(list<tuple<int, int>>) Returns the column range [start, end) cut
+        to the grid, in one or two pieces when the grid wraps."""
+        grid_size = self.grid_size
+        if not self._wraps:
+            return [(max(start, 0), min(end, grid_size))]
+        if end - start >= grid_size:
+            return [(0, grid_size)]
+        pieces = [(max(start, 0), min(end, grid_size))]
+        if start < 0:
+            pieces.append((start + grid_size, grid_size))
+        if end > grid_size:
+            pieces.append((0, end - grid_size))
+        return pieces
+
+    def region(self, index):
+        """(int) Returns the label of the region holding the cell at index, or
+        -1 when it is not a zero cell."""
+        run = bisect_right(self._starts, index) - 1
+        if run < 0 or index >= self._ends[run]:
+            return -1
+        return self._labels[run]
+
+    def runs(self, label):
+        """(list<tuple<int, int>>) Returns the [start, end) index ranges of
+        the zero cells of a region."""
+        starts = self._starts
+        ends = self._ends
+        return [
+            (starts[run], ends[run])
+            for run in self._members[self._first[label] : self._first[label + 1]]
+        ]
+
+    def spans(self, label):
+        """Returns the cells a click on a region uncovers: its zero cells and
+        the numbered cells around them.
+
+        The runs, widened to their neighbours, are marked in a buffer over the
+        rows the region spans, and the marked stretches are read back.
+
+        Returns:
+            (list<tuple<int, int>>): Sorted [start, end) index ranges that do
+            not overlap.
+        """
+        grid_size = self.grid_size
+        starts = self._starts
+        ends = self._ends
+        members = self._members[self._first[label] : self._first[label + 1]]
+        if self._wraps:
+            top, bottom = 0, grid_size
+        else:
+            top = max(starts[members[0]] // grid_size - 1, 0)
+            bottom = min(starts[members[-1]] // grid_size + 2, grid_size)
+        base = top * grid_size
+        marked = bytearray((bottom - top) * grid_size)
+        ones = memoryview(b"\x01" * grid_size)
+        reach = self._reach
+        for run in members:
+            start = starts[run]
+            row, column = divmod(start, grid_size)
+            length = ends[run] - start
+            for dr, low, high in reach[row]:
+                other = row + dr
+                if not 0 <= other < grid_size:
+                    if not self._wraps:
+                        continue
+                    other %= grid_size
+                offset = other * grid_size - base
+                first = column + low
+                last = column + length + high
+                if first < 0 or last > grid_size:
+                    for first, last in self._columns(first, last):
+                        marked[offset + first : offset + last] = ones[: last - first]
+                else:
+                    marked[offset + first : offset + last] = ones[: last - first]
+        return [
+            (base + match.start(), base + match.end())
+            for match in MARKED_RUN.finditer(marked)
+        ]
@@ -0,0 +1,152 @@
+"""
+Versioned binary save format for BoardModel.
+
+Layout, little endian:
+    header      magic, version, grid size, pokemon count, seed,
+                elapsed seconds and attempted catches (see HEADER)
+    board       4 bits per cell, two cells per byte, first cell in the
+                high half
+    pokemons    1 bit per cell, cell i is bit i % 8 of byte i // 8
+
+Loading maps the file into memory and decodes the board with bytes.translate
+and slice assignment, so no game string is parsed and the Python level work
+is proportional to the number of pokemons, not the number of cells.
+"""
+
+import mmap
+import re
+import struct
+
+from model import FLAG_BYTE, POKEMON_BYTE, UNEXPOSED_BYTE, BoardModel
+
+
+MAGIC = b"PKMN"
+VERSION = 1
+HEADER = struct.Struct("<4sHIIQdI")
+
+# board buffer byte -> 4 bit code
+NIBBLES = {ord(str(number)): number for number in range(9)}
+NIBBLES[UNEXPOSED_BYTE] = 9
+NIBBLES[FLAG_BYTE] = 10
+NIBBLES[POKEMON_BYTE] = 11
+_PACK_HIGH = bytes(NIBBLES.get(code, 0) << 4 for code in range(256))
+_PACK_LOW = bytes(NIBBLES.get(code, 0) for code in range(256))
+_CODES = {number: code for code, number in NIBBLES.items()}
+_UNPACK_HIGH = bytes(_CODES.get(byte >> 4, UNEXPOSED_BYTE) for byte in range(256))
+_UNPACK_LOW = bytes(_CODES.get(byte & 15, UNEXPOSED_BYTE) for byte in range(256))
+# set bits of every byte value
+_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+_NONZERO = re.compile(rb"[^\x00]")
+
+
+def pack_cells(cells):
+    """Pack a board buffer at 4 bits per cell.
+
+    Parameters:
+        cells (bytes): One byte per cell, as returned by BoardModel.get_cells.
+
+    Returns:
+        (bytes): Two cells per byte.
+    """
+    if len(cells) % 2:
+        cells = cells + bytes((UNEXPOSED_BYTE,))
+    high = cells[0::2].translate(_PACK_HIGH)
+    low = cells[1::2].translate(_PACK_LOW)
+    # the halves never overlap, so or-ing them as big numbers packs every byte
+    packed = int.from_bytes(high, "big") | int.from_bytes(low, "big")
+    return packed.to_bytes(len(high), "big")
+
+
+def unpack_cells(packed, cell_count):
+    """Turn packed cells back into a board buffer.
+
+    Parameters:
+        packed (bytes): Two cells per byte, as made by pack_cells.
+        cell_count (int): The number of cells on the board.
+
+    Returns:
+        (bytearray): One byte per cell.
+    """
+    cells = bytearray(len(packed) * 2)
+    cells[0::2] = packed.translate(_UNPACK_HIGH)
+    cells[1::2] = packed.translate(_UNPACK_LOW)
+    del cells[cell_count:]
+    return cells
+
+
+def save_board(path, model, elapsed=0.0):
+    """Write model to path.
+
+    Parameters:
+        path (str): The file to write.
+        model (BoardModel): The board to save.
+        elapsed (float): Seconds played so far.
+    """
+    cell_count = model.grid_size**2
+    pokemons = bytearray((cell_count + 7) // 8)
+    for location in model.get_pokemon_locations():
+        pokemons[location >> 3] |= 1 << (location & 7)
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        model.grid_size,
+        model.get_num_pokemon(),
+        model.seed,
+        elapsed,
+        model.get_num_attempted_catches(),
+    )
+    with open(path, "wb") as file:
+        file.write(header)
+        file.write(pack_cells(model.get_cells()))
+        file.write(pokemons)
+
+
+def load_board(path):
+    """Read a board written by save_board.
+
+    Parameters:
+        path (str): The file to read.
+
+    Returns:
+        (tuple<BoardModel, float, int>): The board, the seconds played and the
+        number of attempted catches.
+    """
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if len(data) < HEADER.size:
+                raise ValueError(f"{path} is not a pokemon save file")
+            (
+                magic,
+                version,
+                grid_size,
+                num_pokemon,
+                seed,
+                elapsed,
+                attempted_catches,
+            ) = HEADER.unpack_from(data)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a pokemon save file")
+            if version > VERSION:
+                raise ValueError(f"{path} was saved by a newer version")
+
+            cell_count = grid_size**2
+            board_start = HEADER.size
+            pokemons_start = board_start + (cell_count + 1) // 2
+            end = pokemons_start + (cell_count + 7) // 8
+            if len(data) < end:
+                raise ValueError(f"{path} is truncated")
+
+            locations = []
+            for match in _NONZERO.finditer(data, pokemons_start, end):
+                base = (match.start() - pokemons_start) * 8
+                locations.extend(base + bit for bit in _BITS[data[match.start()]])
+
+            # the model takes the unpacked buffer as it is, without a copy
+            model = BoardModel(
+                grid_size,
+                num_pokemon,
+                seed=seed,
+                pokemon_locations=tuple(locations),
+                cells=unpack_cells(data[board_start:pokemons_start], cell_count),
+            )
+    return model, elapsed, attempted_catches
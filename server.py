@@ -0,0 +1,329 @@
+"""
+Game server: many games of BoardModel in one process, without tkinter.
+
+Clients talk line-delimited JSON over a local TCP or Unix socket. Every
+request is one object on one line with an "op", and gets one line back,
+carrying the request's "id" if it had one:
+
+    {"id": 1, "op": "new", "grid_size": 10, "num_pokemon": 15, "seed": 7}
+    -> {"id": 1, "game": 1, "grid_size": 10, "num_pokemon": 15, "seed": 7}
+    {"id": 2, "op": "reveal", "game": 1, "index": 55}
+    -> {"id": 2, "changed": [[55, "0"], [44, "1"], ...], "state": "playing"}
+
+The ops are new, reveal, flag, chord, state and close. A move answers with
+only the cells it changed, as [index, character] pairs, and the state of the
+game: "playing", "won" or "lost". Errors are answered with {"error": ...}.
+Boards are at most MAX_GRID_SIZE a side and requests at most LINE_LIMIT bytes.
+
+Games nobody has touched for a while are evicted to the save format (see
+savefile.py) and loaded back on their next request.
+
+    python server.py --port 8765
+    python server.py --unix /tmp/pokemon.sock
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from history import GameHistory
+from model import BoardModel
+from savefile import load_board, save_board
+
+
+PLAYING = "playing"
+WON = "won"
+LOST = "lost"
+# requests are answered on the event loop, so the boards are kept small
+# enough that no request holds up the other games for long
+MAX_GRID_SIZE = 200
+# requests and answers are short, except the board sent by state, which is
+# at most 6 bytes per cell once its non ascii characters are escaped
+LINE_LIMIT = 2**20
+
+
+class ServerGame:
+    """
+    this is ServerGame class
+    which holds one game of the server and when it was last played.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.history = GameHistory(model)
+        self.last_used = time.monotonic()
+
+    def state(self):
+        """(str) Returns PLAYING, WON or LOST."""
+        if self.model.check_loss():
+            return LOST
+        if self.model.check_win():
+            return WON
+        return PLAYING
+
+
+class GameServer:
+    """
+    this is GameServer class
+    which answers the requests of every client and evicts idle games.
+    """
+
+    def __init__(self, directory, idle_timeout=300.0):
+        """
+        Parameters:
+            directory (str): Where evicted games are saved.
+            idle_timeout (float): Seconds without a request before a game is
+            evicted.
+        """
+        self._directory = directory
+        self._idle_timeout = idle_timeout
+        self._games = {}
+        # ids of the games saved in directory
+        self._evicted = set()
+        self._evictions = 0
+        self._next_id = 1
+        os.makedirs(directory, exist_ok=True)
+
+    def num_games(self):
+        """(tuple<int, int>) Returns the games in memory and on disk."""
+        return len(self._games), len(self._evicted)
+
+    def num_evictions(self):
+        """(int) Returns how many times a game was evicted."""
+        return self._evictions
+
+    async def handle_client(self, reader, writer):
+        """Answer the requests of one connection until it closes."""
+        try:
+            while True:
+                request = {}
+                line = await read_line(reader)
+                if line is None:
+                    response = {"error": f"a request is at most {LINE_LIMIT} bytes"}
+                else:
+                    if not line:
+                        break
+                    if not line.strip():
+                        continue
+                    try:
+                        request = json.loads(line)
+                        response = self.handle(request)
+                    except (OSError, ValueError, KeyError, TypeError) as error:
+                        response = {"error": f"{type(error).__name__}: {error}"}
+                if isinstance(request, dict) and "id" in request:
+                    response["id"] = request["id"]
+                writer.write(json.dumps(response, separators=(",", ":")).encode())
+                writer.write(b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def handle(self, request):
+        """Answer one request.
+
+        Parameters:
+            request (dict): A decoded request line.
+
+        Returns:
+            (dict): The answer, without the request id.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("a request must be a JSON object")
+        op = request.get("op")
+        if op == "new":
+            return self.new_game(request)
+        game_id = request["game"]
+        game = self.get_game(game_id)
+        game.last_used = time.monotonic()
+        if op == "state":
+            model = game.model
+            return {
+                "game": game_id,
+                "grid_size": model.grid_size,
+                "num_pokemon": model.get_num_pokemon(),
+                "board": model.get_game(),
+                "attempted_catches": model.get_num_attempted_catches(),
+                "state": game.state(),
+            }
+        if op == "close":
+            del self._games[game_id]
+            return {"game": game_id, "closed": True}
+        if op not in ("reveal", "flag", "chord"):
+            raise ValueError(f"unknown op {op!r}")
+
+        index = request["index"]
+        model = game.model
+        if not 0 <= index < model.grid_size**2:
+            raise ValueError(f"index {index} is off the board")
+        if game.state() != PLAYING:
+            raise ValueError("the game is over")
+        changed = getattr(game.history, op)(index)
+        # the openings are labelled once the answer is out, so the reveal that
+        # placed the pokemons does not wait for it; later reveals look them up
+        asyncio.get_running_loop().call_soon(model.zero_regions)
+        state = game.state()
+        if state == LOST:
+            changed.extend(model.reveal_pokemons())
+        return {
+            "changed": [[i, model.get_cell(i)] for i in changed],
+            "state": state,
+        }
+
+    def new_game(self, request):
+        """Start a game, answering with its id."""
+        grid_size = request.get("grid_size", 10)
+        num_pokemon = request.get("num_pokemon", 15)
+        if (
+            not 0 < grid_size <= MAX_GRID_SIZE
+            or not 0 <= num_pokemon <= grid_size**2
+        ):
+            raise ValueError(f"bad board size, at most {MAX_GRID_SIZE} a side")
+        model = BoardModel(grid_size, num_pokemon, seed=request.get("seed"))
+        game_id = self._next_id
+        self._next_id += 1
+        self._games[game_id] = ServerGame(model)
+        return {
+            "game": game_id,
+            "grid_size": grid_size,
+            "num_pokemon": num_pokemon,
+            "seed": model.seed,
+        }
+
+    def path(self, game_id):
+        """(str) Returns the file an evicted game is saved in."""
+        return os.path.join(self._directory, f"{game_id}.pkmn")
+
+    def get_game(self, game_id):
+        """Returns the game with game_id, loading it back if it was evicted.
+
+        Raises:
+            KeyError: There is no such game.
+        """
+        game = self._games.get(game_id)
+        if game is not None:
+            return game
+        if game_id not in self._evicted:
+            raise KeyError(f"no game {game_id}")
+        model, elapsed, attempted_catches = load_board(self.path(game_id))
+        os.remove(self.path(game_id))
+        self._evicted.discard(game_id)
+        game = self._games[game_id] = ServerGame(model)
+        return game
+
+    def evict(self, game_id):
+        """Save a game to disk and drop it from memory."""
+        game = self._games.pop(game_id)
+        save_board(self.path(game_id), game.model)
+        self._evicted.add(game_id)
+        self._evictions += 1
+
+    def evict_idle(self):
+        """Evict every game idle for longer than the idle timeout.
+
+        Returns:
+            (int): The number of games evicted.
+        """
+        cutoff = time.monotonic() - self._idle_timeout
+        idle = [
+            game_id
+            for game_id, game in self._games.items()
+            if game.last_used < cutoff
+        ]
+        for game_id in idle:
+            self.evict(game_id)
+        return len(idle)
+
+    async def evict_forever(self, interval):
+        """Evict idle games every interval seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+
+async def read_line(reader):
+    """Read one request line.
+
+    Parameters:
+        reader (asyncio.StreamReader): The connection to read from.
+
+    Returns:
+        (bytes): The line, empty at the end of the stream, or None if the line
+        was longer than LINE_LIMIT and has been skipped.
+    """
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as error:
+        # the connection closed, maybe after a last line without its newline
+        return error.partial
+    except asyncio.LimitOverrunError:
+        pass
+    # the rest of a long line may still be on its way, so it is dropped up to
+    # its newline a limit at a time, rather than read as more requests
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            return None
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError as error:
+            await reader.readexactly(error.consumed)
+
+
+async def start(game_server, host="127.0.0.1", port=8765, unix=None):
+    """Start listening for clients of game_server.
+
+    Parameters:
+        game_server (GameServer): The games to serve.
+        host (str): The address to listen on, for TCP.
+        port (int): The TCP port, 0 for any free one.
+        unix (str): The path of a Unix socket to listen on instead of TCP.
+
+    Returns:
+        (asyncio.Server): The listening server.
+    """
+    if unix is not None:
+        return await asyncio.start_unix_server(
+            game_server.handle_client, unix, limit=LINE_LIMIT
+        )
+    return await asyncio.start_server(
+        game_server.handle_client, host, port, limit=LINE_LIMIT
+    )
+
+
+async def serve(directory, host, port, unix, idle_timeout):
+    """Run a game server until it is interrupted."""
+    game_server = GameServer(directory, idle_timeout)
+    server = await start(game_server, host, port, unix)
+    evictor = asyncio.create_task(
+        game_server.evict_forever(min(idle_timeout / 4, 60.0))
+    )
+    print("listening on", unix or server.sockets[0].getsockname())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        evictor.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve pokemon games.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None)
+    parser.add_argument("--directory", default="evicted")
+    parser.add_argument("--idle-timeout", type=float, default=300.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(
+            serve(args.directory, args.host, args.port, args.unix, args.idle_timeout)
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+"""
+Headless runner that plays many games of BoardModel without tkinter.
+
+Every game is played from a seed with a move policy and the results are
+streamed to a JSON lines file (gzip compressed when the name ends in .gz),
+one line per game. Games are spread over a multiprocessing pool. Recorded
+results files and session logs (.pkev) can be replayed the same way.
+
+    python simulate.py --games 10000 --policy random --output results.jsonl.gz
+
+With --profile the phases of every move are timed (see instrument.py) and the
+totals over all games are written as JSON, or CSV when the name ends in .csv.
+With --stats the games are also added to a statistics database (see
+stats.py), in bulk as they finish.
+"""
+
+import argparse
+import gzip
+import json
+import multiprocessing
+import random
+import time
+
+import history
+import instrument
+from model import UNEXPOSED, BoardModel
+from solver import Solver
+from stats import StatsStore
+from topology import TOPOLOGIES
+
+
+REVEAL = "reveal"
+FLAG_MOVE = "flag"
+RESTART_MOVE = "restart"
+CHORD_MOVE = "chord"
+WIN = "win"
+LOSS = "loss"
+STUCK = "stuck"
+# the GameHistory action of each move
+MOVE_ACTIONS = {
+    REVEAL: history.REVEAL,
+    FLAG_MOVE: history.FLAG,
+    RESTART_MOVE: history.RESTART,
+    CHORD_MOVE: history.CHORD,
+}
+
+
+def unexposed_cells(model):
+    """(list<int>) Returns the indexes that are still covered in grass."""
+    game = model.get_game()
+    return [index for index, character in enumerate(game) if character == UNEXPOSED]
+
+
+def random_policy(model, rng):
+    """Reveal a random covered cell.
+
+    Parameters:
+        model (BoardModel): The board being played.
+        rng (random.Random): The game's random generator.
+
+    Returns:
+        (tuple<str, int>): The next move, or None when there is nothing to do.
+    """
+    cell_count = model.grid_size**2
+    # guessing is cheap while most of the board is still covered
+    for _ in range(8):
+        index = rng.randrange(cell_count)
+        if model.get_cell(index) == UNEXPOSED:
+            return REVEAL, index
+    cells = unexposed_cells(model)
+    if not cells:
+        return None
+    return REVEAL, rng.choice(cells)
+
+
+def ordered_policy(model, rng):
+    """Reveal the first covered cell in reading order.
+
+    Parameters:
+        model (BoardModel): The board being played.
+        rng (random.Random): The game's random generator, unused.
+
+    Returns:
+        (tuple<str, int>): The next move, or None when there is nothing to do.
+    """
+    index = model.get_game().find(UNEXPOSED)
+    if index == -1:
+        return None
+    return REVEAL, index
+
+
+class SolverPolicy:
+    """
+    this is SolverPolicy class
+    which plays the hints of a Solver, flagging the pokemons it finds.
+    """
+
+    def __init__(self):
+        self._solver = None
+        self._changed = None
+
+    def observe(self, changed):
+        """Note the indexes changed by the last move."""
+        if self._changed is not None:
+            self._changed.extend(changed)
+
+    def __call__(self, model, rng):
+        if self._solver is None:
+            self._solver = Solver(
+                model.grid_size, model.num_pokemon, model.topology.name
+            )
+        self._solver.update(model.get_game(), self._changed)
+        self._changed = []
+        hint = self._solver.hint()
+        if hint is None:
+            return None
+        index, is_pokemon, probability = hint
+        return (FLAG_MOVE if is_pokemon else REVEAL), index
+
+
+# a fresh policy is made for every game, so policies may keep state
+POLICIES = {
+    "random": lambda: random_policy,
+    "ordered": lambda: ordered_policy,
+    "solver": SolverPolicy,
+}
+
+
+def replay_policy(moves):
+    """Make a policy that plays back a recorded list of moves.
+
+    Parameters:
+        moves (list<tuple<str, int>>): The moves to play, in order.
+
+    Returns:
+        (callable): A policy returning the next recorded move each call.
+    """
+    remaining = iter(moves)
+
+    def policy(model, rng):
+        move = next(remaining, None)
+        return None if move is None else tuple(move)
+
+    return policy
+
+
+def play_game(
+    grid_size,
+    num_pokemon,
+    seed,
+    policy,
+    max_moves=None,
+    record=False,
+    topology="square",
+):
+    """Play one game to the end with policy.
+
+    Moves go through a GameHistory, so the first reveal is always safe, the
+    same as in PokemonGame.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        num_pokemon (int): The number of pokemons on the board.
+        seed (int): Seed of the board and of the policy's random generator.
+        policy (callable): Takes (model, rng) and returns (action, index) or None.
+        A policy with an observe method is told the indexes each move changed.
+        max_moves (int): Give up after this many moves, None for no limit.
+        record (bool): Include the list of moves in the result.
+        topology (str): The shape of the board, a key of topology.TOPOLOGIES.
+
+    Returns:
+        (dict): The seed, board size, moves, revealed cells, outcome and the
+        wall time of the game in seconds.
+    """
+    start = time.perf_counter()
+    model = BoardModel(grid_size, num_pokemon, seed=seed, topology=topology)
+    game_history = history.GameHistory(model)
+    rng = random.Random(seed)
+    moves = []
+    reveals = 0
+    outcome = STUCK
+    while max_moves is None or len(moves) < max_moves:
+        if model.check_loss():
+            outcome = LOSS
+            break
+        if model.check_win():
+            outcome = WIN
+            break
+        move = policy(model, rng)
+        if move is None:
+            break
+        action, index = move
+        if action == REVEAL:
+            changed = game_history.reveal(index)
+            reveals += len(changed)
+        elif action == RESTART_MOVE:
+            changed = game_history.restart()
+        elif action == CHORD_MOVE:
+            changed = game_history.chord(index)
+        else:
+            changed = game_history.flag(index)
+        if hasattr(policy, "observe"):
+            policy.observe(changed)
+        moves.append((action, index))
+
+    result = {
+        "seed": seed,
+        "grid_size": grid_size,
+        "num_pokemon": num_pokemon,
+        "topology": topology,
+        "moves": len(moves),
+        "reveals": reveals,
+        "outcome": outcome,
+        "seconds": round(time.perf_counter() - start, 6),
+    }
+    if record:
+        result["log"] = moves
+    return result
+
+
+def _play_task(task):
+    """Pool worker: play the game described by task."""
+    (
+        grid_size,
+        num_pokemon,
+        seed,
+        policy_name,
+        moves,
+        max_moves,
+        record,
+        profile,
+        topology,
+    ) = task
+    if moves is not None:
+        policy = replay_policy(moves)
+    else:
+        policy = POLICIES[policy_name]()
+    if profile:
+        instrument.enable()
+    result = play_game(
+        grid_size, num_pokemon, seed, policy, max_moves, record, topology
+    )
+    result["policy"] = "replay" if moves is not None else policy_name
+    if profile:
+        result["profile"] = instrument.take()
+    return result
+
+
+def stats_game(result):
+    """(dict) Returns the game of a play_game result as stats.game_row
+    takes it, with its moves if they were recorded."""
+    game = {
+        "grid_size": result["grid_size"],
+        "num_pokemon": result["num_pokemon"],
+        "topology": result["topology"],
+        "seed": result["seed"],
+        "seconds": result["seconds"],
+        "clicks": result["moves"],
+        "outcome": result["outcome"],
+        "source": result.get("policy", "simulate"),
+    }
+    if "log" in result:
+        game["moves"] = [
+            (MOVE_ACTIONS[action], index) for action, index in result["log"]
+        ]
+    return game
+
+
+def open_output(path, mode):
+    """Open a results or log file, gzip compressed if path ends in .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_sessions(path):
+    """Read the sessions of a GameHistory log as recorded games.
+
+    Returns:
+        (iterator<dict>): One dict per session, each with a "log" of moves.
+    """
+    actions = {
+        history.REVEAL: REVEAL,
+        history.FLAG: FLAG_MOVE,
+        history.RESTART: RESTART_MOVE,
+        history.CHORD: CHORD_MOVE,
+    }
+    with open(path, "rb") as file:
+        for session in history.read_sessions(file):
+            session["log"] = [
+                (actions[action], index) for action, index in session["moves"]
+            ]
+            yield session
+
+
+def read_log(path):
+    """Read the games recorded in a results file written with record=True.
+
+    Returns:
+        (iterator<dict>): One dict per game, each with a "log" of moves.
+    """
+    with open_output(path, "r") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def run(
+    output,
+    seeds,
+    grid_size=10,
+    num_pokemon=15,
+    policy="random",
+    processes=None,
+    max_moves=None,
+    record=False,
+    replay=None,
+    chunksize=64,
+    profile=None,
+    topology="square",
+    stats=None,
+):
+    """Play a game for every seed across a process pool and stream the
+    results to output.
+
+    Parameters:
+        output (str): Path of the JSON lines file to write.
+        seeds (iterable<int>): One game is played per seed.
+        grid_size (int): The grid size of the games.
+        num_pokemon (int): The number of pokemons in each game.
+        policy (str): Name of a policy in POLICIES.
+        processes (int): Pool size, None for one per core.
+        max_moves (int): Move limit per game, None for no limit.
+        record (bool): Write the moves of each game so it can be replayed.
+        replay (str): Path of a recorded results file or session log; its
+        games are played back instead of using seeds and policy.
+        chunksize (int): Games handed to a worker at a time.
+        profile (str): Path to write the instrumentation totals of all games
+        to, as CSV if it ends in .csv and JSON otherwise. None to not
+        instrument.
+        topology (str): The shape of the boards, a key of topology.TOPOLOGIES.
+        stats (str): Path of a statistics database to add the games to, None
+        to not keep them. Its index is built again once all games are in.
+
+    Returns:
+        (dict<str, int>): The number of games per outcome.
+    """
+    if replay is not None:
+        games = read_sessions(replay) if replay.endswith(".pkev") else read_log(replay)
+        tasks = (
+            (
+                game["grid_size"],
+                game["num_pokemon"],
+                game["seed"],
+                None,
+                game["log"],
+                max_moves,
+                record,
+                profile is not None,
+                game.get("topology", "square"),
+            )
+            for game in games
+        )
+    else:
+        tasks = (
+            (
+                grid_size,
+                num_pokemon,
+                seed,
+                policy,
+                None,
+                max_moves,
+                record,
+                profile is not None,
+                topology,
+            )
+            for seed in seeds
+        )
+
+    outcomes = {WIN: 0, LOSS: 0, STUCK: 0}
+    instrument.reset()
+    with multiprocessing.Pool(processes) as pool, open_output(output, "w") as file:
+
+        def finished():
+            for result in pool.imap(_play_task, tasks, chunksize):
+                outcomes[result["outcome"]] += 1
+                if "profile" in result:
+                    instrument.merge(result.pop("profile"))
+                file.write(json.dumps(result, separators=(",", ":")) + "\n")
+                yield result
+
+        if stats is None:
+            for _ in finished():
+                pass
+        else:
+            # the games are written to the database as they come in
+            store = StatsStore(stats)
+            try:
+                # the index is only dropped for the load of a fresh database:
+                # one in use keeps it for its readers, and building it again
+                # would sort every game already there
+                store.add_many(
+                    map(stats_game, finished()), rebuild_index=store.is_empty()
+                )
+            finally:
+                store.close()
+    if profile is not None:
+        if profile.endswith(".csv"):
+            instrument.write_csv(profile, instrument.report())
+        else:
+            instrument.write_json(profile, instrument.report())
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play pokemon games headless.")
+    parser.add_argument("--output", default="results.jsonl")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--grid-size", type=int, default=10)
+    parser.add_argument("--pokemons", type=int, default=15)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--max-moves", type=int, default=None)
+    parser.add_argument("--record", action="store_true")
+    parser.add_argument("--replay", default=None)
+    parser.add_argument("--profile", default=None)
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="square")
+    parser.add_argument("--stats", default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    outcomes = run(
+        args.output,
+        range(args.first_seed, args.first_seed + args.games),
+        grid_size=args.grid_size,
+        num_pokemon=args.pokemons,
+        policy=args.policy,
+        processes=args.processes,
+        max_moves=args.max_moves,
+        record=args.record,
+        replay=args.replay,
+        profile=args.profile,
+        topology=args.topology,
+        stats=args.stats,
+    )
+    print(outcomes, f"{time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+Constraint propagation solver for pokemon boards.
+
+The solver only looks at what a player can see: the game string with its
+exposed numbers. Flags are treated as covered cells, since the player may
+have placed them wrongly.
+"""
+
+from model import FLAG, UNEXPOSED
+from topology import get_topology
+
+
+# components of the frontier larger than this are not enumerated
+MAX_ENUMERATION = 24
+
+
+class Solver:
+    """
+    this is Solver class
+    which works out the safe cells and the pokemon cells of a game string.
+
+    Feed it the game after every move with update(); only the numbers next
+    to the changed cells are examined again.
+    """
+
+    def __init__(self, grid_size, num_pokemon, topology="square"):
+        self.grid_size = grid_size
+        self.num_pokemon = num_pokemon
+        self.topology = get_topology(topology, grid_size)
+        self._game = UNEXPOSED * grid_size**2
+        self._safe = set()
+        self._pokemons = set()
+        # known pokemons the game does not show a flag on
+        self._unflagged = set()
+        # exposed numbers that may still tell us something
+        self._active = set()
+        self._dirty = set()
+
+    def neighbours(self, index):
+        """(list<int>) Returns the indexes around index."""
+        return self.topology.neighbours(index)
+
+    def update(self, game, changed=None):
+        """Take in the game after a move.
+
+        Parameters:
+            game (str): Game string.
+            changed (list<int>): The indexes changed by the move, None to
+            compare against the previous game string.
+        """
+        if changed is None:
+            changed = [
+                index
+                for index, (old, new) in enumerate(zip(self._game, game))
+                if old != new
+            ]
+        self._game = game
+        for index in changed:
+            if index in self._pokemons:
+                if game[index] == FLAG:
+                    self._unflagged.discard(index)
+                else:
+                    self._unflagged.add(index)
+            if not game[index].isdigit():
+                continue
+            self._safe.discard(index)
+            self._active.add(index)
+            self._dirty.add(index)
+            for neighbour in self.neighbours(index):
+                if neighbour in self._active:
+                    self._dirty.add(neighbour)
+
+    def safe_cells(self):
+        """(set<int>) Returns the covered cells that certainly hold no pokemon."""
+        self._propagate()
+        return set(self._safe)
+
+    def pokemon_cells(self):
+        """(set<int>) Returns the covered cells that certainly hold a pokemon."""
+        self._propagate()
+        return set(self._pokemons)
+
+    def hint(self):
+        """Pick the next move.
+
+        A certainly safe cell comes first, then a certain pokemon that is not
+        flagged yet, and otherwise the covered cell least likely to hold a
+        pokemon.
+
+        Returns:
+            (tuple<int, bool, float>): The index, whether it holds a pokemon,
+            and the chance of a pokemon being there. None when every cell is
+            exposed or worked out and flagged.
+        """
+        self._propagate()
+        if self._safe:
+            return next(iter(self._safe)), False, 0.0
+        if self._unflagged:
+            return next(iter(self._unflagged)), True, 1.0
+
+        left = self.num_pokemon - len(self._pokemons)
+        if left == 0 or left == self._num_unknown():
+            # the pokemon count settles every cell that is still unknown
+            self._mark(self._unknown_cells(), left > 0)
+            if self._safe or self._unflagged:
+                return self.hint()
+
+        probabilities = self.probabilities()
+        if not probabilities:
+            return None
+        index = min(probabilities, key=probabilities.get)
+        probability = probabilities[index]
+        if probability == 0.0:
+            self._mark([index], False)
+        elif probability == 1.0:
+            self._mark([index], True)
+            return index, True, 1.0
+        return index, False, probability
+
+    def deduce(self):
+        """Work out every cell that follows from what is showing, without
+        guessing.
+
+        On top of the rules update() and safe_cells() apply, this uses the
+        number of pokemons left and every layout of the frontier parts small
+        enough to enumerate.
+
+        Returns:
+            (bool): Whether any cell was newly worked out.
+        """
+        self._propagate()
+        before = len(self._safe) + len(self._pokemons)
+        left = self.num_pokemon - len(self._pokemons)
+        if left == 0 or left == self._num_unknown():
+            self._mark(self._unknown_cells(), left > 0)
+        for cells, constraints in self._components():
+            if len(cells) > MAX_ENUMERATION:
+                continue
+            for cell, probability in self._enumerate(cells, constraints).items():
+                # a cell with or without a pokemon in every layout is certain
+                if probability == 0.0:
+                    self._mark([cell], False)
+                elif probability == 1.0:
+                    self._mark([cell], True)
+        self._propagate()
+        return len(self._safe) + len(self._pokemons) > before
+
+    def probabilities(self):
+        """Estimate the chance of a pokemon for the covered cells.
+
+        Every connected part of the frontier is enumerated exactly when it is
+        small enough. All other covered cells share the pokemons that are left.
+
+        Returns:
+            (dict<int, float>): The chance for each frontier cell, plus one
+            cell away from the frontier when there is one.
+        """
+        self._propagate()
+        probabilities = {}
+        for cells, constraints in self._components():
+            if len(cells) <= MAX_ENUMERATION:
+                probabilities.update(self._enumerate(cells, constraints))
+            else:
+                for cell in cells:
+                    probabilities[cell] = max(
+                        remaining / len(unknown)
+                        for unknown, remaining in constraints
+                        if cell in unknown
+                    )
+
+        interior = self._num_unknown() - len(probabilities)
+        if interior > 0:
+            left = self.num_pokemon - len(self._pokemons) - sum(probabilities.values())
+            probability = min(max(left / interior, 0.0), 1.0)
+            index = self._interior_cell(probabilities)
+            if index is not None:
+                probabilities[index] = probability
+        return probabilities
+
+    def _num_unknown(self):
+        """(int) Returns the number of covered cells not worked out yet."""
+        game = self._game
+        return (
+            game.count(UNEXPOSED)
+            + game.count(FLAG)
+            - len(self._safe)
+            - len(self._pokemons)
+        )
+
+    def _unknown_cells(self):
+        """(list<int>) Returns the covered cells not worked out yet."""
+        return [
+            index
+            for index, character in enumerate(self._game)
+            if character in (UNEXPOSED, FLAG)
+            and index not in self._safe
+            and index not in self._pokemons
+        ]
+
+    def _interior_cell(self, frontier):
+        """Find a covered, unknown cell away from the frontier.
+
+        The middle of the board is preferred, since nothing is known about
+        any cell before the first move.
+        """
+        cell_count = self.grid_size**2
+        middle = (self.grid_size // 2) * self.grid_size + self.grid_size // 2
+        for offset in range(cell_count):
+            index = (middle + offset) % cell_count
+            if (
+                self._game[index] in (UNEXPOSED, FLAG)
+                and index not in frontier
+                and index not in self._safe
+                and index not in self._pokemons
+            ):
+                return index
+        return None
+
+    def _constraint(self, index):
+        """The unknown cells around the exposed number at index and how many
+        pokemons are hidden among them.
+
+        Returns:
+            (tuple<list<int>, int>): The unknown cells and the pokemon count.
+        """
+        unknown = []
+        remaining = int(self._game[index])
+        for neighbour in self.neighbours(index):
+            if neighbour in self._pokemons:
+                remaining -= 1
+            elif neighbour not in self._safe and not self._game[neighbour].isdigit():
+                unknown.append(neighbour)
+        return unknown, remaining
+
+    def _mark(self, cells, is_pokemon):
+        """Record cells as certain and wake the numbers around them."""
+        known = self._pokemons if is_pokemon else self._safe
+        for cell in cells:
+            if cell in self._safe or cell in self._pokemons:
+                continue
+            known.add(cell)
+            if is_pokemon and self._game[cell] != FLAG:
+                self._unflagged.add(cell)
+            for neighbour in self.neighbours(cell):
+                if neighbour in self._active:
+                    self._dirty.add(neighbour)
+
+    def _propagate(self):
+        """Apply the single cell and subset rules until nothing changes."""
+        while self._dirty:
+            index = self._dirty.pop()
+            unknown, remaining = self._constraint(index)
+            if not unknown:
+                self._active.discard(index)
+                continue
+            if remaining == 0:
+                self._mark(unknown, False)
+                continue
+            if remaining == len(unknown):
+                self._mark(unknown, True)
+                continue
+
+            # a number whose unknown cells all sit inside another number's
+            # unknown cells fixes the count of the difference
+            cells = set(unknown)
+            nearby = {
+                other
+                for cell in unknown
+                for other in self.neighbours(cell)
+                if other in self._active and other != index
+            }
+            for other in nearby:
+                other_unknown, other_remaining = self._constraint(other)
+                if not cells.issubset(other_unknown):
+                    continue
+                extra = [cell for cell in other_unknown if cell not in cells]
+                pokemons = other_remaining - remaining
+                if not extra:
+                    continue
+                if pokemons == 0:
+                    self._mark(extra, False)
+                elif pokemons == len(extra):
+                    self._mark(extra, True)
+
+    def _components(self):
+        """Split the frontier into parts that share no number.
+
+        Returns:
+            (list<tuple<list<int>, list<tuple<list<int>, int>>>>): The cells of
+            each part with the constraints covering them.
+        """
+        constraints = {}
+        for index in list(self._active):
+            unknown, remaining = self._constraint(index)
+            if unknown:
+                constraints[index] = (unknown, remaining)
+            else:
+                self._active.discard(index)
+
+        owners = {}
+        for index, (unknown, _) in constraints.items():
+            for cell in unknown:
+                owners.setdefault(cell, []).append(index)
+
+        components = []
+        seen = set()
+        for start in constraints:
+            if start in seen:
+                continue
+            seen.add(start)
+            stack = [start]
+            cells = []
+            members = []
+            placed = set()
+            while stack:
+                index = stack.pop()
+                members.append(constraints[index])
+                for cell in constraints[index][0]:
+                    if cell in placed:
+                        continue
+                    placed.add(cell)
+                    cells.append(cell)
+                    for other in owners[cell]:
+                        if other not in seen:
+                            seen.add(other)
+                            stack.append(other)
+            components.append((cells, members))
+        return components
+
+    def _enumerate(self, cells, constraints):
+        """Count the pokemon layouts of one frontier part that satisfy every
+        constraint, by backtracking.
+
+        Returns:
+            (dict<int, float>): The share of layouts with a pokemon at each cell.
+        """
+        position = {cell: i for i, cell in enumerate(cells)}
+        need = [remaining for _, remaining in constraints]
+        left = [len(unknown) for unknown, _ in constraints]
+        covering = [[] for _ in cells]
+        for c, (unknown, _) in enumerate(constraints):
+            for cell in unknown:
+                covering[position[cell]].append(c)
+
+        assignment = [0] * len(cells)
+        hits = [0] * len(cells)
+        solutions = 0
+
+        def search(i):
+            nonlocal solutions
+            if i == len(cells):
+                solutions += 1
+                for j, value in enumerate(assignment):
+                    hits[j] += value
+                return
+            for value in (0, 1):
+                ok = True
+                for c in covering[i]:
+                    need[c] -= value
+                    left[c] -= 1
+                    if need[c] < 0 or need[c] > left[c]:
+                        ok = False
+                if ok:
+                    assignment[i] = value
+                    search(i + 1)
+                for c in covering[i]:
+                    need[c] += value
+                    left[c] += 1
+            assignment[i] = 0
+
+        search(0)
+        if solutions == 0:
+            return {cell: 0.5 for cell in cells}
+        return {cell: hits[i] / solutions for i, cell in enumerate(cells)}
@@ -0,0 +1,452 @@
+"""
+Game statistics and the leaderboard, kept in a local SQLite database.
+
+Every finished game is one row of the games table: its board, seed, time,
+clicks, outcome and where it was played. The moves are packed into a blob
+of little endian 32 bit words, the same words a GameHistory log holds
+(the cell index shifted left twice, with the action in the low bits). The
+time of each move, in seconds from the start of the game, is kept in a
+parallel blob of 32 bit floats. One index over the board shape and outcome
+ordered by time answers both the best times and the summary of a board.
+
+The database runs in WAL mode, so the window can read the leaderboard while
+games are being written. The window hands its games to a StatsWriter,
+which commits them in batches from a thread of its own; the simulator
+inserts its results in bulk with StatsStore.add_many.
+
+    python stats.py best --grid-size 10 --pokemons 15
+    python stats.py bench --rows 10000000 --path bench.db
+"""
+
+import argparse
+import itertools
+import json
+import os
+import queue
+import random
+import sqlite3
+import struct
+import threading
+import time
+
+from topology import TOPOLOGIES
+
+
+# where the window keeps its statistics
+STATS_PATH = "stats.db"
+# games a StatsWriter commits together
+BATCH_SIZE = 64
+# seconds a written game may wait for the rest of its batch
+FLUSH_INTERVAL = 2.0
+# rows inserted per transaction by add_many
+BULK_SIZE = 50000
+WIN = "win"
+LOSS = "loss"
+STUCK = "stuck"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    finished REAL NOT NULL,
+    grid_size INTEGER NOT NULL,
+    num_pokemon INTEGER NOT NULL,
+    topology TEXT NOT NULL,
+    seed INTEGER,
+    seconds REAL NOT NULL,
+    clicks INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    source TEXT NOT NULL,
+    moves BLOB,
+    timings BLOB
+);
+"""
+INDEX = """
+CREATE INDEX IF NOT EXISTS games_by_board
+    ON games (grid_size, num_pokemon, topology, outcome, seconds)
+"""
+# the columns a game is written with, in order
+COLUMNS = (
+    "finished",
+    "grid_size",
+    "num_pokemon",
+    "topology",
+    "seed",
+    "seconds",
+    "clicks",
+    "outcome",
+    "source",
+    "moves",
+    "timings",
+)
+INSERT = (
+    f"INSERT INTO games ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(COLUMNS))})"
+)
+BEST_TIMES = """
+SELECT seconds, clicks, seed, finished, source FROM games
+WHERE grid_size = ? AND num_pokemon = ? AND topology = ? AND outcome = 'win'
+ORDER BY seconds LIMIT ?
+"""
+SUMMARY = """
+SELECT outcome, COUNT(*), MIN(seconds), AVG(seconds) FROM games
+WHERE grid_size = ? AND num_pokemon = ? AND topology = ?
+GROUP BY outcome
+"""
+
+
+def pack_moves(moves):
+    """(bytes) Returns the (action, index) moves as GameHistory log words."""
+    words = [index << 2 | action for action, index in moves]
+    return struct.pack(f"<{len(words)}I", *words)
+
+
+def unpack_moves(blob):
+    """(list<tuple<int, int>>) Returns the (action, index) moves packed in
+    blob by pack_moves."""
+    words = struct.unpack(f"<{len(blob) // 4}I", blob)
+    return [(word & 3, word >> 2) for word in words]
+
+
+def pack_timings(timings):
+    """(bytes) Returns the seconds from the start of a game of each move."""
+    return struct.pack(f"<{len(timings)}f", *timings)
+
+
+def unpack_timings(blob):
+    """(list<float>) Returns the move times packed in blob by pack_timings."""
+    return list(struct.unpack(f"<{len(blob) // 4}f", blob))
+
+
+def game_row(game):
+    """(tuple) Returns the values of a game dict in the order of COLUMNS.
+
+    Only grid_size, num_pokemon, seconds, clicks and outcome are required;
+    the game is taken to have finished now on a square board when it does
+    not say, and moves and timings may be lists to pack.
+    """
+    moves = game.get("moves")
+    if moves is not None and not isinstance(moves, bytes):
+        moves = pack_moves(moves)
+    timings = game.get("timings")
+    if timings is not None and not isinstance(timings, bytes):
+        timings = pack_timings(timings)
+    return (
+        game.get("finished") or time.time(),
+        game["grid_size"],
+        game["num_pokemon"],
+        game.get("topology", "square"),
+        game.get("seed"),
+        game["seconds"],
+        game["clicks"],
+        game["outcome"],
+        game.get("source", "play"),
+        moves,
+        timings,
+    )
+
+
+class StatsStore:
+    """
+    this is StatsStore class
+    which writes games to the statistics database and answers the
+    leaderboard queries.
+
+    A store may only be used from the thread that opened it.
+    """
+
+    def __init__(self, path=STATS_PATH):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        # under WAL a commit only waits for the log, and a crash can lose the
+        # last commits but never corrupts the database
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._connection.execute(INDEX)
+
+    def add(self, game):
+        """Write one game dict (see game_row) in a transaction of its own."""
+        self.add_many([game])
+
+    def add_many(self, games, rows=False, rebuild_index=False):
+        """Write many games, BULK_SIZE to a transaction.
+
+        games is read as it is written, so it may be a generator producing
+        games as they are played.
+
+        Parameters:
+            games (iterable): Game dicts, see game_row, or tuples in the
+            order of COLUMNS when rows is True.
+            rows (bool): Whether games are already tuples.
+            rebuild_index (bool): Drop the index while writing and build it
+            again at the end. Building it in one sorted pass is much faster
+            than updating it row by row for loads of many games, but the
+            queries have no index until the load is done.
+
+        Returns:
+            (int): The number of games written.
+        """
+        if not rows:
+            games = map(game_row, games)
+        games = iter(games)
+        if rebuild_index:
+            self._connection.execute("DROP INDEX IF EXISTS games_by_board")
+        written = 0
+        try:
+            while True:
+                with self._connection:
+                    before = self._connection.total_changes
+                    self._connection.executemany(
+                        INSERT, itertools.islice(games, BULK_SIZE)
+                    )
+                    count = self._connection.total_changes - before
+                written += count
+                if count < BULK_SIZE:
+                    return written
+        finally:
+            if rebuild_index:
+                self._connection.execute(INDEX)
+
+    def is_empty(self):
+        """(bool) Returns whether no game has been written yet."""
+        cursor = self._connection.execute("SELECT 1 FROM games LIMIT 1")
+        return cursor.fetchone() is None
+
+    def best_times(self, grid_size, num_pokemon, topology="square", limit=10):
+        """The fastest won games of one board shape.
+
+        Returns:
+            (list<dict>): The seconds, clicks, seed, finish time and source of
+            each game, fastest first.
+        """
+        cursor = self._connection.execute(
+            BEST_TIMES, (grid_size, num_pokemon, topology, limit)
+        )
+        return [
+            {
+                "seconds": seconds,
+                "clicks": clicks,
+                "seed": seed,
+                "finished": finished,
+                "source": source,
+            }
+            for seconds, clicks, seed, finished, source in cursor
+        ]
+
+    def summary(self, grid_size, num_pokemon, topology="square"):
+        """The games played on one board shape.
+
+        Returns:
+            (dict<str, dict>): The count, best and average seconds of the
+            games of each outcome.
+        """
+        cursor = self._connection.execute(
+            SUMMARY, (grid_size, num_pokemon, topology)
+        )
+        return {
+            outcome: {"games": count, "best": best, "average": average}
+            for outcome, count, best, average in cursor
+        }
+
+    def game(self, game_id):
+        """The game with id game_id, with its moves and timings unpacked.
+
+        Returns:
+            (dict): The columns of the game, None if there is no such game.
+        """
+        cursor = self._connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM games WHERE id = ?", (game_id,)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        game = dict(zip(COLUMNS, row))
+        if game["moves"] is not None:
+            game["moves"] = unpack_moves(game["moves"])
+        if game["timings"] is not None:
+            game["timings"] = unpack_timings(game["timings"])
+        return game
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
+
+
+class StatsWriter:
+    """
+    this is StatsWriter class
+    which writes games to the statistics database from a thread of its own.
+
+    Games are committed together once batch_size of them are waiting, or
+    interval seconds after the first of them was handed over, and on close.
+    """
+
+    def __init__(
+        self, path=STATS_PATH, batch_size=BATCH_SIZE, interval=FLUSH_INTERVAL
+    ):
+        self.path = path
+        self._batch_size = batch_size
+        self._interval = interval
+        self._games = queue.Queue()
+        # the first error writing to the database, after which games are dropped
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def record(self, game):
+        """Hand over a game dict (see game_row) to be written."""
+        self._games.put(game)
+
+    def close(self):
+        """Write the games handed over so far and stop the thread."""
+        self._games.put(None)
+        self._thread.join()
+
+    def _run(self):
+        """Writer thread: collect games into batches and commit them."""
+        try:
+            store = StatsStore(self.path)
+        except sqlite3.Error as error:
+            self.error = error
+            store = None
+        batch = []
+        deadline = None
+        while True:
+            timeout = None
+            if deadline is not None:
+                timeout = max(deadline - time.monotonic(), 0)
+            try:
+                game = self._games.get(timeout=timeout)
+            except queue.Empty:
+                game = False
+            if game:
+                if not batch:
+                    deadline = time.monotonic() + self._interval
+                batch.append(game)
+                if len(batch) < self._batch_size:
+                    continue
+            if batch and store is not None:
+                try:
+                    store.add_many(batch)
+                except sqlite3.Error as error:
+                    self.error = error
+                    store.close()
+                    store = None
+            batch = []
+            deadline = None
+            if game is None:
+                if store is not None:
+                    store.close()
+                return
+
+
+def fake_rows(count, seed=0):
+    """Yield count made up won, lost and stuck games over the board shapes
+    of the game, as rows in the order of COLUMNS, for the benchmark."""
+    rng = random.Random(seed)
+    shapes = [
+        (grid_size, num_pokemon, topology)
+        for grid_size, num_pokemon in ((8, 10), (10, 15), (16, 40), (30, 99))
+        for topology in sorted(TOPOLOGIES)
+    ]
+    outcomes = (WIN, LOSS, LOSS, STUCK)
+    start = 1.7e9
+    # the random parts are drawn a chunk at a time, as drawing them row by
+    # row would take longer than writing the rows
+    for first in range(0, count, BULK_SIZE):
+        size = min(BULK_SIZE, count - first)
+        for number, (grid_size, num_pokemon, topology), outcome, share in zip(
+            range(first, first + size),
+            rng.choices(shapes, k=size),
+            rng.choices(outcomes, k=size),
+            [rng.random() for _ in range(size)],
+        ):
+            yield (
+                start + number,
+                grid_size,
+                num_pokemon,
+                topology,
+                number,
+                share * grid_size * 10,
+                int(share * grid_size**2) + 1,
+                outcome,
+                "bench",
+                None,
+                None,
+            )
+
+
+def bench(path, rows, repeats=5):
+    """Fill a fresh database at path with rows made up games, then time the
+    leaderboard queries on it.
+
+    Returns:
+        (dict): The insert rate and the best time of each query, in
+        microseconds, for every board shape.
+    """
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    store = StatsStore(path)
+    start = time.perf_counter()
+    store.add_many(fake_rows(rows), rows=True, rebuild_index=True)
+    seconds = time.perf_counter() - start
+    result = {
+        "rows": rows,
+        "insert_seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds),
+        "queries": [],
+    }
+    queries = (("best_times", store.best_times), ("summary", store.summary))
+    for grid_size, num_pokemon in ((8, 10), (16, 40)):
+        for name, query in queries:
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                query(grid_size, num_pokemon)
+                timings.append(time.perf_counter() - start)
+            result["queries"].append(
+                {
+                    "query": name,
+                    "grid_size": grid_size,
+                    "num_pokemon": num_pokemon,
+                    "best_us": round(min(timings) * 1e6, 1),
+                }
+            )
+    store.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game statistics and best times.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    best_parser = commands.add_parser("best")
+    best_parser.add_argument("--path", default=STATS_PATH)
+    best_parser.add_argument("--grid-size", type=int, default=10)
+    best_parser.add_argument("--pokemons", type=int, default=15)
+    best_parser.add_argument(
+        "--topology", choices=sorted(TOPOLOGIES), default="square"
+    )
+    best_parser.add_argument("--limit", type=int, default=10)
+    bench_parser = commands.add_parser("bench")
+    bench_parser.add_argument("--path", default="bench.db")
+    bench_parser.add_argument("--rows", type=int, default=10_000_000)
+    bench_parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        print(json.dumps(bench(args.path, args.rows, args.repeats), indent=2))
+        return
+    store = StatsStore(args.path)
+    result = {
+        "summary": store.summary(args.grid_size, args.pokemons, args.topology),
+        "best_times": store.best_times(
+            args.grid_size, args.pokemons, args.topology, args.limit
+        ),
+    }
+    store.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
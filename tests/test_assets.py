@@ -0,0 +1,77 @@
+"""
+The digit atlas, and the raster view copying digit tiles out of it, with tk
+images stood in for since no display is needed to check the copies.
+"""
+
+import pytest
+
+import assets
+from benchmark import HeadlessRasterBoardView
+from pokemon import RasterBoardView
+
+
+class FakeTk:
+    """Records the tk commands an image is asked to run."""
+
+    def __init__(self):
+        self.calls = []
+
+    def call(self, *args):
+        self.calls.append(args)
+
+
+class FakeImage:
+    """Stands in for a tk.PhotoImage of a size, or of a file 12 pixels high."""
+
+    count = 0
+
+    def __init__(self, file=None, width=12, height=12):
+        FakeImage.count += 1
+        self.name = f"image{FakeImage.count}"
+        self.file = file
+        self._width = width
+        self._height = height
+        self.tk = FakeTk()
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def zoom(self, factor):
+        return FakeImage(self.file, self._width * factor, self._height * factor)
+
+    def subsample(self, factor):
+        return FakeImage(self.file, self._width // factor, self._height // factor)
+
+
+@pytest.fixture
+def fake_images(monkeypatch):
+    monkeypatch.setattr(assets.tk, "PhotoImage", FakeImage)
+    assets.clear()
+    yield
+    assets.clear()
+
+
+def test_atlas_lays_digits_side_by_side(fake_images):
+    atlas, boxes = assets.get_atlas(size=24)
+    assert atlas.width() == 24 * len(assets.DIGITS)
+    assert atlas.height() == 24
+    for number, digit in enumerate(assets.DIGITS):
+        assert boxes[digit] == (24 * number, 0, 24 * number + 24, 24)
+    # one copy into the atlas per digit, and the atlas is built once
+    assert len(atlas.tk.calls) == len(assets.DIGITS)
+    assert assets.get_atlas(size=24)[0] is atlas
+
+
+def test_raster_copies_digits_from_atlas(fake_images):
+    view = HeadlessRasterBoardView(None, 10)
+    view._raster = FakeImage()
+    size = view.cell_size
+    atlas, boxes = assets.get_atlas(assets.DIGITS, size)
+    RasterBoardView.blit(view, "3", size, 0, columns=4)
+    ((_, command, source, *copy),) = view._raster.tk.calls
+    assert command == "copy"
+    assert source == atlas.name
+    assert copy == ["-from", *boxes["3"], "-to", size, 0, 5 * size, size]
@@ -0,0 +1,42 @@
+"""
+The flood fill of BoardModel.big_fun_search against the search of the first
+version of the game, on random boards with flags and exposed cells.
+"""
+
+import random
+
+import pytest
+
+from benchmark import baseline_big_fun_search
+from model import FLAG, UNEXPOSED, BoardModel
+
+
+def random_game(model, rng):
+    """(str) Returns a game string for model with some cells flagged and
+    some cells away from the pokemons showing their numbers."""
+    game = []
+    for index in range(model.grid_size**2):
+        roll = rng.random()
+        if roll < 0.1:
+            game.append(FLAG)
+        elif roll < 0.3 and index not in model.pokemon_locations:
+            game.append(str(model.count_at(index)))
+        else:
+            game.append(UNEXPOSED)
+    return "".join(game)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_same_cells_as_baseline(seed):
+    rng = random.Random(seed)
+    grid_size = rng.randint(1, 14)
+    num_pokemon = int(grid_size**2 * rng.uniform(0, 0.5))
+    model = BoardModel(grid_size, num_pokemon, seed=seed)
+    locations = model.pokemon_locations
+    game = random_game(model, rng) if rng.random() < 0.8 else model.get_game()
+    for index in range(grid_size**2):
+        expected = set(baseline_big_fun_search(game, grid_size, locations, index))
+        # the model's own locations use its count grid, a copy is searched
+        assert set(model.big_fun_search(game, grid_size, locations, index)) == expected
+        copy = list(locations)
+        assert set(model.big_fun_search(game, grid_size, copy, index)) == expected
@@ -0,0 +1,42 @@
+"""
+Spilling the chunks of an endless board to disk, loading them back, and
+removing them when the board is closed.
+"""
+
+import os
+import random
+
+from endless import EndlessBoard, wander
+
+
+def play(board, seed):
+    """(list<str>) Returns the cells around the start after a wander."""
+    wander(board, 300, random.Random(seed))
+    return board.window(-40, -40, 120, 120)
+
+
+def test_spilled_chunks_come_back():
+    with EndlessBoard(seed=3, chunk_size=8, max_chunks=4) as spilling:
+        with EndlessBoard(seed=3, chunk_size=8, max_chunks=10**6) as kept:
+            assert play(spilling, 3) == play(kept, 3)
+            assert spilling.stats()["spilled"]
+            assert not kept.stats()["spilled"]
+
+
+def test_close_removes_temporary_directory():
+    board = EndlessBoard(seed=5, chunk_size=8, max_chunks=4)
+    play(board, 5)
+    directory = board._spill_directory
+    assert os.listdir(directory)
+    board.close()
+    assert not os.path.exists(directory)
+
+
+def test_close_keeps_given_directory(tmp_path):
+    with EndlessBoard(
+        seed=5, chunk_size=8, max_chunks=4, spill_directory=str(tmp_path)
+    ) as board:
+        play(board, 5)
+        assert os.listdir(tmp_path)
+    assert tmp_path.exists()
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,33 @@
+"""
+Going to any move of a long game once its old snapshots are thinned out.
+"""
+
+import random
+
+import pytest
+
+from history import GameHistory
+from model import BoardModel
+
+
+@pytest.mark.parametrize("max_snapshots", [3, 4, 8])
+def test_goto_after_thinning(max_snapshots):
+    rng = random.Random(max_snapshots)
+    model = BoardModel(12, 20, seed=max_snapshots)
+    history = GameHistory(model, snapshot_every=4, max_snapshots=max_snapshots)
+    boards = [model.get_cells()]
+    while history.get_position() < 300:
+        index = rng.randrange(12**2)
+        if model.check_loss() or model.check_win() or rng.random() < 0.05:
+            changed = history.restart()
+        elif rng.random() < 0.7:
+            changed = history.flag(index)
+        else:
+            changed = history.reveal(index)
+        if changed:
+            boards.append(model.get_cells())
+        assert len(history._snapshots) <= max_snapshots
+    assert 0 in history._snapshots
+    for position in rng.sample(range(len(boards)), 60) + [0, len(boards) - 1]:
+        history.goto(position)
+        assert model.get_cells() == boards[position]
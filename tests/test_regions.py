@@ -0,0 +1,73 @@
+"""
+The openings followed by ZeroRegions.around against the labels of the whole
+board, and reveals made before the board is labelled against the search.
+"""
+
+import random
+
+import pytest
+
+from model import UNEXPOSED_BYTE, BoardModel
+from regions import ZeroRegions
+from topology import TOPOLOGIES
+
+
+def random_board(seed):
+    """(BoardModel) Returns a board of a random shape, size and density."""
+    rng = random.Random(seed)
+    grid_size = rng.randint(1, 24)
+    num_pokemon = int(grid_size**2 * rng.uniform(0, 0.3))
+    topology = rng.choice(sorted(TOPOLOGIES))
+    return BoardModel(grid_size, num_pokemon, seed=seed, topology=topology)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_around_matches_labels(seed):
+    model = random_board(seed)
+    labels = model.zero_regions()
+    for index in range(model.grid_size**2):
+        regions = ZeroRegions.around(
+            model.topology, model._counts, model._pokemon_cells, index
+        )
+        label = labels.region(index)
+        if label == -1:
+            assert len(regions) == 0
+            assert regions.region(index) == -1
+            continue
+        assert len(regions) == 1
+        assert regions.region(index) == 0
+        assert regions.runs(0) == labels.runs(label)
+        assert regions.spans(0) == labels.spans(label)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_first_reveal_matches_search(seed):
+    model = random_board(seed)
+    searched = BoardModel(
+        model.grid_size,
+        model.num_pokemon,
+        pokemon_locations=model.pokemon_locations,
+        topology=model.topology.name,
+    )
+    searched.use_regions = False
+    rng = random.Random(seed)
+    index = rng.randrange(model.grid_size**2)
+    assert sorted(model.reveal(index)) == sorted(searched.reveal(index))
+    assert model.get_cells() == searched.get_cells()
+    # the whole board was not labelled by the reveal
+    assert model._regions is None
+    assert model.get_cells().count(UNEXPOSED_BYTE) == model._num_unexposed
+
+
+def test_around_limit():
+    model = BoardModel(30, 0, seed=1)
+    assert (
+        ZeroRegions.around(
+            model.topology, model._counts, model._pokemon_cells, 0, limit=29
+        )
+        is None
+    )
+    regions = ZeroRegions.around(
+        model.topology, model._counts, model._pokemon_cells, 0, limit=30
+    )
+    assert regions.runs(0) == [(row * 30, row * 30 + 30) for row in range(30)]
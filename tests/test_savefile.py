@@ -0,0 +1,92 @@
+"""
+Round trips of boards through the save format, and of the counters the
+status bar shows for them.
+"""
+
+import random
+
+import pytest
+
+from model import UNEXPOSED, BoardModel
+from pokemon import PokemonGame, StatusBar
+from savefile import load_board, save_board
+
+
+class Label:
+    """Stands in for a tk label, keeping the text it was last given."""
+
+    def __init__(self):
+        self.text = None
+
+    def config(self, text):
+        self.text = text
+
+
+def played_board(seed):
+    """(BoardModel) Returns a random board with some cells revealed, some
+    flagged, and now and then a pokemon exposed."""
+    rng = random.Random(seed)
+    grid_size = rng.randint(1, 30)
+    model = BoardModel(grid_size, rng.randint(0, grid_size**2 // 3), seed=seed)
+    for _ in range(rng.randint(0, grid_size**2)):
+        index = rng.randrange(grid_size**2)
+        if model.get_cell(index) != UNEXPOSED:
+            continue
+        if rng.random() < 0.3:
+            model.toggle_flag(index)
+        elif index not in model.pokemon_locations or rng.random() < 0.05:
+            model.reveal(index)
+    return model
+
+
+def status_bar():
+    """(StatusBar) Returns a status bar with labels that need no display."""
+    bar = StatusBar.__new__(StatusBar)
+    bar._counts = None
+    bar._label1 = Label()
+    bar._label2 = Label()
+    return bar
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_board_round_trip(tmp_path, seed):
+    model = played_board(seed)
+    path = tmp_path / "board.pkmn"
+    save_board(path, model, elapsed=seed * 1.25)
+    loaded, elapsed, attempted_catches = load_board(path)
+
+    assert loaded.get_game() == model.get_game()
+    assert loaded.get_cells() == model.get_cells()
+    assert sorted(loaded.pokemon_locations) == sorted(model.pokemon_locations)
+    assert loaded.seed == model.seed
+    assert loaded.get_num_pokemon() == model.get_num_pokemon()
+    assert elapsed == seed * 1.25
+    assert attempted_catches == model.get_num_attempted_catches()
+    for counter in (
+        "get_num_attempted_catches",
+        "get_num_unexposed",
+        "check_win",
+        "check_loss",
+    ):
+        assert getattr(loaded, counter)() == getattr(model, counter)()
+    cells = range(model.grid_size**2)
+    assert [loaded.count_at(i) for i in cells] == [model.count_at(i) for i in cells]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_status_bar_round_trip(tmp_path, seed):
+    model = played_board(seed)
+    path = str(tmp_path / "board.pkmn")
+    save_board(path, model)
+    before = status_bar()
+    before.count(model.get_num_attempted_catches(), model.get_num_pokemon())
+
+    game = PokemonGame.__new__(PokemonGame)
+    game._grid_size = model.grid_size
+    filename, elapsed, (board, catches) = game._load(path)
+    after = status_bar()
+    after.count(*catches)
+
+    assert board == model.get_game()
+    assert after._label1.text == before._label1.text
+    assert after._label2.text == before._label2.text
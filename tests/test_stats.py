@@ -0,0 +1,37 @@
+"""
+Bulk loads into the statistics database, and its leaderboard queries.
+"""
+
+from stats import StatsStore, fake_rows
+
+
+def index_names(store):
+    """(list<str>) Returns the names of the indexes of store."""
+    cursor = store._connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+    )
+    return [name for (name,) in cursor]
+
+
+def test_bulk_load_keeps_index(tmp_path):
+    store = StatsStore(str(tmp_path / "stats.db"))
+    try:
+        assert store.is_empty()
+        assert store.add_many(fake_rows(500), rows=True, rebuild_index=True) == 500
+        assert not store.is_empty()
+        assert "games_by_board" in index_names(store)
+        store.add_many(fake_rows(200, seed=1), rows=True)
+        assert "games_by_board" in index_names(store)
+    finally:
+        store.close()
+
+
+def test_best_times_are_sorted(tmp_path):
+    store = StatsStore(str(tmp_path / "stats.db"))
+    try:
+        store.add_many(fake_rows(2000), rows=True)
+        times = [game["seconds"] for game in store.best_times(8, 10)]
+        assert times
+        assert times == sorted(times)
+    finally:
+        store.close()
@@ -0,0 +1,163 @@
+"""
+Board shapes: which cells are next to which.
+
+A topology works out the neighbours of every cell of a grid once. Cells away
+from the border share a few offset classes (one for square boards, one per
+row parity for hex boards), so their neighbours are index + offset for each
+offset of their class. The handful of cells along the border, whose
+neighbours are cut off or wrap around, get their own precomputed tuples.
+
+Hot loops read the tables directly:
+
+    cls = topology.classes[index]
+    if cls == BORDER:
+        neighbours = topology.border[index]
+    else:
+        neighbours = [index + offset for offset in topology.offsets[cls]]
+"""
+
+from functools import lru_cache
+
+
+# class of the cells whose neighbours are listed in Topology.border
+BORDER = 255
+# (row, column) steps to the eight neighbours of a square cell, in the order
+# of model.DIRECTIONS: up, down, left, right, then the diagonals
+SQUARE_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+# steps to the six neighbours of a hex cell; odd rows sit half a cell right
+HEX_EVEN_STEPS = ((-1, -1), (-1, 0), (0, -1), (0, 1), (1, -1), (1, 0))
+HEX_ODD_STEPS = ((-1, 0), (-1, 1), (0, -1), (0, 1), (1, 0), (1, 1))
+
+
+class Topology:
+    """
+    this is Topology class
+    which holds the neighbour tables of a square grid.
+
+    Subclasses change the steps to the neighbours of a row and what happens
+    at the edge of the grid.
+    """
+
+    name = "square"
+    # whether the edges of the grid are next to the opposite edges
+    wraps = False
+
+    def __init__(self, grid_size):
+        """
+        Parameters:
+            grid_size (int): The number of rows and columns.
+        """
+        self.grid_size = grid_size
+        self.cell_count = grid_size**2
+        # offsets of each class of cell away from the border
+        self.offsets = tuple(
+            tuple(dr * grid_size + dc for dr, dc in self.row_steps(row))
+            for row in range(min(grid_size, 2))
+        )
+        self.classes = bytearray(self.cell_count)
+        self.border = {}
+        for row in range(grid_size):
+            start = row * grid_size
+            if 0 < row < grid_size - 1:
+                cls = self.row_class(row)
+                if cls:
+                    self.classes[start : start + grid_size] = bytes([cls]) * grid_size
+                border_cols = (0, grid_size - 1)
+            else:
+                border_cols = range(grid_size)
+            for col in border_cols:
+                self.classes[start + col] = BORDER
+                self.border[start + col] = self._border_neighbours(row, col)
+
+    def row_class(self, row):
+        """(int) Returns the offset class of the cells in row."""
+        return 0
+
+    def row_steps(self, row):
+        """(tuple<tuple<int, int>>) Returns the (row, column) steps from a cell
+        in row to its neighbours."""
+        return SQUARE_STEPS
+
+    def wrap(self, row, col):
+        """(int) Returns the index of the cell at row, col, or None when that
+        is off the grid."""
+        if 0 <= row < self.grid_size and 0 <= col < self.grid_size:
+            return row * self.grid_size + col
+        return None
+
+    def _border_neighbours(self, row, col):
+        """(tuple<int>) Works out the neighbours of one border cell."""
+        index = row * self.grid_size + col
+        neighbours = []
+        for dr, dc in self.row_steps(row):
+            neighbour = self.wrap(row + dr, col + dc)
+            # tiny wrapped grids can reach a cell twice, or the cell itself
+            if neighbour is not None and neighbour != index:
+                if neighbour not in neighbours:
+                    neighbours.append(neighbour)
+        return tuple(neighbours)
+
+    def neighbours(self, index):
+        """(list<int>) Returns the indexes next to index."""
+        cls = self.classes[index]
+        if cls == BORDER:
+            return list(self.border[index])
+        return [index + offset for offset in self.offsets[cls]]
+
+    def area(self, index):
+        """(list<int>) Returns index together with its neighbours."""
+        return [index] + self.neighbours(index)
+
+
+class TorusTopology(Topology):
+    """
+    this is TorusTopology class
+    whose grid wraps around: the last column is next to the first, and the
+    last row is next to the first.
+    """
+
+    name = "torus"
+    wraps = True
+
+    def wrap(self, row, col):
+        return (row % self.grid_size) * self.grid_size + col % self.grid_size
+
+
+class HexTopology(Topology):
+    """
+    this is HexTopology class
+    for a grid of hexagons in offset rows, where every odd row sits half a
+    cell to the right and each cell has six neighbours.
+    """
+
+    name = "hex"
+
+    def row_class(self, row):
+        return row & 1
+
+    def row_steps(self, row):
+        return HEX_ODD_STEPS if row & 1 else HEX_EVEN_STEPS
+
+
+TOPOLOGIES = {
+    Topology.name: Topology,
+    TorusTopology.name: TorusTopology,
+    HexTopology.name: HexTopology,
+}
+
+
+@lru_cache(maxsize=16)
+def get_topology(name, grid_size):
+    """Returns the shared topology of a board shape and size.
+
+    Topologies never change once made, so every board of the same shape and
+    size uses the same tables.
+
+    Parameters:
+        name (str): A key of TOPOLOGIES.
+        grid_size (int): The number of rows and columns.
+
+    Returns:
+        (Topology): The topology.
+    """
+    return TOPOLOGIES[name](grid_size)
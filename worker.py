@@ -0,0 +1,91 @@
+"""
+Background worker for the game window.
+
+Tk may only be used from the thread running its mainloop, so the window hands
+its slow work (reveals, the solver, saving and loading) to a GameWorker and
+collects the results from the Tk thread with poll(), usually called from an
+`after` loop. Jobs run one at a time, in the order they were submitted. A job
+that fails is reported to the worker's error callback, so one failure never
+stops the results of later jobs from being collected.
+"""
+
+import queue
+import threading
+import traceback
+
+
+class GameWorker:
+    """
+    this is GameWorker class
+    which runs jobs on a background thread and queues their results for
+    the thread that submitted them.
+    """
+
+    def __init__(self, error=None):
+        """
+        Parameters:
+            error (callable): Called by poll with the exception of a job that
+            failed, on the polling thread. None to print its traceback.
+        """
+        self._error = error
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        # jobs submitted whose results have not been collected by poll yet
+        self._pending = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, job, *args, done=None):
+        """Run job(*args) on the worker thread.
+
+        Parameters:
+            job (callable): The work to do. It must not touch tk.
+            done (callable): Called with the result of job by poll, on the
+            polling thread. None to drop the result. It is not called when
+            job raises.
+        """
+        self._pending += 1
+        self._jobs.put((job, args, done))
+
+    def busy(self):
+        """(bool) Returns whether a submitted job has not been collected yet."""
+        return self._pending > 0
+
+    def poll(self):
+        """Hand the results of finished jobs to their done callbacks, and the
+        exceptions of failed jobs to the error callback.
+
+        Returns:
+            (int): The number of jobs collected.
+        """
+        collected = 0
+        while True:
+            try:
+                done, result, error = self._results.get_nowait()
+            except queue.Empty:
+                return collected
+            self._pending -= 1
+            collected += 1
+            if error is not None:
+                if self._error is None:
+                    traceback.print_exception(error)
+                else:
+                    self._error(error)
+            elif done is not None:
+                done(result)
+
+    def close(self):
+        """Stop the worker thread once the jobs already submitted are run."""
+        self._jobs.put(None)
+
+    def _run(self):
+        """Worker thread: run jobs until close is called."""
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                return
+            job, args, done = item
+            try:
+                self._results.put((done, job(*args), None))
+            except Exception as error:
+                self._results.put((done, None, error))